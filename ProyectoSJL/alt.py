@@ -0,0 +1,383 @@
+"""
+grafos/alt.py
+Índice ALT (A*, Landmarks, desigualdad Triangular): alternativa liviana a la
+jerarquía de contracción. Provee:
+- IndiceALT.construir(grafo, peso, num_marcas=8, estrategia='lejanos') -> índice
+- indice.consulta(origen, destino, activas=None) -> (distancia_total, ruta, stats)
+- indice.reconstruir(grafo=None) -> recalcula las tablas con las mismas marcas
+- indice.reparar(grafo, arcos) -> tablas al día tras cambios de pesos (tráfico)
+- indice.guarda(ruta) / IndiceALT.carga(ruta, grafo)
+- ruta_alt(aristas_csv, peso), alt_para(grafo, aristas_csv, peso)
+Para cada marca L se guardan d(L, v) ('desde') y d(v, L) ('hacia'), calculadas
+con DijkstraArbol sobre el grafo y su transpuesto. Cota inferior de d(v, t):
+    max_L max(d(L, t) - d(L, v), d(v, L) - d(t, L))
+También los predecesores de cada fila: cada fila es un árbol de caminos
+mínimos y tras cambios de pesos se repara como los de la caché
+(trafico.repara_arbol), sin rehacer los Dijkstra.
+Estrategias para elegir marcas:
+- 'lejanos': cada marca nueva es el nodo más lejano a las ya elegidas.
+- 'evitar': (avoid) se recorre un árbol de caminos mínimos hacia la zona donde
+  las cotas actuales son peores y sin marcas cercanas.
+"""
+
+import os
+import random
+import time
+from array import array
+
+try:
+    from grafos.astar import busqueda_informada
+    from grafos.binario import escribe_secciones, abre_secciones
+    from grafos.contraccion import firma_grafo
+    from grafos.csr import csr_desde_lista
+    from grafos.dijkstra import ArbolDijkstra, DijkstraArbol
+    from grafos.trafico import repara_arbol
+except ImportError:
+    from astar import busqueda_informada
+    from binario import escribe_secciones, abre_secciones
+    from contraccion import firma_grafo
+    from csr import csr_desde_lista
+    from dijkstra import ArbolDijkstra, DijkstraArbol
+    from trafico import repara_arbol
+
+INF = float('inf')
+ESTRATEGIAS = ('lejanos', 'evitar')
+
+
+def ruta_alt(aristas_csv, peso='distancia'):
+    """grafo_sjl_osm.csv -> grafo_sjl_osm.alt_distancia (misma carpeta)."""
+    return f'{os.path.splitext(aristas_csv)[0]}.alt_{peso}'
+
+
+def alt_para(grafo, aristas_csv, peso='distancia', num_marcas=8):
+    """Índice guardado junto al CSV si corresponde a este grafo; si no, se construye y se guarda."""
+    ruta = ruta_alt(aristas_csv, peso)
+    if os.path.exists(ruta):
+        try:
+            return IndiceALT.carga(ruta, grafo)
+        except (ValueError, KeyError, OSError):
+            pass
+    indice = IndiceALT.construir(grafo, peso, num_marcas)
+    indice.guarda(ruta)
+    return indice
+
+
+class IndiceALT:
+
+    def __init__(self, grafo, peso, marcas, desde, hacia, estrategia, padre_desde=None, padre_hacia=None):
+        self.grafo = grafo              # GrafoCSR
+        self.peso = peso
+        self.marcas = marcas            # array('i') índices internos de las marcas
+        self.desde = desde              # k*V: desde[j*V + v] = d(marca j, v)
+        self.hacia = hacia              # k*V: hacia[j*V + v] = d(v, marca j); es 'desde' si el grafo es simétrico
+        self.padre_desde = padre_desde  # k*V: predecesor de v en el árbol desde la marca j (None = no se guardó)
+        self.padre_hacia = padre_hacia  # ídem en el transpuesto; es padre_desde si el grafo es simétrico
+        self.estrategia = estrategia
+        self.stats = {}
+
+    # ---------------- preprocesamiento ----------------
+    @classmethod
+    def construir(cls, grafo, peso=None, num_marcas=8, estrategia='lejanos', semilla=0):
+        """
+        grafo: GrafoCSR o {u: [(v,p), ...]}
+        peso: 'distancia' o 'tiempo' (por defecto el de la vista)
+        estrategia: 'lejanos' o 'evitar'
+        semilla: para el nodo de partida (mismo índice en cada ejecución)
+        """
+        if estrategia not in ESTRATEGIAS:
+            raise ValueError(f'estrategia debe ser una de {ESTRATEGIAS}')
+        t0 = time.time()
+        if hasattr(grafo, 'offsets'):
+            g = grafo
+            peso = peso or g.peso or 'distancia'
+        else:
+            g = csr_desde_lista(grafo)
+            peso = peso or 'distancia'
+        indice = cls(g, peso, array('i'), array('d'), array('d'), estrategia, array('i'), array('i'))
+        V = g.num_nodos
+        num_marcas = min(num_marcas, len(g))
+        azar = random.Random(semilla)
+        if estrategia == 'lejanos' and len(g):
+            # se parte del nodo más lejano a uno cualquiera, luego el más lejano a todas las marcas
+            cercania = DijkstraArbol(g, g.ids[_al_azar(g, azar)], peso=peso)[0].dist
+            for _ in range(num_marcas):
+                m = _mas_lejano(cercania, indice.marcas)
+                if m < 0:
+                    break
+                indice._agrega_marca(m)
+                cercania = array('d', map(min, cercania, indice.desde[-V:]))
+        elif len(g):
+            intentos = 0
+            while len(indice.marcas) < num_marcas and intentos < 4 * num_marcas:
+                intentos += 1
+                m = indice._marca_evitando(_al_azar(g, azar))
+                if m >= 0:
+                    indice._agrega_marca(m)
+        indice.stats = {
+            "algoritmo": "ALT (preproceso)",
+            "V": len(g),
+            "marcas": len(indice.marcas),
+            "estrategia": estrategia,
+            "tiempo_algo_s": round(time.time() - t0, 6),
+        }
+        return indice
+
+    @property
+    def simetrico(self):
+        return self.hacia is self.desde
+
+    def _tablas(self, m):
+        """Árboles desde m y hacia m con Dijkstra sobre el grafo y el transpuesto."""
+        g = self.grafo
+        origen = g.ids[m]
+        desde = DijkstraArbol(g, origen, peso=self.peso)[0]
+        inv = g.transpuesto()
+        hacia = desde if inv is g else DijkstraArbol(inv, origen, peso=self.peso)[0]
+        return desde, hacia
+
+    def _agrega_marca(self, m):
+        desde, hacia = self._tablas(m)
+        if not self.marcas and hacia is desde:
+            self.hacia, self.padre_hacia = self.desde, self.padre_desde
+        self.marcas.append(m)
+        self.desde.extend(desde.dist)
+        self.padre_desde.extend(desde.padre)
+        if self.hacia is not self.desde:
+            self.hacia.extend(hacia.dist)
+            self.padre_hacia.extend(hacia.padre)
+
+    def _marca_evitando(self, raiz):
+        """
+        Estrategia 'evitar': en el árbol de caminos mínimos desde la raíz, cada
+        nodo pesa d(raiz, v) - cota(raiz, v) (qué tan mala es la cota actual);
+        los subárboles que ya contienen una marca pesan 0. Se baja desde la raíz
+        por el hijo de mayor peso acumulado hasta una hoja: esa es la marca.
+        """
+        g = self.grafo
+        arbol, _ = DijkstraArbol(g, g.ids[raiz], peso=self.peso)
+        dist, padre = arbol.dist, arbol.padre
+        V = len(dist)
+        alcanzados = [v for v in range(V) if dist[v] < INF]
+        # profundidad en el árbol para acumular de hojas a raíz (los arcos de peso 0 empatan en dist)
+        prof = array('i', [-1]) * V
+        prof[raiz] = 0
+        for v in alcanzados:
+            camino = []
+            x = v
+            while prof[x] < 0:
+                camino.append(x)
+                x = padre[x]
+            p = prof[x]
+            for y in reversed(camino):
+                p += 1
+                prof[y] = p
+        alcanzados.sort(key=prof.__getitem__, reverse=True)
+        tam = array('d', bytes(8 * V))
+        con_marca = bytearray(V)
+        for m in self.marcas:
+            con_marca[m] = 1
+        for v in alcanzados:
+            if not con_marca[v]:
+                tam[v] += max(0.0, dist[v] - self.cota(raiz, v))
+            p = padre[v]
+            if p >= 0:
+                if con_marca[v]:
+                    con_marca[p] = 1
+                else:
+                    tam[p] += tam[v]
+        hijos = {}
+        for v in alcanzados:
+            p = padre[v]
+            if p >= 0 and not con_marca[v]:
+                hijos.setdefault(p, []).append(v)
+        x = raiz
+        while x in hijos:
+            x = max(hijos[x], key=tam.__getitem__)
+        return -1 if x in self.marcas else x
+
+    def reconstruir(self, grafo=None):
+        """
+        Recalcula las tablas tras cambios de pesos manteniendo las marcas: 1-2
+        Dijkstra por marca, sin volver a elegirlas. grafo: el grafo actualizado
+        (mismos nodos); por defecto el actual.
+        """
+        t0 = time.time()
+        if grafo is not None:
+            self.grafo = grafo if hasattr(grafo, 'offsets') else csr_desde_lista(grafo)
+        marcas = self.marcas
+        self.marcas, self.desde, self.hacia = array('i'), array('d'), array('d')
+        self.padre_desde, self.padre_hacia = array('i'), array('i')
+        for m in marcas:
+            self._agrega_marca(m)
+        self.stats["tiempo_reconstruccion_s"] = round(time.time() - t0, 6)
+        return self
+
+    def reparar(self, grafo, arcos):
+        """
+        Pone las tablas al día tras trafico.actualiza_pesos sin rehacer los
+        Dijkstra: cada fila 'desde' se repara con los arcos cambiados y cada
+        fila 'hacia' en el transpuesto con los arcos invertidos.
+        grafo: GrafoCSR ya actualizado (mismos índices que el de las tablas)
+        arcos: [(i, j, viejo, nuevo)] de actualiza_pesos
+        Sin predecesores (índice guardado sin ellos) se reconstruye.
+        Retorna el stats de cada fila reparada.
+        """
+        t0 = time.time()
+        self.grafo = grafo
+        if self.padre_desde is None:
+            self.reconstruir()
+            return []
+        inv = grafo.transpuesto()
+        simetrico = self.simetrico
+        desde, padre_desde = _escribible(self.desde, 'd'), _escribible(self.padre_desde, 'i')
+        if not simetrico:
+            self.hacia, self.padre_hacia = _escribible(self.hacia, 'd'), _escribible(self.padre_hacia, 'i')
+        elif inv is grafo:
+            self.hacia, self.padre_hacia = desde, padre_desde
+        else:
+            # cambios dirigidos: el grafo dejó de ser simétrico y las tablas se separan
+            self.hacia, self.padre_hacia = array('d', desde), array('i', padre_desde)
+        self.desde, self.padre_desde = desde, padre_desde
+        reparaciones = self._repara_filas(grafo, self.desde, self.padre_desde, arcos, 'desde')
+        if self.hacia is not self.desde:
+            invertidos = [(j, i, viejo, nuevo) for i, j, viejo, nuevo in arcos]
+            reparaciones += self._repara_filas(inv, self.hacia, self.padre_hacia, invertidos, 'hacia')
+        self.stats["tiempo_reparacion_s"] = round(time.time() - t0, 6)
+        return reparaciones
+
+    def _repara_filas(self, g, tabla, padres, arcos, sentido):
+        V = g.num_nodos
+        reparaciones = []
+        for j, m in enumerate(self.marcas):
+            b = j * V
+            arbol = ArbolDijkstra(g.nodos, tabla[b:b + V], padres[b:b + V], bytearray(V), m, g.mascara_nodos)
+            stats = repara_arbol(arbol, g, arcos, self.peso)
+            tabla[b:b + V], padres[b:b + V] = arbol.dist, arbol.padre
+            stats["tabla"] = f"ALT {self.peso} ({sentido})"
+            reparaciones.append(stats)
+        return reparaciones
+
+    # ---------------- consulta ----------------
+    def cota(self, v, t, marcas=None):
+        """Cota inferior de d(v, t) por desigualdad triangular."""
+        V = self.grafo.num_nodos
+        desde, hacia = self.desde, self.hacia
+        mejor = 0.0
+        for j in (range(len(self.marcas)) if marcas is None else marcas):
+            b = j * V
+            a1, a2 = desde[b + t], desde[b + v]
+            if a1 < INF and a2 < INF and a1 - a2 > mejor:
+                mejor = a1 - a2
+            b1, b2 = hacia[b + v], hacia[b + t]
+            if b1 < INF and b2 < INF and b1 - b2 > mejor:
+                mejor = b1 - b2
+        return mejor
+
+    def activas_para(self, s, t, cuantas):
+        """Las marcas que dan la mejor cota para el par (s, t)."""
+        k = len(self.marcas)
+        if cuantas is None or cuantas >= k:
+            return list(range(k))
+        return sorted(range(k), key=lambda j: -self.cota(s, t, (j,)))[:cuantas]
+
+    def consulta(self, origen, destino, activas=None):
+        """
+        A* con la cota de las marcas. activas: cuántas marcas usar (las mejores
+        para el par); None = todas. Retorna (distancia_total, ruta, stats).
+        """
+        t0 = time.time()
+        g = self.grafo
+        V = g.num_nodos
+        s, t = g.indice_de(origen), g.indice_de(destino)
+        usadas = self.activas_para(s, t, activas)
+        desde, hacia = self.desde, self.hacia
+        # por marca: (base, d(L, t), d(t, L)) fijos para este destino
+        terminos = [(j * V, desde[j * V + t], hacia[j * V + t]) for j in usadas]
+        h = array('d', [-1.0]) * V
+
+        def heuristica(v):
+            hv = h[v]
+            if hv < 0:
+                hv = 0.0
+                for b, dlt, dtl in terminos:
+                    dlv, dvl = desde[b + v], hacia[b + v]
+                    if dlt < INF and dlv < INF and dlt - dlv > hv:
+                        hv = dlt - dlv
+                    if dvl < INF and dtl < INF and dvl - dtl > hv:
+                        hv = dvl - dtl
+                h[v] = hv
+            return hv
+
+        ruta_idx, distancia_total, nodos_explorados, aristas_relajadas, reabiertos = \
+            busqueda_informada(g.offsets, g.destinos, g.pesos(self.peso), s, t, heuristica, g.vivos)
+        t1 = time.time()
+        ruta = g.nodos.externos(ruta_idx)
+        stats = {
+            "algoritmo": "ALT",
+            "V": len(g),
+            "E_aproximado": g.arcos_presentes // 2 if V > 0 else 0,
+            "nodos_explorados": nodos_explorados,
+            "aristas_relajadas": aristas_relajadas,
+            "nodos_reabiertos": reabiertos,
+            "marcas": len(self.marcas),
+            "marcas_activas": len(usadas),
+            "tiempo_algo_s": round(t1 - t0, 6),
+            "complejidad_teorica": "O((V + E) log V), explora menos según la cota de las marcas",
+            "origen": origen,
+            "destino": destino,
+            "distancia_total": distancia_total,
+            "tiempo_estimado_min": None,
+            "largo_camino_nodos": len(ruta),
+            "ruta": ruta
+        }
+        return distancia_total, ruta, stats
+
+    # ---------------- persistencia ----------------
+    def guarda(self, ruta):
+        secs = {'marcas': self.marcas, 'desde': self.desde}
+        if self.padre_desde is not None:
+            secs['padre_desde'] = self.padre_desde
+        if not self.simetrico:
+            secs['hacia'] = self.hacia
+            if self.padre_hacia is not None:
+                secs['padre_hacia'] = self.padre_hacia
+        meta = {'tipo': 'indice_alt', 'peso': self.peso, 'estrategia': self.estrategia,
+                'firma': firma_grafo(self.grafo, self.peso), 'stats': self.stats}
+        escribe_secciones(ruta, meta, secs)
+
+    @classmethod
+    def carga(cls, ruta, grafo):
+        """Abre las tablas con mmap; el grafo debe ser el mismo (y con los mismos pesos) que al guardar."""
+        meta, secs = abre_secciones(ruta)
+        if meta.get('tipo') != 'indice_alt':
+            raise ValueError(f'{ruta} no es un índice ALT')
+        if meta['firma'] != firma_grafo(grafo, meta['peso']):
+            raise ValueError(f'{ruta} fue construido para otro grafo o con otros pesos')
+        desde, padre_desde = secs['desde'], secs.get('padre_desde')
+        indice = cls(grafo, meta['peso'], secs['marcas'], desde, secs.get('hacia', desde), meta['estrategia'],
+                     padre_desde, secs.get('padre_hacia', padre_desde))
+        indice.stats = meta.get('stats', {})
+        return indice
+
+
+def _al_azar(g, azar):
+    """Índice al azar de un nodo presente (el grafo puede tener máscara de nodos)."""
+    mascara = g.mascara_nodos
+    while True:
+        i = azar.randrange(g.num_nodos)
+        if mascara is None or mascara[i]:
+            return i
+
+
+def _escribible(tabla, tipo):
+    """La tabla tal cual si es un array; copia si viene mapeada del archivo (solo lectura)."""
+    return tabla if isinstance(tabla, array) else array(tipo, tabla)
+
+
+def _mas_lejano(cercania, marcas):
+    """Nodo alcanzable con mayor distancia a la marca más cercana (-1 si no queda ninguno)."""
+    mejor, m = -1.0, -1
+    for v, d in enumerate(cercania):
+        if d < INF and d > mejor and v not in marcas:
+            mejor, m = d, v
+    return m
@@ -0,0 +1,230 @@
+"""
+grafos/apsp.py
+Caminos mínimos entre todos los pares (APSP) repitiendo Dijkstra desde cada
+nodo en un ProcessPoolExecutor. En grafos viales ralos (E ≈ 1.4·V) esto es
+O(V·E log V) contra O(V^3) de Floyd–Warshall. Provee:
+- apsp_dijkstra(lista_ady, weight_type='distancia', procesos=None, ..., progreso=None)
+  -> (dist, next_hop, nodes, stats), lo mismo que floyd.floyd_warshall
+- grafo_para_procesos(g, dir_disco) -> (grafo compartible, temporal o None)
+El grafo no se copia a cada proceso: si no viene ya mapeado desde la caché se
+escribe una vez en un archivo binario temporal y cada trabajador lo abre con
+mmap (GrafoCSR se serializa como la ruta de su archivo). Cada trabajador
+escribe sus filas directo en la matriz en disco (float32 dist + int32 next_hop,
+mismo formato que floyd), así que al proceso principal no vuelve nada pesado.
+"""
+
+import atexit
+import mmap
+import os
+import tempfile
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from grafos.binario import escribe_secciones
+    from grafos.csr import abre_grafo_binario, csr_desde_lista
+    from grafos.dijkstra import DijkstraArbol
+    from grafos.floyd import MatrizAPSP
+except ImportError:
+    from binario import escribe_secciones
+    from csr import abre_grafo_binario, csr_desde_lista
+    from dijkstra import DijkstraArbol
+    from floyd import MatrizAPSP
+
+INF = float('inf')
+FUENTES_POR_TAREA = 32
+
+# estado de cada proceso trabajador (lo arma _inicia_trabajador)
+_TRABAJO = {}
+
+
+def apsp_dijkstra(lista_ady, weight_type='distancia', procesos=None, dir_disco=None,
+                  ruta_matriz=None, fuentes_por_tarea=FUENTES_POR_TAREA, progreso=None):
+    """
+    lista_ady: GrafoCSR o {u: [(v, dist, tiempo), ...]}
+    procesos: cantidad de trabajadores (None = os.cpu_count(); 1 = en este proceso)
+    dir_disco: carpeta de los temporales (grafo y matriz)
+    ruta_matriz: archivo donde dejar la matriz (8·V² bytes); por defecto un temporal
+    progreso: (opcional) progreso(fuentes hechas, V), una vez por tarea terminada
+    Retorna: (dist, next_hop, nodes, stats) con dist/next_hop como en floyd_warshall
+    """
+    t0 = time.time()
+    if hasattr(lista_ady, 'offsets'):
+        g = lista_ady
+    else:
+        g = csr_desde_lista({u: [(v, d if weight_type == 'distancia' else t) for v, d, t in vecinos]
+                             for u, vecinos in lista_ady.items()})
+        weight_type = 'distancia'
+    nodes = sorted(g)
+    V = len(nodes)
+    indice = {u: i for i, u in enumerate(nodes)}
+    # fila de la matriz (orden de nodes) <-> índice interno del grafo (-1: fuera de la máscara)
+    fila_de = array('i', [indice.get(u, -1) for u in g.ids])
+    interno_de = array('i', bytes(4 * V))
+    for a, i in enumerate(fila_de):
+        if i >= 0:
+            interno_de[i] = a
+
+    temporales = []
+    if ruta_matriz is None:
+        fd, ruta_matriz = tempfile.mkstemp(suffix='.apsp', dir=dir_disco)
+        os.close(fd)
+        temporales.append(ruta_matriz)
+    with open(ruta_matriz, 'wb') as f:
+        f.truncate(max(8 * V * V, 1))
+
+    procesos = procesos or os.cpu_count() or 1
+    trabajadores = {}
+    tareas = [range(a, min(a + fuentes_por_tarea, V)) for a in range(0, V, fuentes_por_tarea)]
+    hechas = 0
+    try:
+        if procesos > 1 and V > 1:
+            compartido, ruta_grafo = grafo_para_procesos(g, dir_disco)
+            if ruta_grafo:
+                temporales.append(ruta_grafo)
+            args = (compartido, weight_type, ruta_matriz, fila_de, interno_de)
+            ex = ProcessPoolExecutor(max_workers=procesos, initializer=_inicia_trabajador, initargs=args)
+            try:
+                for pid, n, t_dij, t_esc in ex.map(_filas, tareas):
+                    _acumula(trabajadores, pid, n, t_dij, t_esc)
+                    hechas += n
+                    if progreso is not None:
+                        progreso(hechas, V)
+            except BaseException:
+                # cancelado o con error: las tareas que faltan se descartan y no se
+                # espera a las que ya corren (escriben en un temporal ya sin nombre)
+                ex.shutdown(wait=False, cancel_futures=True)
+                raise
+            ex.shutdown()
+        else:
+            _inicia_trabajador(g, weight_type, ruta_matriz, fila_de, interno_de)
+            try:
+                for tarea in tareas:
+                    pid, n, t_dij, t_esc = _filas(tarea)
+                    _acumula(trabajadores, pid, n, t_dij, t_esc)
+                    hechas += n
+                    if progreso is not None:
+                        progreso(hechas, V)
+            finally:
+                _TRABAJO.pop('mm').close()
+                _TRABAJO.clear()
+        dist, sig = _abre_matriz(ruta_matriz, V)
+    finally:
+        for ruta in temporales:
+            borra_temporal(ruta)        # en POSIX la matriz sigue mapeada sin nombre
+    t1 = time.time()
+    stats = {
+        "algoritmo": "APSP (Dijkstra desde cada nodo)",
+        "V": V,
+        "E_aproximado": g.arcos_presentes // 2 if V > 0 else 0,
+        "matriz_generada": (V, V),
+        "procesos": procesos if V > 1 else 1,
+        "trabajadores": [{"pid": pid, **t} for pid, t in sorted(trabajadores.items())],
+        "bytes_matrices": 8 * V * V,
+        "en_disco": True,
+        "tiempo_algo_s": round(t1 - t0, 6),
+        "complejidad_teorica": "O(V·(V + E) log V) repartido entre procesos"
+    }
+    return MatrizAPSP(nodes, indice, dist, 'dist'), MatrizAPSP(nodes, indice, sig, 'siguiente'), nodes, stats
+
+
+def grafo_para_procesos(g, dir_disco=None):
+    """
+    (grafo, ruta_temporal): un GrafoCSR que viaja a otros procesos como la ruta
+    de su archivo mapeado (una VistaGrafo sobre él, como ruta + máscaras).
+    Si g no viene de la caché se escribe a un binario
+    temporal (ruta_temporal, que el llamador borra al terminar); si no, (g, None).
+    """
+    if getattr(g, 'ruta_binaria', None) is not None:
+        return g, None
+    fd, ruta = tempfile.mkstemp(suffix='.bin', dir=dir_disco)
+    os.close(fd)
+    escribe_secciones(ruta, {'tipo': 'grafo_temporal'}, g.secciones())
+    return abre_grafo_binario(ruta)[0], ruta
+
+
+def borra_temporal(ruta):
+    """Borra un temporal; si el sistema no deja (archivo aún mapeado en Windows), al salir."""
+    try:
+        os.remove(ruta)
+    except OSError:
+        atexit.register(_borra, ruta)
+
+
+def _borra(ruta):
+    if os.path.exists(ruta):
+        os.remove(ruta)
+
+
+def _acumula(trabajadores, pid, n, t_dij, t_esc):
+    t = trabajadores.setdefault(pid, {"fuentes": 0, "tiempo_dijkstra_s": 0.0, "tiempo_escritura_s": 0.0})
+    t["fuentes"] += n
+    t["tiempo_dijkstra_s"] = round(t["tiempo_dijkstra_s"] + t_dij, 6)
+    t["tiempo_escritura_s"] = round(t["tiempo_escritura_s"] + t_esc, 6)
+
+
+def _abre_matriz(ruta, V):
+    """(dist 'f', next_hop 'i') como memoryviews sobre el archivo mapeado."""
+    n2 = V * V
+    with open(ruta, 'r+b') as f:
+        mm = mmap.mmap(f.fileno(), max(8 * n2, 1))
+    vista = memoryview(mm)
+    return vista[:4 * n2].cast('f'), vista[4 * n2:8 * n2].cast('i')
+
+
+def _inicia_trabajador(g, peso, ruta_matriz, fila_de, interno_de):
+    with open(ruta_matriz, 'r+b') as f:
+        mm = mmap.mmap(f.fileno(), 0)
+    _TRABAJO.update(g=g, peso=peso, mm=mm, fila_de=fila_de, interno_de=interno_de)
+
+
+def _filas(fuentes):
+    """Dijkstra desde cada fuente (fila de la matriz) y escritura de su fila. Retorna (pid, n, t_dijkstra, t_escritura)."""
+    g, peso, mm = _TRABAJO['g'], _TRABAJO['peso'], _TRABAJO['mm']
+    fila_de, interno_de = _TRABAJO['fila_de'], _TRABAJO['interno_de']
+    V = len(interno_de)
+    ids = g.ids
+    t_dij = t_esc = 0.0
+    n = 0
+    for i in fuentes:
+        a = interno_de[i]
+        t0 = time.perf_counter()
+        arbol, _ = DijkstraArbol(g, ids[a], peso=peso)
+        salto = _primer_salto(arbol.dist, arbol.padre, a)
+        t1 = time.perf_counter()
+        dist = arbol.dist
+        fila_d = array('f', [dist[x] for x in interno_de])
+        fila_s = array('i', [fila_de[salto[x]] if salto[x] >= 0 else -1 for x in interno_de])
+        mm[4 * i * V:4 * (i + 1) * V] = fila_d.tobytes()
+        mm[4 * V * V + 4 * i * V:4 * V * V + 4 * (i + 1) * V] = fila_s.tobytes()
+        t_esc += time.perf_counter() - t1
+        t_dij += t1 - t0
+        n += 1
+    return os.getpid(), n, t_dij, t_esc
+
+
+def _primer_salto(dist, padre, a):
+    """
+    Para cada nodo b alcanzable desde a, el primer nodo después de a en el
+    camino a -> b (a para sí mismo, -1 si no es alcanzable): la fila de next_hop.
+    """
+    V = len(dist)
+    salto = array('i', [-1]) * V
+    salto[a] = a
+    for b in range(V):
+        if salto[b] >= 0 or dist[b] == INF:
+            continue
+        camino = []
+        x = b
+        while salto[x] < 0:
+            p = padre[x]
+            if p == a:
+                salto[x] = x
+                break
+            camino.append(x)
+            x = p
+        s = salto[x]
+        for y in camino:
+            salto[y] = s
+    return salto
@@ -0,0 +1,186 @@
+"""
+grafos/astar.py
+A* sobre el grafo usando las coordenadas (lon, lat) de nodos_info. Provee:
+- AEstrella(lag, inicio, destino, nodos_info, peso=None, velocidad_kmh=None) -> (distancia_total, ruta, stats)
+- distancia_gran_circulo(lon1, lat1, lon2, lat2) -> metros
+- cota_velocidad(g) -> (m/min máxima por arco, metros de arcos con tiempo 0)
+- busqueda_informada(off, dst, w, s, t, heuristica, vivos=None) -> núcleo de A* sobre índices
+Heurística:
+- 'distancia': distancia de gran círculo al destino (una calle nunca es más
+  corta que la línea recta sobre la esfera).
+- 'tiempo': esa distancia dividida por la velocidad máxima (VELOCIDAD_KMH si se
+  pasa velocidad_kmh, o la mayor velocidad por arco d/t del grafo).
+stats trae las mismas claves que Dijkstra (nodos_explorados, aristas_relajadas, ...).
+"""
+
+import heapq
+import math
+import time
+from array import array
+from itertools import compress
+
+try:
+    from grafos.csr import csr_desde_lista
+except ImportError:
+    from csr import csr_desde_lista
+
+INF = float('inf')
+# algo menor que el radio que usa osmnx (6371009 m) para que la recta nunca supere al largo de la calle
+R_TIERRA_M = 6371000.0
+
+
+def distancia_gran_circulo(lon1, lat1, lon2, lat2):
+    """Haversine en metros."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    h = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * R_TIERRA_M * math.asin(min(1.0, math.sqrt(h)))
+
+
+def cota_velocidad(g):
+    """
+    Velocidad máxima por arco (metros/minuto) y largo total de arcos con
+    tiempo 0 (tiempos redondeados a 0.00 en el CSV). Los arcos con tiempo 0 no
+    entran en la velocidad; su largo se descuenta de la heurística para que
+    siga siendo admisible.
+    """
+    vmax = 0.0
+    largo_cero = 0.0
+    arcos = zip(g.distancias, g.tiempos)
+    for d, t in (arcos if g.vivos is None else compress(arcos, g.vivos)):
+        if t > 0:
+            if d / t > vmax:
+                vmax = d / t
+        else:
+            largo_cero += d
+    return vmax, largo_cero
+
+
+def AEstrella(lag, inicio, destino, nodos_info, peso=None, velocidad_kmh=None):
+    """
+    lag: GrafoCSR o {u: [(v,p), ...], ...} (en este caso p se toma como metros)
+    nodos_info: {u: (lon, lat)}; nodos sin coordenadas usan heurística 0
+    peso: 'distancia' o 'tiempo' (por defecto el de la vista)
+    velocidad_kmh: cota de velocidad para 'tiempo'; si es None se deriva de los arcos
+    Retorna: (distancia_total, ruta, stats)
+    """
+    t0 = time.time()
+    if hasattr(lag, 'offsets'):
+        g = lag
+        peso = peso or g.peso or 'distancia'
+    else:
+        g = csr_desde_lista(lag)
+        peso = 'distancia'
+    V = g.num_nodos
+    off, dst = g.offsets, g.destinos
+    w = g.pesos(peso)
+    s, t = g.indice_de(inicio), g.indice_de(destino)
+
+    # ---------------- heurística ----------------
+    descuento = 0.0
+    if peso == 'distancia':
+        escala = 1.0                                    # metros -> metros
+    elif velocidad_kmh is not None:
+        escala = 60.0 / (velocidad_kmh * 1000.0)        # metros -> minutos
+    else:
+        vmax, descuento = cota_velocidad(g)
+        escala = 1.0 / vmax if vmax > 0 else 0.0
+
+    if getattr(nodos_info, 'nodos', None) is g.nodos:
+        # CoordenadasCSR con la misma numeración: se leen los arreglos
+        lon_arr, lat_arr = nodos_info.lon, nodos_info.lat
+        def coord(i):
+            x = lon_arr[i]
+            return None if x != x else (x, lat_arr[i])
+    else:
+        ids = g.ids
+        def coord(i):
+            return nodos_info.get(ids[i]) if nodos_info is not None else None
+
+    h = array('d', [-1.0]) * V              # -1 = aún no calculada
+    destino_xy = coord(t)
+
+    def heuristica(i):
+        hi = h[i]
+        if hi < 0:
+            xy = coord(i)
+            if xy is None or destino_xy is None:
+                hi = 0.0
+            else:
+                recta = distancia_gran_circulo(xy[0], xy[1], destino_xy[0], destino_xy[1])
+                hi = max(0.0, recta - descuento) * escala
+            h[i] = hi
+        return hi
+
+    # ---------------- búsqueda ----------------
+    ruta_idx, distancia_total, nodos_explorados, aristas_relajadas, reabiertos = \
+        busqueda_informada(off, dst, w, s, t, heuristica, g.vivos)
+    t1 = time.time()
+    ruta = g.nodos.externos(ruta_idx)
+    stats = {
+        "algoritmo": "A*",
+        "V": len(g),
+        "E_aproximado": g.arcos_presentes // 2 if V > 0 else 0,
+        "nodos_explorados": nodos_explorados,
+        "aristas_relajadas": aristas_relajadas,
+        "nodos_reabiertos": reabiertos,
+        "heuristica": "gran círculo" if peso == 'distancia' else "gran círculo / velocidad máxima",
+        "tiempo_algo_s": round(t1 - t0, 6),
+        "complejidad_teorica": "O((V + E) log V), explora menos según la heurística",
+        "origen": inicio,
+        "destino": destino,
+        "distancia_total": distancia_total,
+        "tiempo_estimado_min": None,
+        "largo_camino_nodos": len(ruta),
+        "ruta": ruta
+    }
+    return distancia_total, ruta, stats
+
+
+def busqueda_informada(off, dst, w, s, t, heuristica, vivos=None):
+    """
+    Núcleo de A* sobre arreglos CSR con una heurística h(i) cualquiera (también
+    la usa el índice ALT); vivos: máscara de arcos del grafo (None = todos). Retorna
+    (ruta_idx, distancia_total, nodos_explorados, aristas_relajadas, nodos_reabiertos).
+    """
+    V = len(off) - 1
+    dist = array('d', [INF]) * V
+    padre = array('i', [-1]) * V
+    cerrados = bytearray(V)
+    dist[s] = 0
+    frontera = [(heuristica(s), 0, s)]
+    nodos_explorados = 0
+    aristas_relajadas = 0
+    reabiertos = 0
+
+    while frontera:
+        f_u, d_u, u = heapq.heappop(frontera)
+        if d_u > dist[u]:
+            continue                        # entrada vieja
+        if cerrados[u]:
+            reabiertos += 1
+        cerrados[u] = 1
+        nodos_explorados += 1
+        if u == t:
+            break
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            nuevo = d_u + w[k]
+            aristas_relajadas += 1
+            # sin descartar cerrados: si la heurística no es consistente el nodo se reabre
+            if nuevo < dist[v]:
+                dist[v] = nuevo
+                padre[v] = u
+                heapq.heappush(frontera, (nuevo + heuristica(v), nuevo, v))
+
+    ruta_idx = []
+    if dist[t] < INF and cerrados[t]:
+        i = t
+        while i != -1:
+            ruta_idx.append(i)
+            i = padre[i]
+        ruta_idx.reverse()
+    distancia_total = dist[t] if ruta_idx else INF
+    return ruta_idx, distancia_total, nodos_explorados, aristas_relajadas, reabiertos
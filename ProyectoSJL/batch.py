@@ -0,0 +1,255 @@
+"""
+batch.py
+Ruteo por lotes sin interfaz gráfica: carga el grafo una vez y responde pares
+origen/destino leídos de un CSV o JSONL, escribiendo los resultados a medida
+que salen.
+
+    python batch.py grafo_sjl_osm.csv nodos_sjl_osm.csv pares.csv -o rutas.csv
+    python batch.py grafo.csv nodos.csv pares.jsonl --peso tiempo --procesos 4 -o rutas.jsonl
+    cat pares.csv | python batch.py grafo.csv nodos.csv - > rutas.csv
+    python batch.py grafo.csv nodos.csv puntos.csv --coordenadas -o rutas.csv
+
+Entrada: CSV con columnas origen,destino (o las dos primeras columnas) o JSONL
+con {"origen": ..., "destino": ...}; '-' lee de la entrada estándar.
+Con --coordenadas cada par trae lat/lon (columnas o claves lat_origen,
+lon_origen, lat_destino, lon_destino) y se ajusta al nodo más cercano con el
+índice espacial (guardado junto a la caché del grafo); la salida trae los ids
+de esos nodos.
+Salida: origen,destino,distancia,tiempo,estado[,ruta] en CSV o JSONL (según
+la extensión de -o o --formato), en el mismo orden de la entrada.
+Los pares se leen por ventanas de --ventana pares; dentro de cada ventana se
+agrupan por origen (un solo Dijkstra multi-destino por origen) y los grupos
+se reparten entre procesos. La memoria queda acotada por la ventana.
+Al terminar se informa el rendimiento (pares por segundo) en stderr.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+try:
+    from grafos.apsp import grafo_para_procesos, borra_temporal
+    from grafos.espacial import espacial_para
+    from grafos.loader import carga_csvs
+    from grafos.muchos_a_muchos import busqueda_multidestino
+except ImportError:
+    from apsp import grafo_para_procesos, borra_temporal
+    from espacial import espacial_para
+    from loader import carga_csvs
+    from muchos_a_muchos import busqueda_multidestino
+
+INF = float('inf')
+VENTANA = 20000                 # pares en memoria a la vez
+COLUMNAS_COORDENADAS = ('lat_origen', 'lon_origen', 'lat_destino', 'lon_destino')
+GRUPOS_POR_TAREA = 16
+
+# estado de cada proceso trabajador (lo arma _inicia_trabajador)
+_TRABAJO = {}
+
+
+def lee_pares(flujo, formato, coordenadas=False):
+    """
+    Genera (origen, destino) desde un CSV (con o sin cabecera) o JSONL.
+    Con coordenadas=True genera ((lat, lon), (lat, lon)).
+    """
+    columnas = COLUMNAS_COORDENADAS if coordenadas else ('origen', 'destino')
+    if formato == 'jsonl':
+        for linea in flujo:
+            linea = linea.strip()
+            if linea:
+                par = json.loads(linea)
+                yield _par([par[c] for c in columnas], coordenadas)
+        return
+    filas = csv.reader(flujo)
+    primera = next(filas, None)
+    if primera is None:
+        return
+    cabecera = [c.strip().lower() for c in primera]
+    if all(c in cabecera for c in columnas):
+        pos = [cabecera.index(c) for c in columnas]
+    else:
+        pos = list(range(len(columnas)))
+        yield _par([primera[p] for p in pos], coordenadas)
+    for fila in filas:
+        if fila:
+            yield _par([fila[p] for p in pos], coordenadas)
+
+
+def _par(valores, coordenadas):
+    if coordenadas:
+        lat_o, lon_o, lat_d, lon_d = map(float, valores)
+        return (lat_o, lon_o), (lat_d, lon_d)
+    return valores[0], valores[1]
+
+
+def ajusta_ventana(pares, espacial):
+    """Pares de coordenadas -> pares de ids (nodo más cercano), en una sola consulta por lote."""
+    puntos = [p for par in pares for p in par]
+    cercanos, _ = espacial.lote('cercano', puntos)
+    return [(cercanos[2 * n][0], cercanos[2 * n + 1][0]) for n in range(len(pares))]
+
+
+def _normaliza(nodo, indice):
+    """Id leído del archivo -> índice interno, o None si el nodo no existe."""
+    if nodo in indice:
+        return indice[nodo]
+    try:
+        return indice.get(int(nodo))
+    except (TypeError, ValueError):
+        return None
+
+
+def resuelve_ventana(pares, indice, ejecutor=None):
+    """
+    pares: [(origen, destino)] de la ventana. Agrupa por origen, calcula y
+    retorna los resultados en el orden de entrada más el total de búsquedas.
+    """
+    grupos = {}
+    resultados = [None] * len(pares)
+    for n, (o, d) in enumerate(pares):
+        s, t = _normaliza(o, indice), _normaliza(d, indice)
+        if s is None or t is None:
+            resultados[n] = (o, d, INF, INF, 'nodo_desconocido', None)
+        else:
+            grupos.setdefault(s, []).append((n, t))
+    trabajo = list(grupos.items())
+    lotes = [trabajo[a:a + GRUPOS_POR_TAREA] for a in range(0, len(trabajo), GRUPOS_POR_TAREA)]
+    hechos = ejecutor.map(_resuelve_grupos, lotes) if ejecutor else map(_resuelve_grupos, lotes)
+    for lote in hechos:
+        for n, dist, tiempo, ruta in lote:
+            o, d = pares[n]
+            estado = 'ok' if dist < INF else 'sin_camino'
+            resultados[n] = (o, d, dist, tiempo, estado, ruta)
+    return resultados, len(grupos)
+
+
+def _inicia_trabajador(g, peso, rutas):
+    _TRABAJO.update(g=g, peso=peso, rutas=rutas)
+
+
+def _resuelve_grupos(grupos):
+    """[(n, distancia, tiempo, ruta|None), ...] para una lista de (origen, [(n, destino)])."""
+    g, peso, rutas = _TRABAJO['g'], _TRABAJO['peso'], _TRABAJO['rutas']
+    ids = g.ids
+    salida = []
+    for s, pedidos in grupos:
+        dist, otro, padre, fijados, _ = busqueda_multidestino(g, s, [t for _, t in pedidos], peso)
+        d_dist, d_tiempo = (otro, dist) if peso == 'tiempo' else (dist, otro)
+        for n, t in pedidos:
+            if not fijados[t]:
+                salida.append((n, INF, INF, None))
+                continue
+            ruta = None
+            if rutas:
+                ruta, i = [], t
+                while i != -1:
+                    ruta.append(ids[i])
+                    i = padre[i]
+                ruta.reverse()
+            salida.append((n, d_dist[t], d_tiempo[t], ruta))
+    return salida
+
+
+class EscritorResultados:
+    """Escribe filas de resultado en CSV o JSONL a medida que llegan."""
+
+    def __init__(self, flujo, formato, rutas):
+        self.flujo = flujo
+        self.formato = formato
+        self.rutas = rutas
+        if formato == 'csv':
+            self.csv = csv.writer(flujo)
+            self.csv.writerow(['origen', 'destino', 'distancia', 'tiempo', 'estado'] + (['ruta'] if rutas else []))
+
+    def escribe(self, filas):
+        for o, d, dist, tiempo, estado, ruta in filas:
+            if self.formato == 'csv':
+                fila = [o, d, dist if dist < INF else 'inf', tiempo if tiempo < INF else 'inf', estado]
+                if self.rutas:
+                    fila.append(' '.join(map(str, ruta or [])))
+                self.csv.writerow(fila)
+            else:
+                reg = {'origen': o, 'destino': d, 'distancia': dist if dist < INF else None,
+                       'tiempo': tiempo if tiempo < INF else None, 'estado': estado}
+                if self.rutas:
+                    reg['ruta'] = ruta or []
+                self.flujo.write(json.dumps(reg) + '\n')
+        self.flujo.flush()
+
+
+def _formato(ruta, explicito):
+    if explicito:
+        return explicito
+    return 'jsonl' if ruta and ruta.lower().endswith(('.jsonl', '.json')) else 'csv'
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description='Ruteo por lotes de pares origen/destino sobre el grafo SJL.')
+    ap.add_argument('aristas_csv')
+    ap.add_argument('nodos_csv')
+    ap.add_argument('pares', help="CSV/JSONL con origen,destino ('-' = entrada estándar)")
+    ap.add_argument('-o', '--salida', default='-', help="archivo de salida ('-' = salida estándar)")
+    ap.add_argument('--peso', choices=['distancia', 'tiempo'], default='distancia')
+    ap.add_argument('--procesos', type=int, default=1, help='0 = uno por CPU')
+    ap.add_argument('--ventana', type=int, default=VENTANA, help='pares leídos y resueltos a la vez')
+    ap.add_argument('--formato-entrada', choices=['csv', 'jsonl'])
+    ap.add_argument('--formato', choices=['csv', 'jsonl'], help='formato de salida')
+    ap.add_argument('--rutas', action='store_true', help='incluir la secuencia de nodos de cada ruta')
+    ap.add_argument('--coordenadas', action='store_true',
+                    help='pares dados como lat_origen,lon_origen,lat_destino,lon_destino (se ajustan al nodo más cercano)')
+    args = ap.parse_args(argv)
+
+    t0 = time.time()
+    g, nodos_info = carga_csvs(args.aristas_csv, args.nodos_csv)
+    espacial = espacial_para(nodos_info, g, args.aristas_csv) if args.coordenadas else None
+    t_carga = time.time() - t0
+    procesos = args.procesos or os.cpu_count() or 1
+    entrada = sys.stdin if args.pares == '-' else open(args.pares, newline='', encoding='utf-8')
+    salida = sys.stdout if args.salida == '-' else open(args.salida, 'w', newline='', encoding='utf-8')
+    escritor = EscritorResultados(salida, _formato(args.salida if args.salida != '-' else None, args.formato), args.rutas)
+    formato_entrada = _formato(args.pares if args.pares != '-' else None, args.formato_entrada)
+
+    ejecutor, temporal = None, None
+    total = busquedas = 0
+    t1 = time.time()
+    try:
+        if procesos > 1:
+            compartido, temporal = grafo_para_procesos(g)
+            ejecutor = ProcessPoolExecutor(max_workers=procesos, initializer=_inicia_trabajador,
+                                           initargs=(compartido, args.peso, args.rutas))
+        else:
+            _inicia_trabajador(g, args.peso, args.rutas)
+        pares = lee_pares(entrada, formato_entrada, args.coordenadas)
+        while True:
+            ventana = list(islice(pares, max(1, args.ventana)))
+            if not ventana:
+                break
+            if espacial is not None:
+                ventana = ajusta_ventana(ventana, espacial)
+            resultados, b = resuelve_ventana(ventana, g.indice, ejecutor)
+            escritor.escribe(resultados)
+            total += len(ventana)
+            busquedas += b
+    finally:
+        if ejecutor:
+            ejecutor.shutdown()
+        if temporal:
+            borra_temporal(temporal)
+        if entrada is not sys.stdin:
+            entrada.close()
+        if salida is not sys.stdout:
+            salida.close()
+    t_rutas = time.time() - t1
+    print(f'{total} pares, {busquedas} búsquedas (orígenes por ventana), {procesos} proceso(s); '
+          f'carga {t_carga:.2f} s, ruteo {t_rutas:.2f} s, '
+          f'{total / t_rutas if t_rutas > 0 else 0:.1f} pares/s', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
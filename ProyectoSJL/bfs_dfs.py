@@ -5,10 +5,13 @@ BFS y DFS instrumentados. DFS devuelve métricas como:
 """
 
 from collections import deque
+from itertools import compress
 import time
 
 def BFS(lista_ady, inicio):
     """BFS simple (sin stats extendidas)."""
+    if hasattr(lista_ady, 'offsets'):
+        return _bfs_csr(lista_ady, inicio)
     visitados = set([inicio])
     q = deque([inicio])
     orden = []
@@ -21,12 +24,33 @@ def BFS(lista_ady, inicio):
                 q.append(v)
     return orden
 
-def DFS(lista_ady, inicio):
+def _bfs_csr(g, inicio):
+    off, dst, vivos, nodos = g.offsets, g.destinos, g.vivos, g.ids
+    s = g.indice_de(inicio)
+    visitados = bytearray(g.num_nodos)
+    visitados[s] = 1
+    q = deque([s])
+    orden = []
+    while q:
+        u = q.popleft()
+        orden.append(nodos[u])
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if not visitados[v]:
+                visitados[v] = 1
+                q.append(v)
+    return orden
+
+def DFS(lista_ady, inicio, progreso=None):
     """
     DFS iterativa instrumentada:
+    progreso: (opcional) progreso(visitados, V), se llama cada 1024 nodos visitados
     Retorna: (orden, stats)
     stats contiene: total_visitados, profundidad_maxima_aproximada, grafo_conectado(por componente), tiempo_algo_s
     """
+    if hasattr(lista_ady, 'offsets'):
+        return _dfs_csr(lista_ady, inicio, progreso)
     t0 = time.time()
     pila = [(inicio, 0)]   # (nodo, profundidad)
     visitados = set()
@@ -38,6 +62,8 @@ def DFS(lista_ady, inicio):
             continue
         visitados.add(u)
         orden.append(u)
+        if progreso is not None and not len(orden) & 1023:
+            progreso(len(orden), len(lista_ady))
         if prof > profundidad_max:
             profundidad_max = prof
         # añadimos vecinos (no visitados)
@@ -49,13 +75,42 @@ def DFS(lista_ady, inicio):
     # estimación de conectividad: si visitamos todos los nodos => conectado (para el componente usado)
     total_nodos = len(lista_ady)
     grafo_conectado = (len(visitados) == total_nodos)
+    return orden, _stats_dfs(len(visitados), profundidad_max, grafo_conectado, t1 - t0)
+
+def _dfs_csr(g, inicio, progreso=None):
+    t0 = time.time()
+    off, dst, vivos, nodos = g.offsets, g.destinos, g.vivos, g.ids
+    pila = [(g.indice_de(inicio), 0)]
+    visitados = bytearray(g.num_nodos)
+    total_visitados = 0
+    orden = []
+    profundidad_max = 0
+    while pila:
+        u, prof = pila.pop()
+        if visitados[u]:
+            continue
+        visitados[u] = 1
+        total_visitados += 1
+        if progreso is not None and not total_visitados & 1023:
+            progreso(total_visitados, len(g))
+        orden.append(nodos[u])
+        if prof > profundidad_max:
+            profundidad_max = prof
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if not visitados[v]:
+                pila.append((v, prof + 1))
+    t1 = time.time()
+    grafo_conectado = (total_visitados == len(g))
+    return orden, _stats_dfs(total_visitados, profundidad_max, grafo_conectado, t1 - t0)
 
-    stats = {
+def _stats_dfs(total_visitados, profundidad_max, grafo_conectado, segundos):
+    return {
         "algoritmo": "DFS",
-        "total_nodos_visitados": len(visitados),
+        "total_nodos_visitados": total_visitados,
         "profundidad_maxima": profundidad_max,
         "grafo_conectado": grafo_conectado,
-        "tiempo_algo_s": round(t1 - t0, 6),
+        "tiempo_algo_s": round(segundos, 6),
         "complejidad_teorica": "O(V + E)"
     }
-    return orden, stats
@@ -0,0 +1,72 @@
+"""
+grafos/binario.py
+Contenedor binario por secciones para los arreglos del proyecto (grafo CSR,
+coordenadas, tablas precalculadas). Provee:
+- escribe_secciones(ruta, meta, secciones)  secciones: {nombre: array}
+- abre_secciones(ruta) -> (meta, {nombre: memoryview})  vía mmap, sin copiar
+Formato: MAGIA (8 bytes) | largo cabecera (uint64) | cabecera JSON | secciones
+alineadas a 64 bytes. Varios procesos que abren el mismo archivo comparten las
+páginas del sistema operativo en lugar de tener cada uno su copia.
+"""
+
+import json, mmap, os, struct, sys
+
+MAGIA = b'SJLBIN1\x00'
+ALINEACION = 64
+
+
+def _alinea(n):
+    return (n + ALINEACION - 1) // ALINEACION * ALINEACION
+
+
+def escribe_secciones(ruta, meta, secciones):
+    """
+    Escribe meta (dict serializable a JSON) y las secciones (array.array o
+    memoryview con formato de un carácter). Se escribe a un temporal y se
+    renombra, así un lector nunca ve un archivo a medias.
+    """
+    tabla = []
+    pos = 0
+    for nombre, arr in secciones.items():
+        mv = memoryview(arr)
+        tabla.append({'nombre': nombre, 'tipo': mv.format, 'largo': len(mv), 'bytes': mv.nbytes, 'rel': pos})
+        pos = _alinea(pos + mv.nbytes)
+    cabecera = json.dumps({'meta': meta, 'byteorder': sys.byteorder, 'secciones': tabla}).encode('utf-8')
+    inicio = _alinea(len(MAGIA) + 8 + len(cabecera))
+    tmp = f'{ruta}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(MAGIA)
+        f.write(struct.pack('<Q', len(cabecera)))
+        f.write(cabecera)
+        for sec, arr in zip(tabla, secciones.values()):
+            f.write(b'\x00' * (inicio + sec['rel'] - f.tell()))
+            f.write(memoryview(arr).cast('B'))
+    os.replace(tmp, ruta)
+
+
+def lee_meta(ruta):
+    """Solo la cabecera (para validar un archivo sin mapearlo)."""
+    with open(ruta, 'rb') as f:
+        if f.read(len(MAGIA)) != MAGIA:
+            raise ValueError(f'{ruta} no es un archivo binario del proyecto')
+        largo, = struct.unpack('<Q', f.read(8))
+        return json.loads(f.read(largo).decode('utf-8'))['meta']
+
+
+def abre_secciones(ruta):
+    """Mapea el archivo en solo lectura y devuelve memoryviews tipadas por sección."""
+    with open(ruta, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if mm[:len(MAGIA)] != MAGIA:
+        raise ValueError(f'{ruta} no es un archivo binario del proyecto')
+    largo, = struct.unpack_from('<Q', mm, len(MAGIA))
+    cab = json.loads(mm[len(MAGIA) + 8:len(MAGIA) + 8 + largo].decode('utf-8'))
+    if cab['byteorder'] != sys.byteorder:
+        raise ValueError(f'{ruta} fue escrito con otro orden de bytes')
+    inicio = _alinea(len(MAGIA) + 8 + largo)
+    base = memoryview(mm)
+    secciones = {}
+    for sec in cab['secciones']:
+        ini = inicio + sec['rel']
+        secciones[sec['nombre']] = base[ini:ini + sec['bytes']].cast(sec['tipo'])
+    return cab['meta'], secciones
@@ -0,0 +1,127 @@
+"""
+grafos/cache_arboles.py
+Caché LRU de árboles de caminos mínimos (ArbolDijkstra) acotada por memoria.
+Provee:
+- CacheArboles(max_bytes) con obtener / consulta / invalida / repara / estadisticas
+Clave: (origen, peso, version_grafo). Quien modifica el grafo sube la versión
+(o llama invalida()), así nunca se responde con un árbol de otro grafo. Se
+guardan árboles completos (sin parada temprana) para que cualquier destino se
+responda desde el árbol: distancia en O(1), camino siguiendo predecesores.
+Con cambios de pesos en vivo (trafico.py) repara() pasa los árboles a la
+versión nueva corrigiendo solo los subárboles afectados en vez de descartarlos.
+"""
+
+import time
+from collections import OrderedDict
+
+try:
+    from grafos.dijkstra import DijkstraArbol, _resumen_destino
+    from grafos.trafico import repara_arbol
+except ImportError:
+    from dijkstra import DijkstraArbol, _resumen_destino
+    from trafico import repara_arbol
+
+MAX_BYTES = 64 * 2**20          # ~350 árboles de SJL (13 bytes por nodo cada uno)
+
+
+class CacheArboles:
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._arboles = OrderedDict()       # clave -> (arbol, stats), el más reciente al final
+        self.bytes_usados = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojos = 0
+        self.invalidaciones = 0
+        self.reparaciones = 0
+
+    def obtener(self, grafo, origen, peso='distancia', version=0, progreso=None):
+        """
+        Árbol completo desde origen. grafo: lo que recibe DijkstraArbol, o una
+        función sin argumentos que lo devuelve (solo se llama si hay fallo).
+        progreso: se pasa a DijkstraArbol si hay que calcular el árbol.
+        Retorna (arbol, stats, acierto).
+        """
+        clave = (origen, peso, version)
+        hit = self._arboles.get(clave)
+        if hit is not None:
+            self._arboles.move_to_end(clave)
+            self.aciertos += 1
+            return hit[0], hit[1], True
+        self.fallos += 1
+        lag = grafo() if callable(grafo) else grafo
+        arbol, stats = DijkstraArbol(lag, origen, peso=peso if hasattr(lag, 'offsets') else None, progreso=progreso)
+        self._guarda(clave, arbol, stats)
+        return arbol, stats, False
+
+    def consulta(self, grafo, origen, destino=None, peso='distancia', version=0, progreso=None):
+        """Como DijkstraArbol(grafo, origen, destino) pero respondiendo desde la caché. Retorna (arbol, stats)."""
+        t0 = time.time()
+        arbol, stats_arbol, acierto = self.obtener(grafo, origen, peso, version, progreso)
+        stats = dict(stats_arbol)
+        stats["cache"] = "acierto" if acierto else "fallo"
+        if acierto:
+            # esta consulta no exploró nada: solo se leyó el árbol guardado
+            stats.update(nodos_explorados=0, aristas_relajadas=0, tiempo_algo_s=round(time.time() - t0, 6))
+        _resumen_destino(stats, arbol, origen, destino)
+        return arbol, stats
+
+    def _guarda(self, clave, arbol, stats):
+        n = arbol.nbytes
+        if n > self.max_bytes:
+            return
+        self._arboles[clave] = (arbol, stats)
+        self.bytes_usados += n
+        while self.bytes_usados > self.max_bytes:
+            _, (viejo, _) = self._arboles.popitem(last=False)
+            self.bytes_usados -= viejo.nbytes
+            self.desalojos += 1
+
+    def invalida(self, version=None):
+        """Descarta todo (version=None) o solo los árboles de versiones distintas a 'version'."""
+        for clave in [c for c in self._arboles if version is None or c[2] != version]:
+            arbol, _ = self._arboles.pop(clave)
+            self.bytes_usados -= arbol.nbytes
+        self.invalidaciones += 1
+
+    def repara(self, grafo, arcos, peso, version_anterior, version):
+        """
+        Tras trafico.actualiza_pesos: los árboles de version_anterior pasan a
+        'version'. Los de 'peso' se reparan en sitio (grafo: GrafoCSR ya
+        actualizado, arcos: los de actualiza_pesos); los del otro peso siguen
+        valiendo tal cual. Los de otras versiones se descartan.
+        Retorna el stats de cada reparación.
+        """
+        reparaciones = []
+        vigentes = OrderedDict()
+        for (origen, p, v), (arbol, stats) in self._arboles.items():
+            if v != version_anterior:
+                self.bytes_usados -= arbol.nbytes
+                continue
+            if p == peso and arcos:
+                reparaciones.append(repara_arbol(arbol, grafo, arcos, peso))
+            vigentes[(origen, p, version)] = (arbol, stats)
+        self._arboles = vigentes
+        self.reparaciones += len(reparaciones)
+        return reparaciones
+
+    def estadisticas(self):
+        consultas = self.aciertos + self.fallos
+        return {
+            "arboles": len(self._arboles),
+            "bytes_usados": self.bytes_usados,
+            "max_bytes": self.max_bytes,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "desalojos": self.desalojos,
+            "invalidaciones": self.invalidaciones,
+            "reparaciones": self.reparaciones,
+            "tasa_aciertos": round(self.aciertos / consultas, 4) if consultas else 0.0,
+        }
+
+    def __len__(self):
+        return len(self._arboles)
+
+    def __contains__(self, clave):
+        return clave in self._arboles
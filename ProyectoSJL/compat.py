@@ -69,6 +69,8 @@ def convertir_a_lista_vecinos(lista_ady):
     Convierte tu lista_ady {u: [(v,d,t),...], ...} a formato {u: [(v,p),...], ...}
     usando 'distancia' como peso (compatible con Dijkstra en grafos/dijkstra.py).
     """
+    if hasattr(lista_ady, 'ponderado'):
+        return lista_ady.ponderado('distancia', formato='lista')
     out = {}
     for u, vecinos in lista_ady.items():
         out[u] = []
@@ -83,6 +85,8 @@ def convertir_a_diccionario_pesos(lista_ady):
     usado por MSTPrim / MSTKruskal adaptadas al estilo del profesor.
     Peso = distancia (metros).
     """
+    if hasattr(lista_ady, 'ponderado'):
+        return lista_ady.ponderado('distancia', formato='dict')
     out = {}
     for u, vecinos in lista_ady.items():
         if u not in out:
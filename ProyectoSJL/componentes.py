@@ -1,8 +1,278 @@
-# grafos/componentes.py
+"""
+grafos/componentes.py
+Componentes conexas sobre arreglos. Provee:
+- Componentes.desde_grafo(lista_ady) -> unión-búsqueda incremental con una etiqueta por nodo
+  (agrega_arista actualiza sin recalcular; etiquetas(), tamanos(), gigante())
+- componentes_fuertes(lista_ady) -> (nodos, etiquetas, tamanos): SCC con Tarjan iterativo (calles de un sentido)
+- detectar_componentes / obtener_componente_gigante / extraer_subgrafo / bfs_componente (API previa)
+  (extraer_subgrafo de un GrafoCSR o de una vista devuelve una VistaGrafo: máscara, no copia)
+Las componentes (débiles) se arman en una sola pasada lineal sobre los arcos:
+unión por tamaño con compresión por mitades, padres y tamaños en array('i').
+Se ignora el sentido de los arcos; en grafos simétricos (los CSV de SJL)
+coincide con recorrer cada componente por BFS.
+"""
 
+from array import array
 from collections import deque
+from itertools import compress
+
+try:
+    from grafos.csr import ConstructorCSR
+    from grafos.tabla_ids import TablaIds
+    from grafos.vistas import VistaGrafo
+except ImportError:
+    from csr import ConstructorCSR
+    from tabla_ids import TablaIds
+    from vistas import VistaGrafo
+
+
+class Componentes:
+    """
+    Unión-búsqueda sobre los índices de 'nodos' (TablaIds).
+    padre: array('i'), raíz = padre de sí misma
+    tamano: array('i'), válido solo en las raíces
+    mascara: mascara_nodos del grafo (None = todos); los índices fuera de ella
+             no cuentan como componentes hasta que se agreguen
+    """
+
+    def __init__(self, nodos=None, mascara=None):
+        self.nodos = nodos if nodos is not None else TablaIds()
+        self._tabla_propia = nodos is None      # la TablaIds de un grafo no se modifica: se copia al agregar nodos
+        self.mascara = mascara
+        self._mascara_propia = False            # la máscara de un grafo tampoco: se copia al agregar nodos
+        n = len(self.nodos)
+        self.padre = array('i', range(n))
+        self.tamano = array('i', [1]) * n
+        if mascara is None:
+            self.num_componentes = n
+            self._mayor = 0 if n else -1    # raíz de la componente más grande (solo crece)
+        else:
+            self.num_componentes = mascara.count(1)
+            self._mayor = mascara.find(1)
+
+    @classmethod
+    def desde_grafo(cls, lista_ady):
+        """lista_ady: GrafoCSR o {u: [(v, ...), ...]}; una pasada por todos los arcos."""
+        if hasattr(lista_ady, 'offsets'):
+            comp = cls(lista_ady.nodos, lista_ady.mascara_nodos)
+            off, dst, vivos = lista_ady.offsets, lista_ady.destinos, lista_ady.vivos
+            une = comp._une
+            if vivos is None:
+                for u in range(lista_ady.num_nodos):
+                    for k in range(off[u], off[u + 1]):
+                        une(u, dst[k])
+            else:
+                for u in lista_ady.presentes():
+                    ini, fin = off[u], off[u + 1]
+                    for k in compress(range(ini, fin), vivos[ini:fin]):
+                        une(u, dst[k])
+            return comp
+        comp = cls()
+        for u in lista_ady:
+            comp.agrega_nodo(u)
+        for u, vecinos in lista_ady.items():
+            for e in vecinos:
+                comp.agrega_arista(u, e[0])
+        return comp
+
+    # ---------------- unión-búsqueda ----------------
+    def _raiz(self, i):
+        padre = self.padre
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]      # compresión por mitades
+            i = padre[i]
+        return i
+
+    def _une(self, i, j):
+        ri, rj = self._raiz(i), self._raiz(j)
+        if ri == rj:
+            return False
+        tamano = self.tamano
+        if tamano[ri] < tamano[rj]:
+            ri, rj = rj, ri
+        self.padre[rj] = ri
+        tamano[ri] += tamano[rj]
+        self.num_componentes -= 1
+        if rj == self._mayor or tamano[ri] > tamano[self._mayor]:
+            self._mayor = ri
+        return True
+
+    def _indice(self, u):
+        """Índice de u; si es un nodo nuevo se agrega como componente propia."""
+        i = self.nodos.indice.get(u)
+        if i is not None:
+            if self.mascara is not None and not self.mascara[i]:
+                if not self._mascara_propia:
+                    self.mascara = bytearray(self.mascara)
+                    self._mascara_propia = True
+                self.mascara[i] = 1
+                self.num_componentes += 1
+                if self._mayor < 0:
+                    self._mayor = i
+            return i
+        if not self._tabla_propia:
+            self.nodos = TablaIds(self.nodos.ids)
+            self._tabla_propia = True
+        i = self.nodos.interna(u)
+        if i == len(self.padre):
+            self.padre.append(i)
+            self.tamano.append(1)
+            if self.mascara is not None:
+                if not self._mascara_propia:
+                    self.mascara = bytearray(self.mascara)
+                    self._mascara_propia = True
+                self.mascara.append(1)
+            self.num_componentes += 1
+            if self._mayor < 0:
+                self._mayor = i
+        return i
+
+    # ---------------- actualizaciones ----------------
+    def agrega_nodo(self, u):
+        self._indice(u)
+
+    def agrega_arista(self, u, v):
+        """Agrega la arista u - v (nodos nuevos incluidos). True si unió dos componentes."""
+        return self._une(self._indice(u), self._indice(v))
+
+    # ---------------- consultas ----------------
+    def _presente(self, u):
+        i = self.nodos.indice[u]
+        if self.mascara is not None and not self.mascara[i]:
+            raise KeyError(u)
+        return i
+
+    def _indices(self):
+        n = len(self.padre)
+        return range(n) if self.mascara is None else compress(range(n), self.mascara)
+
+    def etiqueta(self, u):
+        """Representante de la componente de u (cambia solo cuando su componente se une a otra)."""
+        return self.nodos[self._raiz(self._presente(u))]
+
+    def conectados(self, u, v):
+        return self._raiz(self._presente(u)) == self._raiz(self._presente(v))
+
+    def tamano_de(self, u):
+        return self.tamano[self._raiz(self._presente(u))]
+
+    def etiquetas(self):
+        """
+        (etiquetas, tamanos): etiquetas array('i') por índice de nodo, numeradas
+        0..k-1 por orden de aparición (-1 fuera de la máscara); tamanos[c] =
+        nodos de la componente c.
+        """
+        n = len(self.padre)
+        etiquetas = array('i', [-1]) * n
+        de_raiz = {}
+        tamanos = []
+        for i in self._indices():
+            r = self._raiz(i)
+            c = de_raiz.get(r)
+            if c is None:
+                c = de_raiz[r] = len(tamanos)
+                tamanos.append(self.tamano[r])
+            etiquetas[i] = c
+        return etiquetas, tamanos
+
+    def tamanos(self):
+        """Tamaño de cada componente, de mayor a menor."""
+        padre, tamano = self.padre, self.tamano
+        return sorted((tamano[i] for i in self._indices() if padre[i] == i), reverse=True)
+
+    def miembros(self, u):
+        """Conjunto de ids de la componente de u."""
+        r = self._raiz(self._presente(u))
+        ids = self.nodos.ids
+        return {ids[i] for i in self._indices() if self._raiz(i) == r}
+
+    def gigante(self):
+        """Conjunto de ids de la componente más grande (vacío si no hay nodos)."""
+        if self._mayor < 0:
+            return set()
+        return self.miembros(self.nodos[self._mayor])
+
+    def conjuntos(self):
+        """Lista de conjuntos de ids, una por componente, en orden de aparición."""
+        etiquetas, tamanos = self.etiquetas()
+        grupos = [set() for _ in tamanos]
+        ids = self.nodos.ids
+        for i, c in enumerate(etiquetas):
+            if c >= 0:
+                grupos[c].add(ids[i])
+        return grupos
+
+
+def componentes_fuertes(lista_ady):
+    """
+    Componentes fuertemente conexas (respetan el sentido de los arcos) con
+    Tarjan iterativo: sin recursión, una pila explícita de llamadas y el
+    próximo arco de cada nodo en un arreglo.
+    Retorna (nodos, etiquetas, tamanos): etiquetas array('i') por índice de nodos
+    (-1 para los que la máscara del grafo deja afuera).
+    """
+    if hasattr(lista_ady, 'offsets'):
+        g = lista_ady
+    else:
+        cons = ConstructorCSR(TablaIds(lista_ady))
+        for u, vecinos in lista_ady.items():
+            for e in vecinos:
+                cons.arco(u, e[0], 0.0, 0.0)
+        g = cons.construir()
+    V = g.num_nodos
+    off, dst, vivos = g.offsets, g.destinos, g.vivos
+    orden = array('i', [-1]) * V            # orden de descubrimiento
+    bajo = array('i', bytes(4 * V))         # menor orden alcanzable (low-link)
+    sig = array('q', off[:V]) if V else array('q')   # próximo arco a revisar
+    en_pila = bytearray(V)
+    etiquetas = array('i', [-1]) * V
+    tamanos = []
+    pila = []
+    contador = 0
+    for s in g.presentes():
+        if orden[s] >= 0:
+            continue
+        orden[s] = bajo[s] = contador; contador += 1
+        pila.append(s); en_pila[s] = 1
+        llamadas = [s]
+        while llamadas:
+            u = llamadas[-1]
+            k = sig[u]
+            if k < off[u + 1]:
+                sig[u] = k + 1
+                if vivos is not None and not vivos[k]:
+                    continue
+                v = dst[k]
+                if orden[v] < 0:
+                    orden[v] = bajo[v] = contador; contador += 1
+                    pila.append(v); en_pila[v] = 1
+                    llamadas.append(v)
+                elif en_pila[v] and orden[v] < bajo[u]:
+                    bajo[u] = orden[v]
+                continue
+            llamadas.pop()
+            if llamadas:
+                p = llamadas[-1]
+                if bajo[u] < bajo[p]:
+                    bajo[p] = bajo[u]
+            if bajo[u] == orden[u]:
+                c = len(tamanos)
+                n = 0
+                while True:
+                    x = pila.pop()
+                    en_pila[x] = 0
+                    etiquetas[x] = c
+                    n += 1
+                    if x == u:
+                        break
+                tamanos.append(n)
+    return g.nodos, etiquetas, tamanos
+
 
 def bfs_componente(lista_ady, inicio):
+    if hasattr(lista_ady, 'offsets'):
+        g = lista_ady
+        return {g.ids[i] for i in _bfs_indices(g, g.indice_de(inicio), bytearray(g.num_nodos))}
     visitados = set([inicio])
     cola = deque([inicio])
     while cola:
@@ -13,19 +283,30 @@ def bfs_componente(lista_ady, inicio):
                 cola.append(v)
     return visitados
 
+def _bfs_indices(g, s, marcados):
+    """BFS sobre índices del GrafoCSR; marca en 'marcados' y devuelve los índices alcanzados."""
+    off, dst, vivos = g.offsets, g.destinos, g.vivos
+    marcados[s] = 1
+    alcanzados = [s]
+    cola = deque([s])
+    while cola:
+        u = cola.popleft()
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if not marcados[v]:
+                marcados[v] = 1
+                alcanzados.append(v)
+                cola.append(v)
+    return alcanzados
+
 def detectar_componentes(lista_ady):
-    visitados_global = set()
-    componentes = []
-    for nodo in lista_ady.keys():
-        if nodo not in visitados_global:
-            comp = bfs_componente(lista_ady, nodo)
-            componentes.append(comp)
-            visitados_global |= comp
-    return componentes
-
-def obtener_componente_gigante(lista_ady):
-    componentes = detectar_componentes(lista_ady)
-    gigante = max(componentes, key=len)
+    """Lista de conjuntos de nodos, una por componente (ver Componentes)."""
+    return Componentes.desde_grafo(lista_ady).conjuntos()
+
+def obtener_componente_gigante(lista_ady, componentes=None):
+    """componentes: (opcional) Componentes ya calculadas del mismo grafo."""
+    gigante = (componentes or Componentes.desde_grafo(lista_ady)).gigante()
 
     # ★ PARCHE: nodo defectuoso detectado en OSM SJL
     if 1278939002 in gigante:
@@ -34,6 +315,8 @@ def obtener_componente_gigante(lista_ady):
     return gigante
 
 def extraer_subgrafo(lista_ady, nodos):
+    if isinstance(lista_ady, VistaGrafo) or hasattr(lista_ady, 'offsets'):
+        return VistaGrafo.por_nodos(lista_ady, nodos)
     sub = {}
     for u in nodos:
         if u in lista_ady:
@@ -0,0 +1,398 @@
+"""
+grafos/contraccion.py
+Contraction Hierarchies (CH) para responder muchas consultas origen -> destino
+sobre el mismo grafo estático. Provee:
+- JerarquiaContraccion.construir(grafo, peso) -> jerarquía (orden de nodos + atajos)
+- jerarquia.consulta(origen, destino) -> (distancia_total, ruta, stats)
+- jerarquia.guarda(ruta) / JerarquiaContraccion.carga(ruta, grafo=None)
+- ruta_jerarquia(aristas_csv, peso) -> archivo junto al CSV
+- jerarquia_para(grafo, aristas_csv, peso) -> la carga si está vigente, si no la construye y guarda
+Preprocesamiento: se contraen los nodos de menor a mayor importancia (diferencia
+de aristas + vecinos ya contraídos, con actualización perezosa). Al contraer v se
+agrega el atajo u -> x (con nodo medio v) solo si la búsqueda de testigos no
+encuentra un camino u -> x igual de corto sin pasar por v.
+Consulta: Dijkstra bidireccional que solo sube de rango (hacia adelante desde el
+origen, hacia atrás desde el destino). Los atajos se desempacan a la secuencia
+original de nodos OSM y la distancia se suma sobre esos arcos en orden, igual
+que Dijkstra: para la misma ruta el total coincide bit a bit (con empates, otra
+ruta de igual largo puede diferir en el último decimal).
+"""
+
+import hashlib
+import heapq
+import os
+import time
+from array import array
+from itertools import compress
+
+try:
+    from grafos.binario import escribe_secciones, abre_secciones
+    from grafos.csr import csr_desde_lista
+    from grafos.tabla_ids import TablaIds
+except ImportError:
+    from binario import escribe_secciones, abre_secciones
+    from csr import csr_desde_lista
+    from tabla_ids import TablaIds
+
+INF = float('inf')
+LIMITE_TESTIGO = 400          # nodos que puede fijar cada búsqueda de testigos
+
+
+def ruta_jerarquia(aristas_csv, peso='distancia'):
+    """grafo_sjl_osm.csv -> grafo_sjl_osm.ch_distancia (misma carpeta)."""
+    return f'{os.path.splitext(aristas_csv)[0]}.ch_{peso}'
+
+
+def firma_grafo(g, peso):
+    """Identifica grafo + pesos (+ máscara de arcos): una jerarquía solo sirve para el grafo con que se construyó."""
+    h = hashlib.sha1()
+    for arr in (g.offsets, g.destinos, g.pesos(peso)):
+        h.update(memoryview(arr).cast('B'))
+    if g.vivos is not None:
+        h.update(g.vivos)
+    return h.hexdigest()
+
+
+def jerarquia_para(grafo, aristas_csv, peso='distancia'):
+    """Jerarquía guardada junto al CSV si corresponde a este grafo; si no, se construye y se guarda."""
+    ruta = ruta_jerarquia(aristas_csv, peso)
+    if os.path.exists(ruta):
+        try:
+            return JerarquiaContraccion.carga(ruta, grafo)
+        except (ValueError, KeyError, OSError):
+            pass
+    ch = JerarquiaContraccion.construir(grafo, peso)
+    ch.guarda(ruta)
+    return ch
+
+
+class JerarquiaContraccion:
+
+    def __init__(self, nodos, rango, subir, bajar, peso, firma=None):
+        self.nodos = nodos          # TablaIds
+        self.rango = rango          # array('i'): orden de contracción por nodo
+        self.subir = subir          # (off, dst, w, medio): u -> v con rango[v] > rango[u], guardado en u
+        self.bajar = bajar          # (off, dst, w, medio): u -> v con rango[u] > rango[v], guardado en v (dst = u)
+        self.peso = peso
+        self.firma = firma
+        self.stats = {}
+
+    # ---------------- preprocesamiento ----------------
+    @classmethod
+    def construir(cls, grafo, peso=None, limite_testigo=LIMITE_TESTIGO):
+        """
+        grafo: GrafoCSR o {u: [(v,p), ...]}
+        peso: 'distancia' o 'tiempo' (por defecto el de la vista); con dict solo es la etiqueta
+        limite_testigo: nodos que fija cada búsqueda de testigos (más = menos atajos, preproceso más lento)
+        """
+        t0 = time.time()
+        if hasattr(grafo, 'offsets'):
+            g = grafo
+            peso = peso or g.peso or 'distancia'
+        else:
+            g = csr_desde_lista(grafo)             # el peso p queda como está
+            peso = peso or 'distancia'
+        V = g.num_nodos
+        off, dst, w, vivos = g.offsets, g.destinos, g.pesos(peso), g.vivos
+
+        # grafo de trabajo: salientes/entrantes por nodo {vecino: (peso, medio)}; se queda el menor paralelo
+        sal = [dict() for _ in range(V)]
+        ent = [dict() for _ in range(V)]
+        for u in g.presentes():
+            su = sal[u]
+            ini, fin = off[u], off[u + 1]
+            for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+                v = dst[k]
+                if v == u:
+                    continue
+                if v not in su or w[k] < su[v][0]:
+                    su[v] = (w[k], -1)
+                    ent[v][u] = (w[k], -1)
+
+        # arcos definitivos de la jerarquía: (u, v, peso, medio)
+        arcos_u, arcos_v, arcos_w, arcos_m = array('i'), array('i'), array('d'), array('i')
+        contraido = bytearray(V)
+        vecinos_contraidos = array('i', bytes(4 * V))
+        rango = array('i', [-1]) * V
+
+        def testigos(u, v, objetivos, tope):
+            """Distancias desde u sin pasar por v (acotada por tope y limite_testigo)."""
+            dist = {u: 0.0}
+            heap = [(0.0, u)]
+            fijados = 0
+            pendientes = set(objetivos)
+            while heap and pendientes and fijados < limite_testigo:
+                d, x = heapq.heappop(heap)
+                if d > dist[x]:
+                    continue
+                if d > tope:
+                    break
+                fijados += 1
+                pendientes.discard(x)
+                for y, (wy, _) in sal[x].items():
+                    if y == v:
+                        continue
+                    nd = d + wy
+                    if nd < dist.get(y, INF):
+                        dist[y] = nd
+                        heapq.heappush(heap, (nd, y))
+            return dist
+
+        def atajos(v):
+            """Atajos necesarios al contraer v: lista de (u, x, peso)."""
+            nuevos = []
+            salientes = sal[v]
+            if not salientes:
+                return nuevos
+            tope_sal = max(wx for wx, _ in salientes.values())
+            for u, (wu, _) in ent[v].items():
+                objetivos = [x for x in salientes if x != u]
+                if not objetivos:
+                    continue
+                dist = testigos(u, v, objetivos, wu + tope_sal)
+                for x in objetivos:
+                    via = wu + salientes[x][0]
+                    if dist.get(x, INF) > via:
+                        nuevos.append((u, x, via))
+            return nuevos
+
+        def prioridad(v):
+            return len(atajos(v)) - len(sal[v]) - len(ent[v]) + vecinos_contraidos[v]
+
+        heap = [(prioridad(v), v) for v in g.presentes()]   # los de fuera de la máscara quedan con rango -1
+        heapq.heapify(heap)
+        n_atajos = 0
+        siguiente = 0
+        while heap:
+            p, v = heapq.heappop(heap)
+            if contraido[v]:
+                continue
+            # actualización perezosa: si empeoró, vuelve a la cola
+            actual = prioridad(v)
+            if heap and actual > heap[0][0]:
+                heapq.heappush(heap, (actual, v))
+                continue
+            nuevos = atajos(v)
+            # los arcos de v pasan a la jerarquía
+            for x, (wx, m) in sal[v].items():
+                arcos_u.append(v); arcos_v.append(x); arcos_w.append(wx); arcos_m.append(m)
+                del ent[x][v]
+            for u, (wu, m) in ent[v].items():
+                arcos_u.append(u); arcos_v.append(v); arcos_w.append(wu); arcos_m.append(m)
+                del sal[u][v]
+            vecinos = set(sal[v]) | set(ent[v])
+            sal[v] = {}
+            ent[v] = {}
+            for u, x, via in nuevos:
+                if x not in sal[u] or via < sal[u][x][0]:
+                    sal[u][x] = (via, v)
+                    ent[x][u] = (via, v)
+                    n_atajos += 1
+            contraido[v] = 1
+            rango[v] = siguiente
+            siguiente += 1
+            for x in vecinos:
+                vecinos_contraidos[x] += 1
+
+        subir, bajar = _arma_grafos(V, rango, arcos_u, arcos_v, arcos_w, arcos_m)
+        ch = cls(g.nodos, rango, subir, bajar, peso, firma_grafo(g, peso))
+        ch.stats = {
+            "algoritmo": "Contraction Hierarchies (preproceso)",
+            "V": len(g),
+            "E_aproximado": g.arcos_presentes // 2,
+            "atajos": n_atajos,
+            "arcos_jerarquia": len(arcos_u),
+            "tiempo_algo_s": round(time.time() - t0, 6),
+        }
+        return ch
+
+    # ---------------- consulta ----------------
+    def consulta(self, origen, destino):
+        """Dijkstra bidireccional hacia arriba. Retorna (distancia_total, ruta, stats)."""
+        t0 = time.time()
+        V = len(self.rango)
+        s, t = self.nodos.indice[origen], self.nodos.indice[destino]
+        for nodo, i in ((origen, s), (destino, t)):
+            if self.rango[i] < 0:
+                raise KeyError(nodo)        # fuera de la máscara del grafo con que se construyó
+        lados = (self.subir, self.bajar)
+        dist = ({s: 0.0}, {t: 0.0})
+        padre = ({s: -1}, {t: -1})           # índice del arco usado para llegar
+        heaps = ([(0.0, s)], [(0.0, t)])
+        fijados = (set(), set())
+        explorados = [0, 0]
+        aristas_relajadas = 0
+        mejor, encuentro = INF, -1
+        while heaps[0] or heaps[1]:
+            # cada lado se apaga solo cuando su mínimo ya no puede mejorar 'mejor'
+            activos = [l for l in (0, 1) if heaps[l] and heaps[l][0][0] < mejor]
+            if not activos:
+                break
+            lado = min(activos, key=lambda l: heaps[l][0][0])
+            d, u = heapq.heappop(heaps[lado])
+            if u in fijados[lado] or d > dist[lado][u]:
+                continue
+            fijados[lado].add(u)
+            explorados[lado] += 1
+            otro = dist[1 - lado].get(u)
+            if otro is not None and d + otro < mejor:
+                mejor, encuentro = d + otro, u
+            off, dst, w, _ = lados[lado]
+            d_lado, p_lado = dist[lado], padre[lado]
+            for k in range(off[u], off[u + 1]):
+                v = dst[k]
+                nd = d + w[k]
+                aristas_relajadas += 1
+                if nd < d_lado.get(v, INF):
+                    d_lado[v] = nd
+                    p_lado[v] = k
+                    heapq.heappush(heaps[lado], (nd, v))
+
+        ruta_idx = []
+        distancia_total = INF
+        if encuentro >= 0:
+            ruta_idx, distancia_total = self._desempaca_ruta(s, t, encuentro, padre)
+        t1 = time.time()
+        ruta = self.nodos.externos(ruta_idx)
+        stats = {
+            "algoritmo": "Contraction Hierarchies",
+            "V": V,
+            "nodos_explorados": explorados[0] + explorados[1],
+            "nodos_explorados_adelante": explorados[0],
+            "nodos_explorados_atras": explorados[1],
+            "aristas_relajadas": aristas_relajadas,
+            "tiempo_algo_s": round(t1 - t0, 6),
+            "complejidad_teorica": "O(k log k), k = nodos del espacio de búsqueda hacia arriba",
+            "origen": origen,
+            "destino": destino,
+            "distancia_total": distancia_total,
+            "tiempo_estimado_min": None,
+            "largo_camino_nodos": len(ruta),
+            "ruta": ruta
+        }
+        return distancia_total, ruta, stats
+
+    def _desempaca_ruta(self, s, t, m, padre):
+        soff, sdst, sw, smed = self.subir
+        boff, bdst, bw, bmed = self.bajar
+        # origen -> m: arcos de 'subir' (cola u, cabeza dst[k])
+        tramo = []
+        x = m
+        while padre[0][x] != -1:
+            k = padre[0][x]
+            u = _cola(soff, k)
+            tramo.append((u, x, smed[k], sw[k]))
+            x = u
+        tramo.reverse()
+        # m -> destino: arcos de 'bajar' (guardados en la cabeza, dst[k] = cola)
+        x = m
+        while padre[1][x] != -1:
+            k = padre[1][x]
+            v = _cola(boff, k)
+            tramo.append((x, v, bmed[k], bw[k]))
+            x = v
+        ruta = [s]
+        total = 0.0
+        for u, v, medio, peso in tramo:
+            for a, b, wab in self._desempaca(u, v, medio, peso):
+                ruta.append(b)
+                total += wab
+        return ruta, total
+
+    def _arco(self, u, v):
+        """(peso, medio) del menor arco u -> v en la jerarquía."""
+        if self.rango[v] > self.rango[u]:
+            off, dst, w, med = self.subir
+            base, otro = u, v
+        else:
+            off, dst, w, med = self.bajar
+            base, otro = v, u
+        mejor = None
+        for k in range(off[base], off[base + 1]):
+            if dst[k] == otro and (mejor is None or w[k] < mejor[0]):
+                mejor = (w[k], med[k])
+        return mejor
+
+    def _desempaca(self, u, v, medio, peso):
+        """Arcos originales (a, b, peso) que forman el arco u -> v, en orden."""
+        pila = [(u, v, medio, peso)]
+        while pila:
+            a, b, m, wab = pila.pop()
+            if m < 0:
+                yield a, b, wab
+                continue
+            w2, m2 = self._arco(m, b)
+            w1, m1 = self._arco(a, m)
+            pila.append((m, b, m2, w2))
+            pila.append((a, m, m1, w1))
+
+    # ---------------- persistencia ----------------
+    def guarda(self, ruta):
+        secs = {'rango': self.rango}
+        for nombre, (off, dst, w, med) in (('subir', self.subir), ('bajar', self.bajar)):
+            secs[nombre + '_off'] = off; secs[nombre + '_dst'] = dst
+            secs[nombre + '_w'] = w; secs[nombre + '_medio'] = med
+        if self.nodos.numerica:
+            secs['ids'] = self.nodos.ids
+            ids_json = None
+        else:
+            ids_json = list(self.nodos.ids)
+        meta = {'tipo': 'jerarquia_contraccion', 'peso': self.peso, 'firma': self.firma,
+                'ids_json': ids_json, 'stats': self.stats}
+        escribe_secciones(ruta, meta, secs)
+
+    @classmethod
+    def carga(cls, ruta, grafo=None):
+        """Abre la jerarquía con mmap; si se pasa el grafo, verifica que sea el mismo."""
+        meta, secs = abre_secciones(ruta)
+        if meta.get('tipo') != 'jerarquia_contraccion':
+            raise ValueError(f'{ruta} no es una jerarquía de contracción')
+        if grafo is not None and meta['firma'] != firma_grafo(grafo, meta['peso']):
+            raise ValueError(f'{ruta} fue construida para otro grafo o con otros pesos')
+        nodos = TablaIds.desde_secuencia(secs['ids'] if 'ids' in secs else meta['ids_json'])
+        lado = lambda n: (secs[n + '_off'], secs[n + '_dst'], secs[n + '_w'], secs[n + '_medio'])
+        ch = cls(nodos, secs['rango'], lado('subir'), lado('bajar'), meta['peso'], meta['firma'])
+        ch.stats = meta.get('stats', {})
+        return ch
+
+
+def _cola(off, k):
+    """Nodo dueño del arco k en un CSR (búsqueda binaria sobre offsets)."""
+    lo, hi = 0, len(off) - 2
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if off[mid] <= k:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def _arma_grafos(V, rango, au, av, aw, am):
+    """Separa los arcos de la jerarquía en los CSR 'subir' y 'bajar'."""
+    E = len(au)
+    cont_s = array('q', bytes(8 * (V + 1)))
+    cont_b = array('q', bytes(8 * (V + 1)))
+    for k in range(E):
+        if rango[av[k]] > rango[au[k]]:
+            cont_s[au[k] + 1] += 1
+        else:
+            cont_b[av[k] + 1] += 1
+    for i in range(V):
+        cont_s[i + 1] += cont_s[i]
+        cont_b[i + 1] += cont_b[i]
+    def vacio(n):
+        return array('i', bytes(4 * n)), array('d', bytes(8 * n)), array('i', bytes(4 * n))
+    s_dst, s_w, s_med = vacio(cont_s[V])
+    b_dst, b_w, b_med = vacio(cont_b[V])
+    pos_s = array('q', cont_s[:V]) if V else array('q')
+    pos_b = array('q', cont_b[:V]) if V else array('q')
+    for k in range(E):
+        u, v = au[k], av[k]
+        if rango[v] > rango[u]:
+            p = pos_s[u]; pos_s[u] = p + 1
+            s_dst[p] = v; s_w[p] = aw[k]; s_med[p] = am[k]
+        else:
+            p = pos_b[v]; pos_b[v] = p + 1
+            b_dst[p] = u; b_w[p] = aw[k]; b_med[p] = am[k]
+    return (cont_s, s_dst, s_w, s_med), (cont_b, b_dst, b_w, b_med)
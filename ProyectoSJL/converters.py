@@ -1,5 +1,7 @@
 """
 Convertidores: lista_ady -> formatos usados por algoritmos.
+Si lista_ady es un GrafoCSR no se copia nada: se devuelve una vista ponderada
+que comparte los arreglos y que los algoritmos recorren directamente.
 """
 def lista_ady_to_dict_dict(lista_ady, weight_type="distancia"):
     """
@@ -10,6 +12,9 @@ def lista_ady_to_dict_dict(lista_ady, weight_type="distancia"):
     Garantizando que TODOS los nodos estén presentes,
     incluso los que no tienen aristas salientes.
     """
+    if hasattr(lista_ady, 'ponderado'):
+        return lista_ady.ponderado(weight_type, formato='dict')
+
     lag = {}
 
     # Crear claves vacías para todos los nodos
@@ -38,6 +43,8 @@ def lista_ady_to_dict_dict(lista_ady, weight_type="distancia"):
 
 
 def lista_ady_to_list_weighted(lista_ady, weight_type='distancia'):
+    if hasattr(lista_ady, 'ponderado'):
+        return lista_ady.ponderado(weight_type, formato='lista')
     out = {}
     for u, vecinos in lista_ady.items():
         out[u] = []
@@ -0,0 +1,435 @@
+"""
+grafos/csr.py
+Grafo compacto en formato CSR (compressed sparse row). Provee:
+- GrafoCSR: offsets, destinos, distancias y tiempos en arreglos tipados contiguos.
+  Además se comporta como lista_ady ({u: [(v,d,t), ...]}) para el código que aún
+  recorre diccionarios (guarda_csvs, plots, etc.). Puede llevar máscaras de
+  nodos y arcos (ver vistas.py): mismos arreglos e índices, menos nodos y arcos.
+- ConstructorCSR: acumula aristas en buffers y arma el GrafoCSR una sola vez.
+- CoordenadasCSR: nodos_info ({u: (lon,lat)}) respaldado por dos arreglos.
+- abre_grafo_binario(ruta) -> (GrafoCSR, CoordenadasCSR) mapeado desde la caché
+- csr_desde_lista(lag) -> GrafoCSR a partir de {u: [(v,p), ...]}
+- es_csr(obj) -> bool
+"""
+
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+import copy, json, math, os
+
+try:
+    from grafos.tabla_ids import TablaIds
+    from grafos.binario import abre_secciones
+except ImportError:
+    from tabla_ids import TablaIds
+    from binario import abre_secciones
+
+
+def es_csr(grafo):
+    """True si el grafo expone la representación CSR (arreglos offsets/destinos)."""
+    return getattr(grafo, 'offsets', None) is not None and hasattr(grafo, 'destinos')
+
+
+def csr_desde_lista(lag):
+    """{u: [(v,p), ...]} -> GrafoCSR con el peso p en 'distancias' y 'tiempos' (una sola pasada)."""
+    cons = ConstructorCSR(TablaIds(lag))
+    for u, vecinos in lag.items():
+        for v, p in vecinos:
+            cons.arco(u, v, p, p)
+    return cons.construir()
+
+
+class GrafoCSR(Mapping):
+    """
+    Grafo en formato CSR. Los vecinos del nodo de índice i son
+    destinos[offsets[i]:offsets[i+1]] con pesos distancias[k] / tiempos[k].
+
+    formato indica qué devuelve grafo[u] al usarlo como diccionario:
+    - 'triple': [(v, dist, tiempo), ...]   (igual que lista_ady)
+    - 'lista':  [(v, peso), ...]           (igual que lista_ady_to_list_weighted)
+    - 'dict':   {v: peso, ...}             (igual que lista_ady_to_dict_dict)
+
+    Con mascara_nodos / vivos (las pone VistaGrafo) el grafo es un subgrafo de
+    los mismos arreglos: los índices no cambian, los caminos rápidos saltean
+    los arcos con vivos[k] == 0 y los nodos con mascara_nodos[i] == 0, y como
+    diccionario solo aparecen los nodos y arcos presentes. num_nodos y
+    num_arcos siguen siendo el largo de los arreglos; len(grafo) cuenta los
+    nodos presentes y arcos_presentes los arcos.
+    """
+
+    def __init__(self, nodos, offsets, destinos, distancias, tiempos):
+        if not isinstance(nodos, TablaIds):
+            nodos = TablaIds(nodos)
+        self.nodos = nodos                      # TablaIds: índice -> id externo
+        self.offsets = offsets                  # array('q'), largo V+1
+        self.destinos = destinos                # array('i'), largo E (arcos dirigidos)
+        self.distancias = distancias            # array('d'), metros
+        self.tiempos = tiempos                  # array('d'), minutos
+        self.peso = None                        # peso por defecto de la vista
+        self.formato = 'triple'
+        self.ruta_binaria = None                # archivo mapeado si viene de la caché
+        self.simetrico = None                   # True si cada u->v tiene su v->u (None = no se sabe)
+        self.mascara_nodos = None               # bytearray(V): 1 = nodo presente (None = todos)
+        self.vivos = None                       # bytearray(E): 1 = arco presente, con sus dos extremos (None = todos)
+        self._presentes = None
+        self._transpuesto = None
+
+    @property
+    def indice(self):
+        """Diccionario id externo -> índice."""
+        return self.nodos.indice
+
+    @property
+    def ids(self):
+        """Secuencia índice -> id externo (array('q') o lista), para bucles internos."""
+        return self.nodos.ids
+
+    # ---------------- tamaño ----------------
+    @property
+    def num_nodos(self):
+        return len(self.nodos)
+
+    @property
+    def num_arcos(self):
+        return len(self.destinos)
+
+    @property
+    def arcos_presentes(self):
+        """Arcos que dejan las máscaras (num_arcos si no hay)."""
+        return self.num_arcos if self.vivos is None else self.vivos.count(1)
+
+    def indice_de(self, u):
+        """Índice de u; KeyError si no está o la máscara lo deja afuera."""
+        i = self.nodos.indice[u]
+        if self.mascara_nodos is not None and not self.mascara_nodos[i]:
+            raise KeyError(u)
+        return i
+
+    def presentes(self):
+        """Índices de los nodos presentes (todos si no hay máscara de nodos)."""
+        mn = self.mascara_nodos
+        return range(len(self.nodos)) if mn is None else compress(range(len(mn)), mn)
+
+    # ---------------- pesos y vistas ----------------
+    def pesos(self, peso=None):
+        """Arreglo de pesos por arco ('distancia' o 'tiempo')."""
+        peso = peso or self.peso or 'distancia'
+        return self.distancias if peso == 'distancia' else self.tiempos
+
+    def ponderado(self, peso='distancia', formato='lista'):
+        """Vista que comparte los arreglos pero fija el peso y el formato de grafo[u]."""
+        vista = copy.copy(self)
+        vista.peso = peso
+        vista.formato = formato
+        return vista
+
+    # ---------------- copia y pickle ----------------
+    def __copy__(self):
+        vista = object.__new__(type(self))
+        vista.__dict__.update(self.__dict__)
+        return vista
+
+    def __reduce_ex__(self, protocolo):
+        # Si los arreglos están mapeados desde la caché, otro proceso (o deepcopy)
+        # vuelve a abrir el mismo archivo: se comparten páginas, no se copian bytes.
+        # Pesos ya copiados fuera del archivo (tráfico en vivo, ver trafico.py) viajan en el estado.
+        if self.ruta_binaria is not None:
+            estado = {k: v for k, v in self.__dict__.items()
+                      if k not in _CAMPOS_BINARIOS or (k in _CAMPOS_PESOS and not isinstance(v, memoryview))}
+            return (_abre_grafo, (self.ruta_binaria,), estado)
+        return super().__reduce_ex__(protocolo)
+
+    def secciones(self):
+        """Arreglos a persistir con binario.escribe_secciones."""
+        secs = {'offsets': self.offsets, 'destinos': self.destinos,
+                'distancias': self.distancias, 'tiempos': self.tiempos,
+                'banderas': array('B', [{True: 1, False: 0}.get(self.simetrico, 2)])}
+        if self.nodos.numerica:
+            secs['ids'] = self.nodos.ids
+        else:
+            secs['ids_json'] = array('B', json.dumps(list(self.nodos.ids)).encode('utf-8'))
+        if self.mascara_nodos is not None:
+            secs['mascara_nodos'] = self.mascara_nodos
+        if self.vivos is not None:
+            secs['vivos'] = self.vivos
+        return secs
+
+    @classmethod
+    def desde_secciones(cls, secs, ruta=None):
+        if 'ids' in secs:
+            tabla = TablaIds.desde_secuencia(secs['ids'])
+        else:
+            tabla = TablaIds.desde_secuencia(json.loads(bytes(secs['ids_json']).decode('utf-8')))
+        grafo = cls(tabla, secs['offsets'], secs['destinos'], secs['distancias'], secs['tiempos'])
+        grafo.ruta_binaria = ruta
+        if 'banderas' in secs:
+            grafo.simetrico = {1: True, 0: False}.get(secs['banderas'][0])
+        if 'mascara_nodos' in secs:
+            grafo.mascara_nodos = bytearray(secs['mascara_nodos'])
+        if 'vivos' in secs:
+            grafo.vivos = bytearray(secs['vivos'])
+        return grafo
+
+    # ---------------- interfaz tipo diccionario ----------------
+    def __len__(self):
+        mn = self.mascara_nodos
+        if mn is None:
+            return len(self.nodos)
+        if self._presentes is None:
+            self._presentes = mn.count(1)
+        return self._presentes
+
+    def __iter__(self):
+        mn = self.mascara_nodos
+        return iter(self.nodos) if mn is None else compress(self.ids, mn)
+
+    def __contains__(self, u):
+        i = self.indice.get(u)
+        return i is not None and (self.mascara_nodos is None or self.mascara_nodos[i] == 1)
+
+    def __getitem__(self, u):
+        i = self.indice[u]
+        mn, vivos = self.mascara_nodos, self.vivos
+        if mn is not None and not mn[i]:
+            raise KeyError(u)
+        ini, fin = self.offsets[i], self.offsets[i + 1]
+        arcos = range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])
+        nodos, dst = self.ids, self.destinos
+        if self.formato == 'triple':
+            dis, tie = self.distancias, self.tiempos
+            return [(nodos[dst[k]], dis[k], tie[k]) for k in arcos]
+        w = self.pesos()
+        if self.formato == 'dict':
+            return {nodos[dst[k]]: w[k] for k in arcos}
+        return [(nodos[dst[k]], w[k]) for k in arcos]
+
+    # ---------------- utilidades ----------------
+    def grado(self, i):
+        ini, fin = self.offsets[i], self.offsets[i + 1]
+        return fin - ini if self.vivos is None else self.vivos[ini:fin].count(1)
+
+    def transpuesto(self):
+        """
+        Grafo con los arcos invertidos (misma TablaIds, mismos índices), para
+        búsquedas hacia atrás. Si el grafo es simétrico es él mismo; si no, se
+        arma una vez y queda guardado.
+        """
+        if self.simetrico:
+            return self
+        if self._transpuesto is None:
+            V, E = self.num_nodos, self.num_arcos
+            off, dst = self.offsets, self.destinos
+            offsets = array('q', bytes(8 * (V + 1)))
+            for v in dst:
+                offsets[v + 1] += 1
+            for i in range(V):
+                offsets[i + 1] += offsets[i]
+            pos = array('q', offsets[:V]) if V else array('q')
+            destinos = array('i', bytes(4 * E))
+            distancias = array('d', bytes(8 * E))
+            tiempos = array('d', bytes(8 * E))
+            dis, tie = self.distancias, self.tiempos
+            vivos = self.vivos
+            vivos_inv = None if vivos is None else bytearray(E)
+            for u in range(V):
+                for k in range(off[u], off[u + 1]):
+                    v = dst[k]
+                    p = pos[v]
+                    pos[v] = p + 1
+                    destinos[p] = u
+                    distancias[p] = dis[k]
+                    tiempos[p] = tie[k]
+                    if vivos is not None:
+                        vivos_inv[p] = vivos[k]
+            inv = GrafoCSR(self.nodos, offsets, destinos, distancias, tiempos)
+            inv.peso, inv.formato = self.peso, self.formato
+            inv.mascara_nodos, inv.vivos = self.mascara_nodos, vivos_inv
+            inv._transpuesto = self
+            self._transpuesto = inv
+        return self._transpuesto
+
+    def subgrafo(self, nodos):
+        """Nuevo GrafoCSR (compacto) inducido por el conjunto de nodos (ids externos)."""
+        cons = ConstructorCSR()
+        dentro = bytearray(self.num_nodos)
+        for n in self:
+            if n in nodos:
+                dentro[self.indice[n]] = 1
+                cons.nodo(n)
+        off, dst, dis, tie = self.offsets, self.destinos, self.distancias, self.tiempos
+        ids, vivos = self.ids, self.vivos
+        for i, n in enumerate(ids):
+            if not dentro[i]:
+                continue
+            for k in range(off[i], off[i + 1]):
+                if dentro[dst[k]] and (vivos is None or vivos[k]):
+                    cons.arco(n, ids[dst[k]], dis[k], tie[k])
+        sub = cons.construir()
+        sub.simetrico = self.simetrico if self.vivos is None else None
+        return sub
+
+
+_CAMPOS_BINARIOS = ('nodos', 'offsets', 'destinos', 'distancias', 'tiempos', '_transpuesto')
+_CAMPOS_PESOS = ('distancias', 'tiempos')
+
+
+def _abre_grafo(ruta):
+    return abre_grafo_binario(ruta)[0]
+
+
+def abre_grafo_binario(ruta):
+    """Abre (mmap, sin copiar) un grafo escrito con GrafoCSR.secciones + coordenadas."""
+    meta, secs = abre_secciones(ruta)
+    ruta = os.path.abspath(ruta)
+    grafo = GrafoCSR.desde_secciones(secs, ruta)
+    coords = None
+    if 'lon' in secs:
+        coords = CoordenadasCSR(grafo.nodos, secs['lon'], secs['lat'])
+        coords.ruta_binaria = ruta
+    return grafo, coords
+
+
+class CoordenadasCSR(Mapping):
+    """
+    nodos_info {u: (lon, lat)} sobre dos arreglos indexados igual que el grafo.
+    NaN marca nodos sin coordenadas (solo aparecen en aristas).
+    """
+
+    def __init__(self, nodos, lon, lat):
+        self.nodos = nodos
+        self.lon = lon
+        self.lat = lat
+        self.ruta_binaria = None
+        self._n = None
+
+    @classmethod
+    def desde_dict(cls, nodos, nodos_info):
+        lon = array('d', [math.nan]) * len(nodos)
+        lat = array('d', [math.nan]) * len(nodos)
+        indice = nodos.indice
+        for n, (x, y) in nodos_info.items():
+            i = indice.get(n)
+            if i is not None:
+                lon[i] = x; lat[i] = y
+        return cls(nodos, lon, lat)
+
+    def __reduce_ex__(self, protocolo):
+        if self.ruta_binaria is not None:
+            return (_abre_coordenadas, (self.ruta_binaria,))
+        return super().__reduce_ex__(protocolo)
+
+    def secciones(self):
+        return {'lon': self.lon, 'lat': self.lat}
+
+    def __getitem__(self, u):
+        i = self.nodos.indice[u]
+        x = self.lon[i]
+        if x != x:
+            raise KeyError(u)
+        return (x, self.lat[i])
+
+    def __contains__(self, u):
+        i = self.nodos.indice.get(u)
+        return i is not None and self.lon[i] == self.lon[i]
+
+    def __iter__(self):
+        lon = self.lon
+        return (n for i, n in enumerate(self.nodos.ids) if lon[i] == lon[i])
+
+    def __len__(self):
+        if self._n is None:
+            self._n = sum(1 for x in self.lon if x == x)
+        return self._n
+
+
+def _abre_coordenadas(ruta):
+    return abre_grafo_binario(ruta)[1]
+
+
+class ConstructorCSR:
+    """
+    Acumula aristas en arreglos (no en tuplas) y construye el GrafoCSR con un
+    ordenamiento por conteo estable: los vecinos de cada nodo conservan el orden
+    de inserción, igual que las listas de lista_ady.
+    tabla: TablaIds previa (p.ej. la persistida junto al grafo) para conservar
+    la numeración entre ejecuciones.
+    """
+
+    def __init__(self, tabla=None):
+        self.nodos = tabla if tabla is not None else TablaIds()
+        self.simetrico = True       # deja de serlo al agregar un arco dirigido
+        self.origenes = array('i')
+        self.destinos = array('i')
+        self.distancias = array('d')
+        self.tiempos = array('d')
+
+    def nodo(self, u):
+        """Devuelve el índice de u, registrándolo si es nuevo."""
+        return self.nodos.interna(u)
+
+    def arco(self, u, v, d, t):
+        """Agrega el arco dirigido u -> v."""
+        self.simetrico = False
+        self._agrega(u, v, d, t)
+
+    def _agrega(self, u, v, d, t):
+        self.origenes.append(self.nodo(u))
+        self.destinos.append(self.nodo(v))
+        self.distancias.append(d)
+        self.tiempos.append(t)
+
+    def arista(self, u, v, d, t, dirigida=False):
+        """Agrega u -> v y, si no es dirigida, también v -> u."""
+        self._agrega(u, v, d, t)
+        if dirigida:
+            self.simetrico = False
+        else:
+            self._agrega(v, u, d, t)
+
+    def aristas_bloque(self, iu, iv, dist, tiempo, dirigida=False):
+        """
+        Agrega un bloque de aristas ya internadas (arreglos de índices y pesos).
+        Sin dirección se intercalan u->v, v->u fila a fila: mismo orden de
+        vecinos que llamar arista() por cada fila.
+        """
+        if dirigida:
+            self.simetrico = False
+            self.origenes.extend(iu); self.destinos.extend(iv)
+            self.distancias.extend(dist); self.tiempos.extend(tiempo)
+            return
+        n = len(iu)
+        org = array('i', bytes(8 * n)); dst = array('i', bytes(8 * n))
+        org[0::2] = iu; org[1::2] = iv
+        dst[0::2] = iv; dst[1::2] = iu
+        dis = array('d', bytes(16 * n)); tie = array('d', bytes(16 * n))
+        dis[0::2] = dist; dis[1::2] = dist
+        tie[0::2] = tiempo; tie[1::2] = tiempo
+        self.origenes.extend(org); self.destinos.extend(dst)
+        self.distancias.extend(dis); self.tiempos.extend(tie)
+
+    def construir(self):
+        V = len(self.nodos)
+        E = len(self.origenes)
+        org = self.origenes
+        # conteo de grados y suma prefija
+        offsets = array('q', bytes(8 * (V + 1)))
+        for u in org:
+            offsets[u + 1] += 1
+        for i in range(V):
+            offsets[i + 1] += offsets[i]
+        # colocación estable
+        pos = array('q', offsets[:V]) if V else array('q')
+        destinos = array('i', bytes(4 * E))
+        distancias = array('d', bytes(8 * E))
+        tiempos = array('d', bytes(8 * E))
+        src_dst, src_dis, src_tie = self.destinos, self.distancias, self.tiempos
+        for k in range(E):
+            u = org[k]
+            p = pos[u]
+            pos[u] = p + 1
+            destinos[p] = src_dst[k]
+            distancias[p] = src_dis[k]
+            tiempos[p] = src_tie[k]
+        grafo = GrafoCSR(self.nodos, offsets, destinos, distancias, tiempos)
+        grafo.simetrico = self.simetrico
+        return grafo
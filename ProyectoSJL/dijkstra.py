@@ -5,55 +5,197 @@ Implementación de Dijkstra que devuelve:
 - caminos: dict
 - stats: dict con métricas internas (nodos_explorados, aristas_relajadas, largo_camino, peso_total, tiempo_algo)
 Estilo: similar a los apuntes, con instrumentación para Hito3.
+
+Internamente solo se guarda un árbol de predecesores (ArbolDijkstra: arreglo
+de distancias + arreglo de padres). 'distancias' y 'caminos' son vistas de
+solo lectura sobre ese árbol: cada camino se reconstruye cuando se pide.
+- DijkstraArbol(lag, inicio, destino=None, peso=None) -> (arbol, stats)
 """
 
+import csv
 import heapq
 import time
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+
+try:
+    from grafos.tabla_ids import TablaIds
+except ImportError:
+    from tabla_ids import TablaIds
+
+INF = float('inf')
+
+
+class ArbolDijkstra:
+    """
+    Árbol de caminos mínimos desde un origen.
+    nodos: TablaIds (índice <-> id externo)
+    dist: array('d') distancia por índice (tentativa si el nodo no se fijó)
+    padre: array('i') predecesor por índice (-1 = sin padre)
+    fijados: bytearray, 1 si la distancia del nodo ya es definitiva
+    mascara: mascara_nodos del grafo recorrido (None = todos); los nodos fuera
+             de ella no se listan
+    """
+
+    def __init__(self, nodos, dist, padre, fijados, origen, mascara=None):
+        self.nodos = nodos
+        self.dist = dist
+        self.padre = padre
+        self.fijados = fijados
+        self.origen = origen
+        self.mascara = mascara
+
+    def distancia(self, nodo):
+        i = self.nodos.indice.get(nodo)
+        return INF if i is None else self.dist[i]
+
+    def camino_indices(self, i):
+        """Camino (índices) origen -> i; [] si i no quedó fijado."""
+        if not self.fijados[i]:
+            return []
+        padre = self.padre
+        cam = []
+        while i != -1:
+            cam.append(i)
+            i = padre[i]
+        cam.reverse()
+        return cam
+
+    def camino(self, nodo):
+        """Camino (ids externos) origen -> nodo, reconstruido desde los padres."""
+        i = self.nodos.indice.get(nodo)
+        if i is None:
+            return []
+        return self.nodos.externos(self.camino_indices(i))
+
+    def predecesor(self, nodo):
+        p = self.padre[self.nodos.indice[nodo]]
+        return None if p < 0 else self.nodos[p]
+
+    def __iter__(self):
+        """(nodo, distancia, predecesor) para todo el árbol, sin armar caminos."""
+        ids, dist, padre = self.nodos.ids, self.dist, self.padre
+        indices = range(len(dist)) if self.mascara is None else compress(range(len(dist)), self.mascara)
+        for i in indices:
+            p = padre[i]
+            yield ids[i], dist[i], (ids[p] if p >= 0 else None)
+
+    def __len__(self):
+        return len(self.dist) if self.mascara is None else self.mascara.count(1)
+
+    @property
+    def nbytes(self):
+        return self.dist.itemsize * len(self.dist) + self.padre.itemsize * len(self.padre) + len(self.fijados)
+
+    @property
+    def distancias(self):
+        return _VistaDistancias(self)
+
+    @property
+    def caminos(self):
+        return _VistaCaminos(self)
+
+    def exporta_csv(self, ruta):
+        """CSV dest,dist,predecesor: el árbol completo en O(V); el camino sale siguiendo predecesores."""
+        with open(ruta, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(['dest', 'dist', 'predecesor'])
+            for nodo, d, p in self:
+                w.writerow([nodo, d if d < INF else 'inf', '' if p is None else p])
+
+
+class _VistaDistancias(Mapping):
+    """{nodo: distancia} sobre ArbolDijkstra.dist."""
+
+    def __init__(self, arbol):
+        self.arbol = arbol
+
+    def __getitem__(self, nodo):
+        if nodo not in self:
+            raise KeyError(nodo)
+        return self.arbol.dist[self.arbol.nodos.indice[nodo]]
+
+    def __contains__(self, nodo):
+        i = self.arbol.nodos.indice.get(nodo)
+        return i is not None and (self.arbol.mascara is None or self.arbol.mascara[i] == 1)
+
+    def __iter__(self):
+        mascara = self.arbol.mascara
+        return iter(self.arbol.nodos) if mascara is None else compress(self.arbol.nodos.ids, mascara)
+
+    def __len__(self):
+        return len(self.arbol)
+
+
+class _VistaCaminos(_VistaDistancias):
+    """{nodo: [origen, ..., nodo]}; cada camino se arma al pedirlo."""
+
+    def __getitem__(self, nodo):
+        return self.arbol.nodos.externos(self.arbol.camino_indices(self.arbol.nodos.indice[nodo]))
 
-def Dijkstra(lag, inicio, destino=None):
+
+def Dijkstra(lag, inicio, destino=None, peso=None, progreso=None):
     """
-    lag: {u: [(v,p), ...], ...}
+    lag: {u: [(v,p), ...], ...} o GrafoCSR (se recorre directamente sobre sus arreglos)
     inicio: nodo origen
     destino: (opcional) nodo destino para poder detener la búsqueda temprano
-    Retorna: (distancias, caminos, stats)
+    peso: (solo GrafoCSR) 'distancia' o 'tiempo'; por defecto el de la vista
+    progreso: (opcional) progreso(fijados, V), se llama cada 1024 nodos fijados
+    Retorna: (distancias, caminos, stats)  -- vistas sobre el ArbolDijkstra
     """
+    arbol, stats = DijkstraArbol(lag, inicio, destino, peso, progreso)
+    return arbol.distancias, arbol.caminos, stats
+
+
+def DijkstraArbol(lag, inicio, destino=None, peso=None, progreso=None):
+    """Como Dijkstra, pero retorna (ArbolDijkstra, stats)."""
+    if hasattr(lag, 'offsets'):
+        return _dijkstra_csr(lag, inicio, destino, peso, progreso)
     t0 = time.time()                       # tiempo inicio (interno)
     V = len(lag)
-    # inicialización
-    distancias = {n: float('inf') for n in lag}
-    distancias[inicio] = 0
-    caminos = {n: [] for n in lag}
-    caminos[inicio] = [inicio]
-
-    # frontera: (peso_parcial, nodo, camino_parcial)
-    frontera = [(0, inicio, [inicio])]
-    visitados = set()
+    # inicialización: índices densos locales para los nodos de lag
+    nodos = TablaIds(lag)
+    dist = array('d', [INF]) * V
+    padre = array('i', [-1]) * V
+    fijados = bytearray(V)
+    s = nodos.interna(inicio)
+    t = nodos.interna(destino) if destino is not None else -1
+    _crece(len(nodos), dist, padre, fijados)
+    dist[s] = 0
+
+    # frontera: (peso_parcial, índice)
+    frontera = [(0, s)]
     nodos_explorados = 0
     aristas_relajadas = 0
 
     while frontera:
-        peso, nodo, camino = heapq.heappop(frontera)
-        if nodo in visitados:
+        d_u, u = heapq.heappop(frontera)
+        if fijados[u]:
             continue
         # marcar como explorado
-        visitados.add(nodo)
+        fijados[u] = 1
         nodos_explorados += 1
-        distancias[nodo] = peso
-        caminos[nodo] = camino
+        if progreso is not None and not nodos_explorados & 1023:
+            progreso(nodos_explorados, V)
 
         # detener temprano si llegamos al destino
-        if destino is not None and nodo == destino:
+        if u == t:
             break
 
         # relajar aristas
-        for v, w in lag.get(nodo, []):
-            if v in visitados:
+        for v, w in lag.get(nodos[u], []):
+            iv = nodos.interna(v)
+            if iv >= len(dist):
+                _crece(len(nodos), dist, padre, fijados)
+            if fijados[iv]:
                 continue
-            nuevo = peso + w
+            nuevo = d_u + w
             aristas_relajadas += 1
-            if nuevo < distancias.get(v, float('inf')):
-                distancias[v] = nuevo
-                heapq.heappush(frontera, (nuevo, v, camino + [v]))
+            if nuevo < dist[iv]:
+                dist[iv] = nuevo
+                padre[iv] = u
+                heapq.heappush(frontera, (nuevo, iv))
 
     t1 = time.time()
     # construir estadísticas
@@ -66,15 +208,82 @@ def Dijkstra(lag, inicio, destino=None):
         "tiempo_algo_s": round(t1 - t0, 6),
         "complejidad_teorica": "O((V + E) log V)"
     }
+    arbol = ArbolDijkstra(nodos, dist, padre, fijados, s)
+    _resumen_destino(stats, arbol, inicio, destino)
+    return arbol, stats
+
+
+def _crece(n, dist, padre, fijados):
+    """Extiende los arreglos para nodos que solo aparecen como vecinos."""
+    falta = n - len(dist)
+    if falta > 0:
+        dist.extend(array('d', [INF]) * falta)
+        padre.extend(array('i', [-1]) * falta)
+        fijados.extend(bytes(falta))
+
+
+def _dijkstra_csr(g, inicio, destino=None, peso=None, progreso=None):
+    """Dijkstra sobre GrafoCSR: distancias y padres en arreglos indexados."""
+    t0 = time.time()
+    V = g.num_nodos
+    off, dst, vivos = g.offsets, g.destinos, g.vivos
+    w = g.pesos(peso)
+    dist = array('d', [INF]) * V
+    padre = array('i', [-1]) * V
+    fijados = bytearray(V)
+    s = g.indice_de(inicio)
+    t = g.indice_de(destino) if destino is not None and destino in g else -1
+    dist[s] = 0
+    frontera = [(0, s)]
+    nodos_explorados = 0
+    aristas_relajadas = 0
+
+    while frontera:
+        d_u, u = heapq.heappop(frontera)
+        if fijados[u]:
+            continue
+        fijados[u] = 1
+        nodos_explorados += 1
+        if progreso is not None and not nodos_explorados & 1023:
+            progreso(nodos_explorados, len(g))
+        if u == t:
+            break
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if fijados[v]:
+                continue
+            nuevo = d_u + w[k]
+            aristas_relajadas += 1
+            if nuevo < dist[v]:
+                dist[v] = nuevo
+                padre[v] = u
+                heapq.heappush(frontera, (nuevo, v))
+
+    t1 = time.time()
+    stats = {
+        "algoritmo": "Dijkstra",
+        "V": len(g),
+        "E_aproximado": g.arcos_presentes // 2 if V>0 else 0,
+        "nodos_explorados": nodos_explorados,
+        "aristas_relajadas": aristas_relajadas,
+        "tiempo_algo_s": round(t1 - t0, 6),
+        "complejidad_teorica": "O((V + E) log V)"
+    }
+    arbol = ArbolDijkstra(g.nodos, dist, padre, fijados, s, g.mascara_nodos)
+    _resumen_destino(stats, arbol, inicio, destino)
+    return arbol, stats
+
 
+def _resumen_destino(stats, arbol, inicio, destino):
     # resumen relativo a la ruta si se especificó destino y existe camino
     if destino is not None:
-        if distancias.get(destino, float('inf')) < float('inf'):
-            camino_dest = caminos[destino]
+        if arbol.distancia(destino) < float('inf'):
+            camino_dest = arbol.camino(destino)
             stats.update({
                 "origen": inicio,
                 "destino": destino,
-                "distancia_total": distancias[destino],
+                "distancia_total": arbol.distancia(destino),
                 "tiempo_estimado_min": None,  # si quieres convertir distancia->tiempo, hazlo en GUI
                 "largo_camino_nodos": len(camino_dest),
                 "ruta": camino_dest
@@ -87,5 +296,3 @@ def Dijkstra(lag, inicio, destino=None):
                 "largo_camino_nodos": 0,
                 "ruta": []
             })
-
-    return distancias, caminos, stats
@@ -0,0 +1,364 @@
+"""
+grafos/espacial.py
+Índice espacial de nodos (grilla uniforme) para pasar de coordenadas lat/lon a
+nodos del grafo. Provee:
+- IndiceEspacial.construir(nodos_info, grafo=None) -> índice
+- indice.cercano(lat, lon) -> (nodo, distancia_m)
+- indice.k_cercanos(lat, lon, k) / indice.en_radio(lat, lon, radio_m) -> [(nodo, distancia_m), ...]
+- indice.ajusta_arista(lat, lon) -> (u, v, fraccion, distancia_m, (lat, lon) del punto en la arista)
+- indice.lote(tipo, puntos, ...) -> lo mismo para miles de puntos (lat, lon)
+- ruta_espacial(aristas_csv) / espacial_para(nodos_info, grafo, aristas_csv): índice guardado junto a la caché del grafo
+Las coordenadas se proyectan a metros (equirectangular centrada en el área, de
+sobra precisa a escala de un distrito) y los nodos se ordenan por celda en dos
+arreglos planos (offsets por celda + nodos), como el CSR del grafo. Las
+consultas recorren anillos de celdas alrededor del punto y paran cuando el
+siguiente anillo ya no puede traer nada más cerca. Si se pasa el grafo, cada
+arista (u, v) se registra también en las celdas que cubre su rectángulo, para
+ajustar un punto a la arista más cercana.
+Ojo: nodos_info guarda (lon, lat); las consultas reciben (lat, lon).
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import time
+from array import array
+
+try:
+    from grafos.binario import escribe_secciones, abre_secciones
+    from grafos.tabla_ids import TablaIds
+except ImportError:
+    from binario import escribe_secciones, abre_secciones
+    from tabla_ids import TablaIds
+
+INF = float('inf')
+R_TIERRA = 6371008.8            # radio medio (m)
+NODOS_POR_CELDA = 2.0
+
+
+def ruta_espacial(aristas_csv):
+    """grafo_sjl_osm.csv -> grafo_sjl_osm.espacial (junto a grafo_sjl_osm.cache)."""
+    return os.path.splitext(aristas_csv)[0] + '.espacial'
+
+
+def _lon_lat(nodos_info):
+    """(TablaIds, lon, lat) indexados igual; NaN = nodo sin coordenadas."""
+    if hasattr(nodos_info, 'lon'):
+        # CoordenadasCSR: ya son arreglos indexados como el grafo
+        return nodos_info.nodos, nodos_info.lon, nodos_info.lat
+    nodos = TablaIds(nodos_info)
+    lon = array('d', (nodos_info[n][0] for n in nodos.ids))
+    lat = array('d', (nodos_info[n][1] for n in nodos.ids))
+    return nodos, lon, lat
+
+
+def _aristas_grafo(grafo, indice):
+    """Pares (i, j) sin repetir (una vez por arista, ignorando sentido) en la numeración del índice."""
+    vistos = set()
+    if hasattr(grafo, 'offsets'):
+        off, dst, vivos = grafo.offsets, grafo.destinos, grafo.vivos
+        propio = [indice.get(n, -1) for n in grafo.ids]
+        pares = ((propio[a], propio[dst[k]]) for a in grafo.presentes() for k in range(off[a], off[a + 1])
+                 if vivos is None or vivos[k])
+    else:
+        pares = ((indice.get(u, -1), indice.get(e[0], -1)) for u, vecinos in grafo.items() for e in vecinos)
+    for i, j in pares:
+        if i < 0 or j < 0 or i == j:
+            continue
+        par = (i, j) if i < j else (j, i)
+        if par not in vistos:
+            vistos.add(par)
+            yield par
+
+
+def firma_espacial(nodos_info, grafo=None):
+    """Identifica coordenadas (+ aristas): el índice guardado solo sirve para lo mismo."""
+    h = hashlib.sha1()
+    _, lon, lat = _lon_lat(nodos_info)
+    for arr in (lon, lat) + ((grafo.offsets, grafo.destinos) if grafo is not None else ()):
+        h.update(memoryview(arr).cast('B'))
+    for mascara in ((grafo.mascara_nodos, grafo.vivos) if grafo is not None else ()):
+        if mascara is not None:
+            h.update(mascara)
+    return h.hexdigest()
+
+
+def espacial_para(nodos_info, grafo, aristas_csv):
+    """Índice guardado junto al CSV si corresponde a estas coordenadas y aristas; si no, se construye y se guarda."""
+    ruta = ruta_espacial(aristas_csv)
+    firma = firma_espacial(nodos_info, grafo)
+    if os.path.exists(ruta):
+        try:
+            return IndiceEspacial.carga(ruta, firma)
+        except (ValueError, KeyError, OSError):
+            pass
+    indice = IndiceEspacial.construir(nodos_info, grafo)
+    indice.firma = firma
+    try:
+        indice.guarda(ruta)
+    except OSError:
+        pass
+    return indice
+
+
+class IndiceEspacial:
+
+    def __init__(self, nodos, x, y, grilla, celdas, aristas=None, firma=None):
+        self.nodos = nodos          # TablaIds
+        self.x = x                  # array('d'): metros al este del centro (NaN = sin coordenadas)
+        self.y = y                  # array('d'): metros al norte del centro
+        self.grilla = grilla        # (lat0, lon0, x_min, y_min, celda_m, nx, ny)
+        self.celdas = celdas        # (off, nodo): nodos de la celda c en nodo[off[c]:off[c+1]]
+        self.aristas = aristas      # (u, v, off, arista) o None si se construyó sin grafo
+        self.firma = firma
+        self.stats = {}
+        lat0 = grilla[0]
+        self._kx = math.radians(1) * R_TIERRA * math.cos(math.radians(lat0))
+        self._ky = math.radians(1) * R_TIERRA
+
+    # ---------------- construcción ----------------
+    @classmethod
+    def construir(cls, nodos_info, grafo=None, por_celda=NODOS_POR_CELDA):
+        """
+        nodos_info: CoordenadasCSR o {u: (lon, lat)}
+        grafo: (opcional) GrafoCSR o {u: [(v, ...), ...]} para poder ajustar a aristas;
+               si es un diccionario o tiene máscara de nodos (una vista) solo se
+               indexan sus nodos (nodos_info puede ser el del grafo completo)
+        por_celda: nodos promedio por celda (define el lado de la celda)
+        """
+        t0 = time.time()
+        nodos, lon, lat = _lon_lat(nodos_info)
+        n = len(lon)
+        validos = [i for i in range(n) if lon[i] == lon[i]]
+        if grafo is not None and (not hasattr(grafo, 'offsets') or grafo.mascara_nodos is not None):
+            ids = nodos.ids
+            validos = [i for i in validos if ids[i] in grafo]
+        lat0 = sum(lat[i] for i in validos) / len(validos) if validos else 0.0
+        lon0 = sum(lon[i] for i in validos) / len(validos) if validos else 0.0
+        kx = math.radians(1) * R_TIERRA * math.cos(math.radians(lat0))
+        ky = math.radians(1) * R_TIERRA
+        x = array('d', [math.nan]) * n
+        y = array('d', [math.nan]) * n
+        for i in validos:
+            x[i] = (lon[i] - lon0) * kx
+            y[i] = (lat[i] - lat0) * ky
+        if validos:
+            x_min, x_max = min(x[i] for i in validos), max(x[i] for i in validos)
+            y_min, y_max = min(y[i] for i in validos), max(y[i] for i in validos)
+        else:
+            x_min = x_max = y_min = y_max = 0.0
+        area = max((x_max - x_min) * (y_max - y_min), 1.0)
+        celda = max(math.sqrt(area * por_celda / max(len(validos), 1)), 1.0)
+        nx = int((x_max - x_min) / celda) + 1
+        ny = int((y_max - y_min) / celda) + 1
+        grilla = (lat0, lon0, x_min, y_min, celda, nx, ny)
+
+        # nodos ordenados por celda (conteo + prefijos, como al armar un CSR)
+        cel = [min(int((y[i] - y_min) / celda), ny - 1) * nx + min(int((x[i] - x_min) / celda), nx - 1) for i in validos]
+        celdas = _agrupa(nx * ny, cel, validos)
+
+        aristas = None
+        if grafo is not None:
+            au, av, cel_a, ids_a = array('i'), array('i'), [], []
+            for i, j in _aristas_grafo(grafo, nodos.indice):
+                if x[i] != x[i] or x[j] != x[j]:
+                    continue
+                a = len(au)
+                au.append(i); av.append(j)
+                cx0, cx1 = sorted((int((x[i] - x_min) / celda), int((x[j] - x_min) / celda)))
+                cy0, cy1 = sorted((int((y[i] - y_min) / celda), int((y[j] - y_min) / celda)))
+                for cy in range(cy0, min(cy1, ny - 1) + 1):
+                    for cx in range(cx0, min(cx1, nx - 1) + 1):
+                        cel_a.append(cy * nx + cx)
+                        ids_a.append(a)
+            aristas = (au, av) + _agrupa(nx * ny, cel_a, ids_a)
+
+        indice = cls(nodos, x, y, grilla, celdas, aristas)
+        indice.stats = {
+            "algoritmo": "Índice espacial (grilla uniforme)",
+            "V": len(validos),
+            "celdas": nx * ny,
+            "celda_m": round(celda, 2),
+            "aristas": len(aristas[0]) if aristas else 0,
+            "tiempo_algo_s": round(time.time() - t0, 6),
+            "complejidad_teorica": "O(V + E) construcción, O(1) esperado por consulta"
+        }
+        return indice
+
+    # ---------------- consultas ----------------
+    def _proyecta(self, lat, lon):
+        return (lon - self.grilla[1]) * self._kx, (lat - self.grilla[0]) * self._ky
+
+    def _celda(self, px, py):
+        _, _, x_min, y_min, celda, _, _ = self.grilla
+        return math.floor((px - x_min) / celda), math.floor((py - y_min) / celda)
+
+    def _anillos(self, cx, cy):
+        """(r, [celdas del anillo r]) alrededor de (cx, cy), recortado a la grilla, hasta cubrirla toda."""
+        nx, ny = self.grilla[5], self.grilla[6]
+        r_max = max(cx, nx - 1 - cx, cy, ny - 1 - cy, 0)
+        for r in range(r_max + 1):
+            lista = []
+            for yy in range(max(cy - r, 0), min(cy + r, ny - 1) + 1):
+                borde = yy == cy - r or yy == cy + r
+                paso = 1 if borde else 2 * r
+                for xx in range(cx - r, cx + r + 1, paso or 1):
+                    if 0 <= xx < nx:
+                        lista.append(yy * nx + xx)
+            yield r, lista
+
+    def cercano(self, lat, lon):
+        """(nodo, distancia_m) más cercano a (lat, lon); (None, inf) si el índice está vacío."""
+        res = self.k_cercanos(lat, lon, 1)
+        return res[0] if res else (None, INF)
+
+    def k_cercanos(self, lat, lon, k):
+        """Los k nodos más cercanos como [(nodo, distancia_m), ...] de menor a mayor."""
+        px, py = self._proyecta(lat, lon)
+        cx, cy = self._celda(px, py)
+        off, cel = self.celdas
+        x, y = self.x, self.y
+        celda = self.grilla[4]
+        mejores = []                        # heap de (-d2, i) con los k mejores
+        for r, anillo in self._anillos(cx, cy):
+            # lo que está en los anillos r, r+1, ... queda a (r-1)·celda o más del punto
+            if r > 0 and len(mejores) == k and -mejores[0][0] <= ((r - 1) * celda) ** 2:
+                break
+            for c in anillo:
+                for p in range(off[c], off[c + 1]):
+                    i = cel[p]
+                    d2 = (x[i] - px) ** 2 + (y[i] - py) ** 2
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (-d2, i))
+                    elif d2 < -mejores[0][0]:
+                        heapq.heapreplace(mejores, (-d2, i))
+        ids = self.nodos.ids
+        return [(ids[i], math.sqrt(-d2)) for d2, i in sorted(mejores, reverse=True)]
+
+    def en_radio(self, lat, lon, radio_m):
+        """Nodos a radio_m metros o menos como [(nodo, distancia_m), ...] de menor a mayor."""
+        px, py = self._proyecta(lat, lon)
+        _, _, x_min, y_min, celda, nx, ny = self.grilla
+        off, cel = self.celdas
+        x, y = self.x, self.y
+        r2 = radio_m * radio_m
+        x0, y0 = self._celda(px - radio_m, py - radio_m)
+        x1, y1 = self._celda(px + radio_m, py + radio_m)
+        res = []
+        for cy in range(max(y0, 0), min(y1, ny - 1) + 1):
+            for cx in range(max(x0, 0), min(x1, nx - 1) + 1):
+                c = cy * nx + cx
+                for p in range(off[c], off[c + 1]):
+                    i = cel[p]
+                    d2 = (x[i] - px) ** 2 + (y[i] - py) ** 2
+                    if d2 <= r2:
+                        res.append((d2, i))
+        res.sort()
+        ids = self.nodos.ids
+        return [(ids[i], math.sqrt(d2)) for d2, i in res]
+
+    def ajusta_arista(self, lat, lon):
+        """
+        Proyección de (lat, lon) sobre la arista más cercana:
+        (u, v, fraccion, distancia_m, (lat, lon) del punto), con fraccion 0 en u y 1 en v.
+        """
+        if self.aristas is None:
+            raise ValueError('El índice se construyó sin grafo: no puede ajustar a aristas.')
+        px, py = self._proyecta(lat, lon)
+        cx, cy = self._celda(px, py)
+        au, av, off, cel = self.aristas
+        x, y = self.x, self.y
+        celda = self.grilla[4]
+        mejor = (INF, -1, 0.0)
+        vistas = set()
+        for r, anillo in self._anillos(cx, cy):
+            if r > 0 and mejor[0] <= ((r - 1) * celda) ** 2:
+                break
+            for c in anillo:
+                for p in range(off[c], off[c + 1]):
+                    a = cel[p]
+                    if a in vistas:
+                        continue
+                    vistas.add(a)
+                    i, j = au[a], av[a]
+                    dx, dy = x[j] - x[i], y[j] - y[i]
+                    l2 = dx * dx + dy * dy
+                    f = 0.0 if l2 == 0 else min(max(((px - x[i]) * dx + (py - y[i]) * dy) / l2, 0.0), 1.0)
+                    d2 = (x[i] + f * dx - px) ** 2 + (y[i] + f * dy - py) ** 2
+                    if d2 < mejor[0]:
+                        mejor = (d2, a, f)
+        d2, a, f = mejor
+        if a < 0:
+            return None, None, 0.0, INF, None
+        i, j = au[a], av[a]
+        qx, qy = x[i] + f * (x[j] - x[i]), y[i] + f * (y[j] - y[i])
+        punto = (self.grilla[0] + qy / self._ky, self.grilla[1] + qx / self._kx)
+        ids = self.nodos.ids
+        return ids[i], ids[j], f, math.sqrt(d2), punto
+
+    def lote(self, tipo, puntos, *args):
+        """
+        La consulta 'tipo' ('cercano', 'k_cercanos', 'en_radio', 'ajusta_arista')
+        para cada (lat, lon) de puntos, con los mismos argumentos extra. Retorna (resultados, stats).
+        """
+        t0 = time.time()
+        consulta = {'cercano': self.cercano, 'k_cercanos': self.k_cercanos,
+                    'en_radio': self.en_radio, 'ajusta_arista': self.ajusta_arista}[tipo]
+        resultados = [consulta(lat, lon, *args) for lat, lon in puntos]
+        t1 = time.time()
+        stats = {
+            "algoritmo": f"Índice espacial ({tipo}, lote)",
+            "puntos": len(resultados),
+            "tiempo_algo_s": round(t1 - t0, 6),
+            "puntos_por_s": round(len(resultados) / (t1 - t0), 1) if t1 > t0 else None
+        }
+        return resultados, stats
+
+    # ---------------- persistencia ----------------
+    def guarda(self, ruta):
+        secs = {'x': self.x, 'y': self.y, 'celdas_off': self.celdas[0], 'celdas_nodo': self.celdas[1]}
+        if self.aristas is not None:
+            secs.update(aristas_u=self.aristas[0], aristas_v=self.aristas[1],
+                        aristas_off=self.aristas[2], aristas_celda=self.aristas[3])
+        if self.nodos.numerica:
+            secs['ids'] = self.nodos.ids
+            ids_json = None
+        else:
+            ids_json = list(self.nodos.ids)
+        meta = {'tipo': 'indice_espacial', 'grilla': list(self.grilla), 'firma': self.firma,
+                'ids_json': ids_json, 'stats': self.stats}
+        escribe_secciones(ruta, meta, secs)
+
+    @classmethod
+    def carga(cls, ruta, firma=None):
+        """Abre el índice con mmap; si se pasa la firma (firma_espacial), verifica que coincida."""
+        meta, secs = abre_secciones(ruta)
+        if meta.get('tipo') != 'indice_espacial':
+            raise ValueError(f'{ruta} no es un índice espacial')
+        if firma is not None and meta['firma'] != firma:
+            raise ValueError(f'{ruta} fue construido para otras coordenadas o aristas')
+        nodos = TablaIds.desde_secuencia(secs['ids'] if 'ids' in secs else meta['ids_json'])
+        aristas = None
+        if 'aristas_u' in secs:
+            aristas = (secs['aristas_u'], secs['aristas_v'], secs['aristas_off'], secs['aristas_celda'])
+        g = meta['grilla']
+        grilla = (g[0], g[1], g[2], g[3], g[4], int(g[5]), int(g[6]))
+        indice = cls(nodos, secs['x'], secs['y'], grilla, (secs['celdas_off'], secs['celdas_nodo']), aristas, meta['firma'])
+        indice.stats = meta.get('stats', {})
+        return indice
+
+
+def _agrupa(num_celdas, cel, elems):
+    """(off, elementos ordenados por celda) a partir de celda[k] y elems[k] (ordenamiento por conteo)."""
+    off = array('i', bytes(4 * (num_celdas + 1)))
+    for c in cel:
+        off[c + 1] += 1
+    for c in range(num_celdas):
+        off[c + 1] += off[c]
+    pos = array('i', off[:-1])
+    salida = array('i', bytes(4 * len(elems)))
+    for c, e in zip(cel, elems):
+        salida[pos[c]] = e
+        pos[c] += 1
+    return off, salida
@@ -2,51 +2,277 @@
 grafos/floyd.py
 Floyd–Warshall instrumentado:
 - devuelve dist, next_hop, nodes, stats (tiempo, V, complejidad)
+
+Las matrices ya no son dict-of-dicts: dist es float32 y next_hop int32 (índice
+del siguiente nodo, -1 = sin camino), ambas V×V en un solo buffer contiguo.
+dist[u][v] y next_hop[u][v] siguen funcionando como antes (MatrizAPSP es una
+vista por ids externos), igual que reconstruir_camino.
+- Con numpy: Floyd–Warshall por bloques (B×B) en 3 fases; dentro de cada
+  baldosa, una actualización min-plus vectorizada por cada k.
+- Sin numpy: la misma recurrencia fila por fila en Python puro.
+- Si 8·V² bytes superan memoria_max, el buffer es un archivo temporal mapeado
+  en memoria (mmap) en lugar de RAM.
+- progreso(k, V) opcional: una vez por k (Python) o por bloque de k (numpy).
 """
 
+import atexit
+import mmap
+import os
+import tempfile
 import time
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+
+# numpy es opcional; sin él se usa la versión en Python puro
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+INF = float('inf')
+BLOQUE = 256                    # lado de la baldosa (256×256 float32 = 256 KiB)
+MEMORIA_MAX_BYTES = 1 << 30     # sobre esto las matrices van a un archivo mapeado
+
+
+class MatrizAPSP(Mapping):
+    """
+    Vista {u: {v: valor}} sobre una matriz V×V plana.
+    tipo 'dist': valor = distancia (inf si no hay camino)
+    tipo 'siguiente': valor = id del siguiente nodo (None si no hay camino)
+    """
+
+    def __init__(self, nodes, indice, datos, tipo):
+        self.nodes = nodes          # ids externos en el orden de filas/columnas
+        self.indice = indice        # id externo -> fila
+        self.datos = datos          # memoryview plano ('f' o 'i'), largo V*V
+        self.tipo = tipo
+        self.V = len(nodes)
+
+    def fila(self, i):
+        """Fila i como memoryview (sin copiar)."""
+        return self.datos[i * self.V:(i + 1) * self.V]
+
+    def valor(self, i, j):
+        x = self.datos[i * self.V + j]
+        if self.tipo == 'dist':
+            return x
+        return None if x < 0 else self.nodes[x]
+
+    def __getitem__(self, u):
+        return _FilaAPSP(self, self.indice[u])
+
+    def __contains__(self, u):
+        return u in self.indice
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self):
+        return self.V
+
+    @property
+    def nbytes(self):
+        return self.datos.nbytes
+
+
+class _FilaAPSP(Mapping):
+    """Fila u de MatrizAPSP: {v: valor}."""
+
+    def __init__(self, matriz, i):
+        self.matriz = matriz
+        self.i = i
+
+    def __getitem__(self, v):
+        return self.matriz.valor(self.i, self.matriz.indice[v])
+
+    def __contains__(self, v):
+        return v in self.matriz.indice
+
+    def __iter__(self):
+        return iter(self.matriz.nodes)
+
+    def __len__(self):
+        return self.matriz.V
 
-def floyd_warshall(lista_ady, weight_type='distancia'):
+
+def floyd_warshall(lista_ady, weight_type='distancia', motor=None, bloque=BLOQUE,
+                   memoria_max=MEMORIA_MAX_BYTES, dir_disco=None, progreso=None):
+    """
+    lista_ady: GrafoCSR o {u: [(v, dist, tiempo), ...]}
+    motor: 'numpy' o 'python'; por defecto numpy si está instalado
+    bloque: lado de las baldosas del motor numpy
+    memoria_max: bytes de matrices sobre los que se usa un archivo mapeado (en dir_disco)
+    progreso: (opcional) progreso(k, V) a medida que avanza el ciclo de k
+    Retorna: (dist, next_hop, nodes, stats)
+    """
     t0 = time.time()
+    if motor is None:
+        motor = 'numpy' if np is not None else 'python'
+    if motor == 'numpy' and np is None:
+        raise RuntimeError("numpy no está instalado; usa motor='python'.")
     nodes = sorted(list(lista_ady.keys()))
     V = len(nodes)
-    # inicialización
-    dist = {u: {v: float('inf') for v in nodes} for u in nodes}
-    next_hop = {u: {v: None for v in nodes} for u in nodes}
-    for u in nodes:
-        dist[u][u] = 0
-        next_hop[u][u] = u
-    # cargar pesos
-    for u, vecinos in lista_ady.items():
-        for v, d, t in vecinos:
-            peso = d if weight_type == 'distancia' else t
-            if peso < dist[u][v]:
-                dist[u][v] = peso
-                next_hop[u][v] = v
+    indice = {u: i for i, u in enumerate(nodes)}
+    n2 = V * V
+    en_disco = 8 * n2 > memoria_max
+    buf = _reserva(8 * n2, dir_disco) if en_disco else bytearray(8 * n2)
+    vista = memoryview(buf)
+    dist = vista[:4 * n2].cast('f')
+    sig = vista[4 * n2:].cast('i')
+
+    # inicialización: inf / -1, diagonal 0 / i
+    fila_inf, fila_nada = array('f', [INF]) * V, array('i', [-1]) * V
+    for i in range(V):
+        dist[i * V:(i + 1) * V] = fila_inf
+        sig[i * V:(i + 1) * V] = fila_nada
+        dist[i * V + i] = 0.0
+        sig[i * V + i] = i
+    # cargar pesos (el menor de los arcos paralelos)
+    for i, j, peso in _arcos(lista_ady, weight_type, indice):
+        if peso < dist[i * V + j]:
+            dist[i * V + j] = peso
+            sig[i * V + j] = j
+
     # algoritmo principal
-    for k in nodes:
-        if V == 0:
-            break
-        for i in nodes:
-            if dist[i][k] == float('inf'):
-                continue
-            for j in nodes:
-                if dist[k][j] == float('inf'):
-                    continue
-                if dist[i][j] > dist[i][k] + dist[k][j]:
-                    dist[i][j] = dist[i][k] + dist[k][j]
-                    next_hop[i][j] = next_hop[i][k]
+    if V:
+        if motor == 'numpy':
+            D = np.frombuffer(buf, dtype=np.float32, count=n2).reshape(V, V)
+            N = np.frombuffer(buf, dtype=np.int32, count=n2, offset=4 * n2).reshape(V, V)
+            try:
+                _floyd_bloques(D, N, bloque, progreso)
+            finally:
+                del D, N                    # vistas numpy sobre buf: sin ellas buf se puede soltar
+        else:
+            _floyd_filas(dist, sig, V, progreso)
     t1 = time.time()
     stats = {
         "algoritmo": "Floyd-Warshall",
         "V": V,
         "matriz_generada": (V, V),
+        "motor": f'numpy por bloques de {bloque}' if motor == 'numpy' else 'python por filas',
+        "bytes_matrices": 8 * n2,
+        "en_disco": en_disco,
         "tiempo_algo_s": round(t1 - t0, 6),
         "complejidad_teorica": "O(V^3)"
     }
-    return dist, next_hop, nodes, stats
+    return MatrizAPSP(nodes, indice, dist, 'dist'), MatrizAPSP(nodes, indice, sig, 'siguiente'), nodes, stats
+
+
+def _arcos(lista_ady, weight_type, indice):
+    """(fila, columna, peso) de cada arco."""
+    if hasattr(lista_ady, 'offsets'):
+        # GrafoCSR: se leen los arreglos directamente
+        g = lista_ady
+        off, dst, vivos = g.offsets, g.destinos, g.vivos
+        w = g.pesos(weight_type)
+        fila = [indice.get(u, -1) for u in g.ids]      # -1: fuera de la máscara de nodos
+        for a in g.presentes():
+            i = fila[a]
+            ini, fin = off[a], off[a + 1]
+            for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+                yield i, fila[dst[k]], w[k]
+    else:
+        for u, vecinos in lista_ady.items():
+            i = indice[u]
+            for v, d, t in vecinos:
+                yield i, indice[v], d if weight_type == 'distancia' else t
+
+
+def _reserva(nbytes, directorio):
+    """Buffer escribible respaldado por un archivo temporal (se borra al terminar)."""
+    fd, ruta = tempfile.mkstemp(suffix='.apsp', dir=directorio)
+    try:
+        os.ftruncate(fd, max(nbytes, 1))
+        mm = mmap.mmap(fd, max(nbytes, 1))
+    finally:
+        os.close(fd)
+    try:
+        os.remove(ruta)                 # en POSIX el mapeo sigue vivo sin nombre
+    except OSError:
+        atexit.register(lambda: os.path.exists(ruta) and os.remove(ruta))
+    return mm
+
+
+def _floyd_bloques(D, N, B, progreso=None):
+    """
+    Floyd–Warshall por bloques sobre D (float32) y N (int32), in situ. Para
+    cada bloque k: (1) la baldosa diagonal, (2) la franja de filas y la de
+    columnas del bloque, (3) el resto de las baldosas, que ya solo dependen de
+    las franjas y se recorren de a B×B para que quepan en caché.
+    """
+    V = D.shape[0]
+    for kb in range(0, V, B):
+        if progreso is not None:
+            progreso(kb, V)
+        k = slice(kb, min(kb + B, V))
+        _minplus(D, N, k, k, k)
+        _minplus(D, N, k, k, slice(None))
+        _minplus(D, N, k, slice(None), k)
+        for ib in range(0, V, B):
+            if ib == kb:
+                continue
+            filas = slice(ib, min(ib + B, V))
+            for jb in range(0, V, B):
+                if jb != kb:
+                    _minplus(D, N, k, filas, slice(jb, min(jb + B, V)))
+
+
+def _minplus(D, N, ks, filas, cols):
+    """D[filas, cols] = min(D[filas, cols], D[filas, k] + D[k, cols]) para k en ks, en orden."""
+    Dij = D[filas, cols]
+    Nij = N[filas, cols]
+    cand = np.empty(Dij.shape, dtype=D.dtype)           # temporales reutilizados para todos los k
+    mejora = np.empty(Dij.shape, dtype=bool)
+    for k in range(ks.start, ks.stop):
+        np.add(D[filas, k][:, None], D[k, cols][None, :], out=cand)
+        np.less(cand, Dij, out=mejora)
+        if mejora.any():
+            np.copyto(Dij, cand, where=mejora)
+            np.copyto(Nij, N[filas, k][:, None], where=mejora)
+
+
+def _floyd_filas(dist, sig, V, progreso=None):
+    """Versión en Python puro: por cada k, se relaja fila por fila solo contra las columnas alcanzables desde k."""
+    for k in range(V):
+        if progreso is not None:
+            progreso(k, V)
+        fila_k = dist[k * V:(k + 1) * V].tolist()
+        alcanzables = [(j, x) for j, x in enumerate(fila_k) if x < INF]
+        for i in range(V):
+            base = i * V
+            dik = dist[base + k]
+            if dik == INF or i == k:
+                continue
+            fila = dist[base:base + V].tolist()
+            cambios = []
+            for j, x in alcanzables:
+                if dik + x < fila[j]:
+                    fila[j] = dik + x
+                    cambios.append(j)
+            if cambios:
+                dist[base:base + V] = array('f', fila)
+                nik = sig[base + k]
+                for j in cambios:
+                    sig[base + j] = nik
+
 
 def reconstruir_camino(next_hop, u, v):
+    if isinstance(next_hop, MatrizAPSP):
+        # sobre la matriz de índices: sin pasar por las vistas
+        if u not in next_hop.indice or v not in next_hop.indice:
+            return []
+        i, j = next_hop.indice[u], next_hop.indice[v]
+        V, datos = next_hop.V, next_hop.datos
+        if datos[i * V + j] < 0:
+            return []
+        camino = [i]
+        while i != j:
+            i = datos[i * V + j]
+            if i < 0:
+                return []
+            camino.append(i)
+        return [next_hop.nodes[c] for c in camino]
     if u not in next_hop or v not in next_hop[u]:
         return []
     if next_hop[u][v] is None:
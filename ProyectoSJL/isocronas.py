@@ -0,0 +1,189 @@
+"""
+grafos/isocronas.py
+Isócronas / áreas de servicio: todo lo alcanzable desde uno o varios orígenes
+dentro de T minutos o D metros. Provee:
+- isocronas(lista_ady, origenes, cortes, peso='tiempo') -> (AreaAlcance, stats)
+- AreaAlcance: árbol acotado (hereda de ArbolDijkstra) con anillo y origen de
+  cada nodo alcanzado y las aristas de frontera de cada corte
+Es un Dijkstra que se detiene al sacar de la cola una distancia mayor que el
+corte más grande, en lugar de fijar todo SJL. Con varios cortes (p. ej. 5/10/15
+min) basta una sola pasada: el anillo de cada nodo es el primer corte que
+cubre su distancia. Con varios orígenes todos arrancan en 0 (multi-fuente), así
+cada nodo queda asignado al origen más cercano (cobertura de varios locales).
+Arista de frontera del corte c: u dentro (dist[u] <= c) y v fuera; se guarda
+la fracción de la arista donde se cumple el corte, (c - dist[u]) / peso.
+"""
+
+import csv
+import heapq
+import time
+from array import array
+from itertools import compress
+
+try:
+    from grafos.csr import csr_desde_lista
+    from grafos.dijkstra import ArbolDijkstra
+except ImportError:
+    from csr import csr_desde_lista
+    from dijkstra import ArbolDijkstra
+
+INF = float('inf')
+
+
+class AreaAlcance(ArbolDijkstra):
+    """
+    Además del árbol (dist, padre, fijados; un origen por raíz):
+    cortes: lista ascendente de cortes
+    alcanzados: array('i') índices dentro del corte mayor, en orden de distancia
+    anillo: array('b') primer corte que cubre al nodo (-1 = fuera)
+    raiz: array('i') índice del origen que alcanza al nodo (-1 = fuera)
+    frontera: {corte: [(u, v, fraccion), ...]} en ids externos
+    """
+
+    def __init__(self, nodos, dist, padre, fijados, origenes, cortes, alcanzados, anillo, raiz, frontera, mascara=None):
+        super().__init__(nodos, dist, padre, fijados, origenes[0] if origenes else -1, mascara)
+        self.origenes = origenes
+        self.cortes = cortes
+        self.alcanzados = alcanzados
+        self.anillo = anillo
+        self.raiz = raiz
+        self.frontera = frontera
+
+    def nodos_en(self, corte):
+        """Ids de los nodos a distancia <= corte (corte debe ser uno de self.cortes)."""
+        k = self.cortes.index(corte)
+        ids, anillo = self.nodos.ids, self.anillo
+        return [ids[i] for i in self.alcanzados if anillo[i] <= k]
+
+    def anillo_de(self, k):
+        """Ids del anillo k: distancia en (cortes[k-1], cortes[k]]."""
+        ids, anillo = self.nodos.ids, self.anillo
+        return [ids[i] for i in self.alcanzados if anillo[i] == k]
+
+    def origen_de(self, nodo):
+        """Origen que cubre al nodo (None si queda fuera del corte mayor)."""
+        r = self.raiz[self.nodos.indice[nodo]]
+        return None if r < 0 else self.nodos[r]
+
+    def aristas_frontera(self, corte):
+        return self.frontera[corte]
+
+    def exporta_csv(self, ruta):
+        """CSV nodo,origen,dist,anillo,predecesor solo con los nodos alcanzados."""
+        ids, dist, padre = self.nodos.ids, self.dist, self.padre
+        with open(ruta, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(['nodo', 'origen', 'dist', 'anillo', 'predecesor'])
+            for i in self.alcanzados:
+                p = padre[i]
+                w.writerow([ids[i], ids[self.raiz[i]], dist[i], self.cortes[self.anillo[i]], '' if p < 0 else ids[p]])
+
+
+def isocronas(lista_ady, origenes, cortes, peso='tiempo'):
+    """
+    lista_ady: GrafoCSR o {u: [(v, dist, tiempo), ...]}
+    origenes: un nodo o varios (multi-origen: cada nodo queda con el más cercano)
+    cortes: un valor o varios (minutos si peso='tiempo', metros si 'distancia')
+    Retorna: (AreaAlcance, stats)
+    """
+    t0 = time.time()
+    if hasattr(lista_ady, 'offsets'):
+        g, w = lista_ady, lista_ady.pesos(peso)
+    else:
+        g = csr_desde_lista({u: [(v, d if peso == 'distancia' else t) for v, d, t in vecinos]
+                             for u, vecinos in lista_ady.items()})
+        w = g.pesos('distancia')
+    if not isinstance(origenes, (list, tuple, set)):
+        origenes = [origenes]
+    cortes = sorted(set(cortes)) if isinstance(cortes, (list, tuple, set)) else [cortes]
+    tope = cortes[-1]
+    V = g.num_nodos
+    off, dst, vivos = g.offsets, g.destinos, g.vivos
+    dist = array('d', [INF]) * V
+    padre = array('i', [-1]) * V
+    raiz = array('i', [-1]) * V
+    fijados = bytearray(V)
+    fuentes = list(dict.fromkeys(g.indice_de(o) for o in origenes))
+    frontera_cola = []
+    for s in fuentes:
+        dist[s] = 0.0
+        raiz[s] = s
+        frontera_cola.append((0.0, s))
+    heapq.heapify(frontera_cola)
+
+    alcanzados = array('i')
+    nodos_explorados = 0
+    aristas_relajadas = 0
+    while frontera_cola:
+        d_u, u = heapq.heappop(frontera_cola)
+        if d_u > tope:
+            break                       # todo lo que queda está más allá del corte mayor
+        if fijados[u]:
+            continue
+        fijados[u] = 1
+        nodos_explorados += 1
+        alcanzados.append(u)
+        r = raiz[u]
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if fijados[v]:
+                continue
+            nuevo = d_u + w[k]
+            aristas_relajadas += 1
+            if nuevo < dist[v]:
+                dist[v] = nuevo
+                padre[v] = u
+                raiz[v] = r
+                heapq.heappush(frontera_cola, (nuevo, v))
+
+    # anillo de cada nodo alcanzado (alcanzados sale en orden de distancia)
+    anillo = array('b', [-1]) * V
+    por_corte = [0] * len(cortes)
+    k = 0
+    for n, i in enumerate(alcanzados):
+        while dist[i] > cortes[k]:
+            por_corte[k] = n            # nodos con dist <= cortes[k]
+            k += 1
+        anillo[i] = k
+    for j in range(k, len(cortes)):
+        por_corte[j] = len(alcanzados)
+    # los que quedaron en la cola no están dentro de ningún corte
+    for i in range(V):
+        if not fijados[i]:
+            raiz[i] = -1
+
+    # aristas de frontera por corte
+    ids = g.ids
+    frontera = {c: [] for c in cortes}
+    for u in alcanzados:
+        d_u = dist[u]
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if w[k] <= 0:
+                continue
+            d_v = dist[v] if fijados[v] else INF
+            for c in cortes[anillo[u]:]:
+                if d_v <= c:
+                    break
+                frontera[c].append((ids[u], ids[v], (c - d_u) / w[k]))
+
+    area = AreaAlcance(g.nodos, dist, padre, fijados, fuentes, cortes, alcanzados, anillo, raiz, frontera, g.mascara_nodos)
+    t1 = time.time()
+    stats = {
+        "algoritmo": "Isócronas (Dijkstra acotado" + (", multi-origen)" if len(fuentes) > 1 else ")"),
+        "V": len(g),
+        "E_aproximado": g.arcos_presentes // 2 if V > 0 else 0,
+        "origenes": len(fuentes),
+        "peso": peso,
+        "cortes": cortes,
+        "nodos_por_corte": por_corte,
+        "aristas_frontera": [len(frontera[c]) for c in cortes],
+        "nodos_explorados": nodos_explorados,
+        "aristas_relajadas": aristas_relajadas,
+        "fraccion_explorada": round(nodos_explorados / V, 4) if V else 0.0,
+        "tiempo_algo_s": round(t1 - t0, 6),
+        "complejidad_teorica": "O((V' + E') log V'), V'/E' = nodos/aristas dentro del corte mayor"
+    }
+    return area, stats
@@ -4,10 +4,27 @@ Loader avanzado (OSM + CSV). Provee:
 - construir_desde_osm(place_name, network_type) -> (lista_ady, nodos_info, grafo_osm)
 - carga_csvs(aristas_csv, nodos_csv) -> (lista_ady, nodos_info)
 - guarda_csvs(lista_ady, nodos_info, aristas_csv, nodos_csv)
+lista_ady es un GrafoCSR (grafos/csr.py): arreglos compactos que además se
+recorren como {u: [(v,d,t), ...]}. La numeración densa de nodos (TablaIds) se
+guarda junto al CSV de aristas (<aristas>_ids.csv) para que sea estable entre ejecuciones.
+carga_csvs además escribe una caché binaria (<aristas>.cache) con arreglos,
+coordenadas y tabla de ids; si los CSV no cambiaron (tamaño+mtime o sha1) la
+siguiente carga la mapea con mmap sin parsear nada.
 """
 
-import csv, os
+import csv, hashlib, math, os
+from array import array
 from collections import deque
+from itertools import islice
+
+try:
+    from grafos.csr import ConstructorCSR, CoordenadasCSR, abre_grafo_binario
+    from grafos.tabla_ids import TablaIds, ruta_tabla_ids
+    from grafos.binario import escribe_secciones, lee_meta
+except ImportError:
+    from csr import ConstructorCSR, CoordenadasCSR, abre_grafo_binario
+    from tabla_ids import TablaIds, ruta_tabla_ids
+    from binario import escribe_secciones, lee_meta
 
 # osmnx es opcional; si no está, las funciones OSM fallarán con RuntimeError
 try:
@@ -16,6 +33,7 @@ except Exception:
     ox = None
 
 VELOCIDAD_KMH = 30.0
+VERSION_CACHE = 2
 
 def metros_a_minutos(dist_m):
     distancia_km = dist_m / 1000.0
@@ -26,48 +44,164 @@ def construir_desde_osm(place_name="San Juan de Lurigancho, Lima, Peru", network
     if ox is None:
         raise RuntimeError("osmnx no está instalado; instala osmnx o usa CSV.")
     G = ox.graph_from_place(place_name, network_type=network_type, simplify=True)
-    lista_ady = {}
+    cons = ConstructorCSR()
     nodos_info = {}
     # nodos
     for nodo, data in G.nodes(data=True):
         x = data.get('x', 0.0); y = data.get('y', 0.0)
         nodos_info[nodo] = (x, y)
-        lista_ady[nodo] = []
+        cons.nodo(nodo)
     # aristas
     for u, v, key, data in G.edges(data=True, keys=True):
         length = data.get('length', 100.0)
         tiempo = metros_a_minutos(length)
-        lista_ady[u].append((v, float(length), tiempo))
         oneway = data.get('oneway', None)
-        if oneway in (False, 'false', 'False', 0, None):
-            lista_ady[v].append((u, float(length), tiempo))
-    return lista_ady, nodos_info, G
+        dirigida = oneway not in (False, 'false', 'False', 0, None)
+        cons.arista(u, v, float(length), tiempo, dirigida=dirigida)
+    return cons.construir(), nodos_info, G
 
-def carga_csvs(aristas_csv='grafo_sjl_osm.csv', nodos_csv='nodos_sjl_osm.csv'):
+def carga_csvs(aristas_csv='grafo_sjl_osm.csv', nodos_csv='nodos_sjl_osm.csv', ruta_ids=None, usar_cache=True):
     if not os.path.exists(aristas_csv) or not os.path.exists(nodos_csv):
         raise FileNotFoundError(f"CSV no encontrado: {aristas_csv} o {nodos_csv}")
-    nodos_info = {}
-    lista_ady = {}
-    with open(nodos_csv, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            nodo = int(row['nodo_id']) if row['nodo_id'].isdigit() else row['nodo_id']
-            lat = float(row['latitud']); lon = float(row['longitud'])
-            nodos_info[nodo] = (lon, lat)
-            lista_ady[nodo] = []
-    with open(aristas_csv, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            u = int(row['origen']) if row['origen'].isdigit() else row['origen']
-            v = int(row['destino']) if row['destino'].isdigit() else row['destino']
-            d = float(row.get('distancia_metros', 0.0))
-            t = float(row.get('tiempo_minutos', 0.0))
-            if u not in lista_ady: lista_ady[u] = []
-            if v not in lista_ady: lista_ady[v] = []
-            lista_ady[u].append((v, d, t))
-            lista_ady[v].append((u, d, t))
+    fuentes = (aristas_csv, nodos_csv)
+    if usar_cache:
+        cargado = carga_cache(ruta_cache(aristas_csv), fuentes)
+        if cargado is not None:
+            return cargado
+    ruta_ids = ruta_ids or ruta_tabla_ids(aristas_csv)
+    tabla = None
+    if os.path.exists(ruta_ids):
+        try:
+            tabla = TablaIds.carga(ruta_ids)
+        except (OSError, ValueError, KeyError):
+            tabla = None
+    n_previos = len(tabla) if tabla is not None else 0
+    lista_ady, nodos_info = _lee_csvs(aristas_csv, nodos_csv, tabla)
+    # tabla desactualizada: tiene ids que ya no aparecen en los CSV -> se renumera
+    if tabla is not None and any(lista_ady.grado(i) == 0 and lista_ady.ids[i] not in nodos_info for i in range(n_previos)):
+        lista_ady, nodos_info = _lee_csvs(aristas_csv, nodos_csv, None)
+        n_previos = 0
+    if len(lista_ady.nodos) != n_previos:
+        _guarda_tabla(lista_ady.nodos, ruta_ids)
+    if usar_cache:
+        try:
+            guarda_cache(ruta_cache(aristas_csv), lista_ady, nodos_info, fuentes)
+        except OSError:
+            pass
     return lista_ady, nodos_info
 
+# ---------------- caché binaria ----------------
+def ruta_cache(aristas_csv):
+    """grafo_sjl_osm.csv -> grafo_sjl_osm.cache (misma carpeta)."""
+    return os.path.splitext(aristas_csv)[0] + '.cache'
+
+def _sha1(ruta):
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1 << 20), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+def _firma(ruta):
+    st = os.stat(ruta)
+    return {'tamano': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha1': _sha1(ruta)}
+
+def _fuente_vigente(firma, ruta):
+    st = os.stat(ruta)
+    if st.st_size != firma['tamano']:
+        return False
+    if st.st_mtime_ns == firma['mtime_ns']:
+        return True
+    # mtime distinto (copia, touch, checkout): se confirma por contenido
+    return _sha1(ruta) == firma['sha1']
+
+def guarda_cache(ruta_bin, lista_ady, nodos_info, fuentes):
+    """Escribe grafo + coordenadas + tabla de ids con la firma de los CSV de origen."""
+    coords = nodos_info if isinstance(nodos_info, CoordenadasCSR) else CoordenadasCSR.desde_dict(lista_ady.nodos, nodos_info)
+    secciones = lista_ady.secciones()
+    secciones.update(coords.secciones())
+    meta = {'version': VERSION_CACHE, 'fuentes': [_firma(r) for r in fuentes]}
+    escribe_secciones(ruta_bin, meta, secciones)
+
+def carga_cache(ruta_bin, fuentes):
+    """(lista_ady, nodos_info) mapeados desde la caché, o None si falta o está desactualizada."""
+    if not os.path.exists(ruta_bin):
+        return None
+    try:
+        meta = lee_meta(ruta_bin)
+        if meta.get('version') != VERSION_CACHE or len(meta['fuentes']) != len(fuentes):
+            return None
+        if not all(_fuente_vigente(f, r) for f, r in zip(meta['fuentes'], fuentes)):
+            return None
+        return abre_grafo_binario(ruta_bin)
+    except (OSError, ValueError, KeyError):
+        return None
+
+def _guarda_tabla(tabla, ruta_ids):
+    # la tabla es un acelerador: si la carpeta no es escribible se sigue sin ella
+    try:
+        tabla.guarda(ruta_ids)
+    except OSError:
+        pass
+
+FILAS_POR_BLOQUE = 65536
+
+def _bloques_columnas(ruta, columnas):
+    """
+    Lee el CSV con csv.reader en bloques de FILAS_POR_BLOQUE filas y entrega
+    cada bloque transpuesto: una tupla de textos por columna pedida (None si
+    la columna no existe en la cabecera).
+    """
+    with open(ruta, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        cabecera = next(reader, None) or []
+        pos = [cabecera.index(c) if c in cabecera else None for c in columnas]
+        while True:
+            filas = list(filter(None, islice(reader, FILAS_POR_BLOQUE)))
+            if not filas:
+                break
+            cols = list(zip(*filas))
+            yield len(filas), [cols[p] if p is not None else None for p in pos]
+
+def _ids_columna(col):
+    """Misma regla que antes (int si isdigit(), si no texto), resuelta por columna."""
+    if all(map(str.isdigit, col)):
+        return list(map(int, col))
+    return [int(x) if x.isdigit() else x for x in col]
+
+def _floats_columna(col, n):
+    if col is None:
+        return array('d', bytes(8 * n))      # columna ausente -> 0.0
+    return array('d', map(float, col))
+
+def _lee_csvs(aristas_csv, nodos_csv, tabla=None):
+    """Ingesta por columnas: los bloques van directo a los buffers del ConstructorCSR."""
+    cons = ConstructorCSR(tabla)
+    interna_lote = cons.nodos.interna_lote
+    lon = array('d'); lat = array('d')
+    for n, (ids, lats, lons) in _bloques_columnas(nodos_csv, ('nodo_id', 'latitud', 'longitud')):
+        previos = len(lon)
+        idx = interna_lote(_ids_columna(ids))
+        if len(cons.nodos) == previos + n and (n == 0 or idx[0] == previos):
+            # caso normal: todos los ids del bloque son nuevos y consecutivos
+            lon.extend(array('d', map(float, lons))); lat.extend(array('d', map(float, lats)))
+            continue
+        falta = len(cons.nodos) - len(lon)
+        if falta > 0:
+            lon.extend(array('d', [math.nan]) * falta); lat.extend(array('d', [math.nan]) * falta)
+        for i, y, x in zip(idx, map(float, lats), map(float, lons)):
+            lon[i] = x; lat[i] = y
+    columnas = ('origen', 'destino', 'distancia_metros', 'tiempo_minutos')
+    for n, (us, vs, ds, ts) in _bloques_columnas(aristas_csv, columnas):
+        iu = interna_lote(_ids_columna(us))
+        iv = interna_lote(_ids_columna(vs))
+        cons.aristas_bloque(iu, iv, _floats_columna(ds, n), _floats_columna(ts, n))
+    falta = len(cons.nodos) - len(lon)
+    if falta > 0:
+        lon.extend(array('d', [math.nan]) * falta); lat.extend(array('d', [math.nan]) * falta)
+    grafo = cons.construir()
+    return grafo, CoordenadasCSR(grafo.nodos, lon, lat)
+
 def guarda_csvs(lista_ady, nodos_info, aristas_csv='grafo_sjl_osm_out.csv', nodos_csv='nodos_sjl_osm_out.csv'):
     seen = set(); rows = []
     for u, vecinos in lista_ady.items():
@@ -85,3 +219,5 @@ def guarda_csvs(lista_ady, nodos_info, aristas_csv='grafo_sjl_osm_out.csv', nodo
         writer.writeheader()
         for nodo, (x,y) in nodos_info.items():
             writer.writerow({'nodo_id': nodo, 'latitud': y, 'longitud': x})
+    if isinstance(getattr(lista_ady, 'nodos', None), TablaIds):
+        _guarda_tabla(lista_ady.nodos, ruta_tabla_ids(aristas_csv))
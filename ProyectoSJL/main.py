@@ -8,16 +8,29 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import time, os
 import math
+import threading
 
 # módulos del proyecto
 from grafos.componentes import obtener_componente_gigante, extraer_subgrafo
 from grafos.loader import construir_desde_osm, carga_csvs, guarda_csvs
 from utils.converters import lista_ady_to_list_weighted, lista_ady_to_dict_dict
-from grafos.dijkstra import Dijkstra
+from grafos.cache_arboles import CacheArboles
+from grafos.espacial import IndiceEspacial, espacial_para
+from grafos.isocronas import isocronas
+from grafos.perfiles import PerfilesGrafo, dijkstra_dependiente, minutos_de_hora
+from grafos.trabajos import PlanificadorTrabajos
+from grafos.trafico import actualiza_pesos, lee_cambios
+from grafos.vistas import VistaGrafo
+from grafos.dijkstra_bidireccional import DijkstraBidireccional
+from grafos.astar import AEstrella
+from grafos.contraccion import JerarquiaContraccion, jerarquia_para
+from grafos.alt import IndiceALT, alt_para
 from grafos.bfs_dfs import DFS, BFS
 from grafos.floyd import floyd_warshall, reconstruir_camino
+from grafos.apsp import apsp_dijkstra
 from grafos.mst_prim import MSTPrim
 from grafos.mst_kruskal import MSTKruskal
+from grafos.mst_boruvka import MSTBoruvka
 from visualizacion.plots import dibuja_subgrafo, mostrar_mst, mostrar_ruta
 
 
@@ -50,18 +63,49 @@ def formatea_resumen(stats):
             lines.append(f"• Distancia total: {round(d,2)} metros")
     if "tiempo_estimado_min" in stats and stats.get("tiempo_estimado_min") is not None:
         lines.append(f"• Tiempo estimado: {round(stats.get('tiempo_estimado_min'),2)} minutos")
+    if "hora_salida" in stats:
+        lines.append(f"• Hora de salida: {stats.get('hora_salida')}" + (f" → llegada {stats.get('hora_llegada')}" if "hora_llegada" in stats else ""))
     if "largo_camino_nodos" in stats:
         lines.append(f"• Longitud del camino: {stats.get('largo_camino_nodos')} nodos")
+    if "arcos_cambiados" in stats:
+        lines.append(f"• Arcos cambiados ({stats.get('peso')}): {stats.get('arcos_cambiados')} de {stats.get('cambios')} cambios ({stats.get('ignorados')} ignorados)")
+    for rp in stats.get("reparaciones", []):
+        que = f"tabla {rp['tabla']} marca {rp['origen']}" if "tabla" in rp else f"árbol desde {rp['origen']}"
+        lines.append(f"  - {que}: {rp['nodos_tocados']} nodos tocados, {rp['subarboles_afectados']} sin distancia, {rp['tiempo_s']} s")
+    if stats.get("ch_descartada"):
+        lines.append(f"• Jerarquía CH ({stats.get('peso')}): descartada, se rehace al próximo uso")
+    if "cache" in stats:
+        lines.append(f"• Árbol desde caché: {'Sí' if stats.get('cache') == 'acierto' else 'No (calculado)'}")
     if "nodos_explorados" in stats:
         lines.append(f"• Nodos explorados: {stats.get('nodos_explorados')}")
+    if "nodos_explorados_adelante" in stats:
+        lines.append(f"• Explorados adelante / atrás: {stats.get('nodos_explorados_adelante')} / {stats.get('nodos_explorados_atras')}")
+    if "marcas_activas" in stats:
+        lines.append(f"• Marcas usadas / total: {stats.get('marcas_activas')} / {stats.get('marcas')}")
+    if "cortes" in stats:
+        for c, n, f in zip(stats["cortes"], stats["nodos_por_corte"], stats["aristas_frontera"]):
+            lines.append(f"• Hasta {c:g} ({stats.get('peso')}): {n} nodos, {f} aristas de frontera")
     if "aristas_relajadas" in stats:
         lines.append(f"• Aristas relajadas: {stats.get('aristas_relajadas')}")
     if "aristas_consideradas" in stats:
         lines.append(f"• Aristas consideradas: {stats.get('aristas_consideradas')}")
     if "aristas_en_mst" in stats:
         lines.append(f"• Aristas en MST: {stats.get('aristas_en_mst')}")
+    if "arboles" in stats:
+        lines.append(f"• Árboles en el bosque: {stats.get('arboles')}")
+        if stats["arboles"] > 1:
+            arboles = sorted(zip(stats["nodos_por_arbol"], stats["costo_por_arbol"], stats["raices"]), key=lambda a: -a[0])
+            for n, c, raiz in arboles[:5]:
+                lines.append(f"  - desde {raiz}: {n} nodos, costo {round(c,2)}")
+            if len(arboles) > 5:
+                lines.append(f"  - ... y {len(arboles) - 5} árboles más")
     if "costo_total" in stats:
         lines.append(f"• Costo total (suma pesos): {round(stats.get('costo_total'),2)}")
+    if "detalle_rondas" in stats:
+        lines.append(f"• Rondas: {stats.get('rondas')} (componentes finales: {stats.get('componentes_finales')})")
+        for rd in stats["detalle_rondas"]:
+            lines.append(f"  - ronda {rd['ronda']}: {rd['componentes']} componentes, {rd['aristas_vivas']} aristas vivas, "
+                         f"+{rd['aristas_agregadas']} aristas (costo {round(rd['costo'],2)}), {rd['tiempo_s']} s")
     if "ciclos_omitidos" in stats:
         lines.append(f"• Ciclos detectados/omitidos: {stats.get('ciclos_omitidos')}")
     if "total_nodos_visitados" in stats:
@@ -74,6 +118,8 @@ def formatea_resumen(stats):
     # tiempo y complejidad
     if "tiempo_algo_s" in stats:
         lines.append(f"• Tiempo de ejecución (algoritmo): {stats.get('tiempo_algo_s')} s")
+    for t in stats.get("trabajadores", []):
+        lines.append(f"  - proceso {t['pid']}: {t['fuentes']} fuentes, Dijkstra {round(t['tiempo_dijkstra_s'],3)} s, escritura {round(t['tiempo_escritura_s'],3)} s")
     if "tiempo_ejecucion_gui" in stats:
         lines.append(f"• Tiempo total (GUI medido): {round(stats.get('tiempo_ejecucion_gui'),6)} s")
     if "complejidad_teorica" in stats:
@@ -104,13 +150,20 @@ class App:
         root.geometry('1000x700')
 
         # datos del grafo
-        self.lista_ady = None   # {u: [(v,d,t), ...], ...}
+        self.lista_ady = None   # GrafoCSR o {u: [(v,d,t), ...], ...}
         self.nodos_info = None  # {u: (lon,lat), ...}
         self.grafo_osm = None   # objeto de osmnx si se usó
         self.last_image = None
-        # backups para restaurar grafo original
+        # grafo original (las vistas filtradas lo comparten, nunca se modifica) para restaurarlo
         self._lista_ady_backup = None
-        self._nodos_info_backup = None
+        self._ruta_aristas = None   # CSV de aristas cargado (para guardar la jerarquía a su lado)
+        self._preprocesos = {}      # (tipo, peso) -> (grafo, JerarquiaContraccion | IndiceALT) del grafo activo
+        self.version_grafo = 0      # sube cada vez que cambia el grafo activo
+        self.cache_arboles = CacheArboles()
+        self._espacial = None       # IndiceEspacial del grafo activo (se arma al primer uso)
+        self._perfiles = None       # PerfilesGrafo (clase de vía por arco) del grafo activo
+        self._pesos_en_vivo = False # el grafo cargado recibió cambios de tráfico: CH/ALT del disco ya no valen
+        self.trabajos = PlanificadorTrabajos(root)  # algoritmos largos fuera del hilo de Tk
 
 
         # layout
@@ -127,9 +180,12 @@ class App:
         ttk.Button(left, text='Usar componente gigante', width=btn_w, command=self.usar_componente_gigante).pack(pady=6)
         ttk.Button(left, text='Restaurar grafo original', width=btn_w, command=self.restaurar_grafo_original).pack(pady=6)
         ttk.Button(left, text='Dijkstra', width=btn_w, command=self.panel_dijkstra).pack(pady=6)
+        ttk.Button(left, text='Isócronas', width=btn_w, command=self.panel_isocronas).pack(pady=6)
+        ttk.Button(left, text='Tráfico en vivo', width=btn_w, command=self.panel_trafico).pack(pady=6)
         ttk.Button(left, text='Floyd-Warshall', width=btn_w, command=self.panel_floyd).pack(pady=6)
         ttk.Button(left, text='Prim (MST)', width=btn_w, command=self.panel_prim).pack(pady=6)
         ttk.Button(left, text='Kruskal (MST)', width=btn_w, command=self.panel_kruskal).pack(pady=6)
+        ttk.Button(left, text='Borůvka (MST)', width=btn_w, command=self.panel_boruvka).pack(pady=6)
         ttk.Button(left, text='DFS', width=btn_w, command=self.panel_dfs).pack(pady=6)
         ttk.Button(left, text='Guardar grafo actual a CSV', width=btn_w, command=self.save_csvs).pack(pady=6)
         ttk.Button(left, text='Ver última imagen', width=btn_w, command=self.show_last_image).pack(pady=6)
@@ -142,22 +198,135 @@ class App:
         self.dynamic.pack(fill=tk.BOTH, expand=True)
         bottom = ttk.Frame(right)
         bottom.pack(fill=tk.X, pady=(8,0))
+        fila = ttk.Frame(bottom)
+        fila.pack(fill=tk.X)
+        self.barra = ttk.Progressbar(fila, length=260, mode='determinate')
+        self.barra.pack(side=tk.LEFT, padx=4)
+        self.lbl_trabajo = ttk.Label(fila, text='Sin trabajos en curso')
+        self.lbl_trabajo.pack(side=tk.LEFT, padx=6)
+        ttk.Button(fila, text='Cancelar', command=self.cancela_trabajo).pack(side=tk.RIGHT, padx=4)
         ttk.Label(bottom, text='Salida:').pack(anchor='w')
         self.text_out = tk.Text(bottom, height=10, wrap='word')
         self.text_out.pack(fill=tk.X, padx=4, pady=4)
 
     # ---------------- utilities ----------------
     def log(self, msg):
+        if threading.current_thread() is not threading.main_thread():
+            # desde un trabajo en segundo plano: Tk solo se toca en su hilo
+            self.trabajos.en_principal(self.log, msg)
+            return
         ts = time.strftime('%H:%M:%S')
         self.text_out.insert(tk.END, f'[{ts}] {msg}\n')
         self.text_out.see(tk.END)
 
+    def libre(self, accion):
+        """False (y aviso) si hay un trabajo en curso: no se cambia el grafo bajo sus pies."""
+        if self.trabajos.ocupado():
+            messagebox.showwarning(accion, 'Hay un trabajo en curso: espera a que termine o cancélalo.')
+            return False
+        return True
+
+    # ---------------- trabajos en segundo plano ----------------
+    def lanza_trabajo(self, nombre, funcion, al_terminar):
+        """
+        funcion(progreso) corre en el hilo de trabajos y no toca widgets (self.log sí
+        se puede usar); al_terminar(resultado) corre en el hilo de Tk.
+        """
+        if self.trabajos.ocupado():
+            self.log(f'{nombre}: en cola hasta que termine el trabajo actual.')
+        def terminado(resultado):
+            self._fin_trabajo()
+            al_terminar(resultado)
+        def fallo(trabajo, mensaje):
+            self._fin_trabajo()
+            self.log(f'{trabajo.nombre} falló: {mensaje}')
+            messagebox.showerror(trabajo.nombre, mensaje)
+        def cancelado(trabajo):
+            self._fin_trabajo()
+            self.log(f'{trabajo.nombre} cancelado tras {trabajo.segundos:.1f} s.')
+        return self.trabajos.lanza(nombre, funcion, al_terminar=terminado, al_fallar=fallo,
+                                   al_cancelar=cancelado, al_progresar=self.muestra_progreso)
+
+    def muestra_progreso(self, trabajo):
+        if trabajo.total:
+            self.barra.configure(maximum=trabajo.total, value=trabajo.hechos)
+            self.lbl_trabajo.configure(text=f'{trabajo.nombre}: {trabajo.hechos}/{trabajo.total} '
+                                            f'({100 * trabajo.hechos / trabajo.total:.0f} %)')
+        else:
+            self.barra.configure(value=0)
+            self.lbl_trabajo.configure(text=f'{trabajo.nombre}: en curso...')
+
+    def _fin_trabajo(self):
+        self.barra.configure(value=0)
+        self.lbl_trabajo.configure(text='Sin trabajos en curso')
+
+    def cancela_trabajo(self):
+        if self.trabajos.cancela():
+            self.log('Cancelación pedida; el trabajo se detiene en su próximo aviso de progreso.')
+        else:
+            self.log('No hay trabajos que cancelar.')
+
+    def grafo_cambiado(self):
+        """Llamar cada vez que se reemplaza self.lista_ady: nueva versión y caché de árboles vacía."""
+        self.version_grafo += 1
+        self.cache_arboles.invalida()
+        self._espacial = None
+        self._perfiles = None
+
+    def aplica_trafico(self, cambios, peso='tiempo', dirigida=False):
+        """
+        Cambios de peso en sitio sobre el grafo activo. Sube la versión, pero los
+        árboles de la caché y las filas de los índices ALT de ese peso (un árbol
+        por marca y sentido) se reparan, solo los subárboles afectados, en vez
+        de descartarse; stats["reparaciones"] trae los nodos tocados de cada
+        uno. La jerarquía CH de ese peso se descarta (stats["ch_descartada"])
+        y, como los perfiles, se rehace al próximo uso.
+        Se llama en el hilo de Tk sin trabajos en curso (libre): la versión
+        sube y CH / perfiles se descartan ya, así un trabajo lanzado después
+        no usa nada viejo. Retorna trabajo(progreso) -> stats, que cambia los
+        pesos y repara en el hilo de trabajos.
+        """
+        campo = 'distancia' if peso == 'distancia' else 'tiempo'
+        grafo, anterior = self.lista_ady, self.version_grafo
+        self.version_grafo += 1
+        version = self.version_grafo
+        alts, ch_descartada = [], False
+        for (tipo, peso_pre), (g_pre, hecho) in list(self._preprocesos.items()):
+            if g_pre is not grafo or peso_pre != campo:
+                continue                # el otro peso no cambia: sigue valiendo
+            if tipo == 'alt':
+                alts.append(hecho)
+            else:
+                del self._preprocesos[(tipo, peso_pre)]
+                ch_descartada = True
+        self._perfiles = None
+        if not isinstance(grafo, VistaGrafo):
+            self._pesos_en_vivo = True  # una vista guarda sus cambios; el grafo cargado no
+
+        def trabajo(progreso):
+            # sin avisos de progreso: una vez cambiados los pesos no se deja a medio reparar
+            arcos, stats = actualiza_pesos(grafo, cambios, peso, dirigida)
+            g = grafo.csr() if isinstance(grafo, VistaGrafo) else grafo
+            stats["reparaciones"] = self.cache_arboles.repara(g, arcos, campo, anterior, version)
+            for hecho in alts:
+                if arcos:
+                    # vista ponderada nueva: la que guarda el índice apunta a los arreglos de antes
+                    filas = hecho.reparar(lista_ady_to_list_weighted(grafo, campo), arcos)
+                    stats["reparaciones"] += filas
+                    self.log(f'Índice ALT ({campo}): {len(filas)} filas reparadas en {hecho.stats.get("tiempo_reparacion_s")} s.')
+            stats["ch_descartada"] = ch_descartada
+            return stats
+
+        return trabajo
+
     # ---------------- obtener grafo (BOTÓN HÍBRIDO) ----------------
     def obtain_grafo(self):
         """
         Botón híbrido: pregunta al usuario si desea descargar desde OSM.
         Si sí: descarga (requiere osmnx). Si no: abre diálogo para seleccionar CSVs.
         """
+        if not self.libre('Obtener grafo'):
+            return
         answer = messagebox.askyesno('Obtener grafo', '¿Deseas descargar el grafo desde OpenStreetMap (OSM)?\n\n'
                                                       'Si NO, seleccionarás archivos CSV (grafo_sjl_osm.csv y nodos_sjl_osm.csv).')
         if answer:
@@ -168,6 +337,9 @@ class App:
                 self.lista_ady = lista_ady
                 self.nodos_info = nodos_info
                 self.grafo_osm = G
+                self._ruta_aristas = None
+                self._pesos_en_vivo = False
+                self.grafo_cambiado()
                 self.log(f'Descarga OSM completada. Nodos: {len(nodos_info)}. Usa "Guardar grafo actual a CSV" si deseas exportar.')
                 messagebox.showinfo('OSM', 'Descarga completada.')
             except Exception as e:
@@ -186,6 +358,9 @@ class App:
                 self.lista_ady = lista_ady
                 self.nodos_info = nodos_info
                 self.grafo_osm = None
+                self._ruta_aristas = aristas
+                self._pesos_en_vivo = False
+                self.grafo_cambiado()
                 self.log(f'CSV cargados. Nodos: {len(nodos_info)}')
                 messagebox.showinfo('Carga CSV', 'Carga completada.')
             except Exception as e:
@@ -198,7 +373,11 @@ class App:
             messagebox.showwarning('No data', 'No hay grafo cargado para guardar.')
             return
         try:
-            guarda_csvs(self.lista_ady, self.nodos_info)
+            info = self.nodos_info
+            if self._lista_ady_backup is not None and self.lista_ady is not self._lista_ady_backup:
+                # nodos_info es el del grafo completo: solo se guardan los nodos del grafo activo
+                info = {n: info[n] for n in self.lista_ady if n in info}
+            guarda_csvs(self.lista_ady, info)
             self.log('Graos guardados: grafo_sjl_osm_out.csv / nodos_sjl_osm_out.csv')
             messagebox.showinfo('Guardar', 'CSVs guardados en carpeta actual.')
         except Exception as e:
@@ -208,51 +387,49 @@ class App:
     # ---------------- COMPONENTE GIGANTE ----------------
     def usar_componente_gigante(self):
         """
-        Extrae la componente gigante del grafo actual y reemplaza self.lista_ady.
-        Hace backup con deepcopy la primera vez. Verifica aplicando DFS corto.
+        Extrae la componente gigante del grafo actual y reemplaza self.lista_ady
+        por una vista (máscara de nodos) sobre el grafo original, que se
+        conserva sin copiar. Verifica aplicando DFS corto.
         """
-        from copy import deepcopy
-        from grafos.componentes import detectar_componentes, obtener_componente_gigante, extraer_subgrafo
+        from grafos.componentes import Componentes, componentes_fuertes, obtener_componente_gigante, extraer_subgrafo
         if self.lista_ady is None:
             messagebox.showwarning("Sin grafo", "Primero carga un grafo (CSV u OSM).")
             return
+        if not self.libre("Componente gigante"):
+            return
 
-        # Backup seguro (deep copy) la primera vez
+        # el original se guarda por referencia: la componente gigante es una vista
+        # (o, para grafos dict, un dict nuevo) y ninguno modifica el original;
+        # nodos_info se comparte tal cual (la vista sabe qué nodos tiene)
         if self._lista_ady_backup is None:
-            try:
-                self._lista_ady_backup = deepcopy(self.lista_ady)
-                self._nodos_info_backup = deepcopy(self.nodos_info) if self.nodos_info is not None else None
-                self.log("Backup del grafo original creado.")
-            except Exception as e:
-                # fallback a copia superficial si deepcopy falla por tamaño
-                self._lista_ady_backup = dict(self.lista_ady)
-                self._nodos_info_backup = dict(self.nodos_info) if self.nodos_info else None
-                self.log(f"Backup superficial creado (deepcopy falló): {e}")
+            self._lista_ady_backup = self.lista_ady
+            self.log("Grafo original conservado (sin copiar).")
 
-        # --- Información previa: contar componentes y tamaños ---
+        # --- Información previa: contar componentes y tamaños (una sola pasada) ---
+        comps = None
         try:
-            comps = detectar_componentes(self.lista_ady)
-            comp_count = len(comps)
-            sizes = sorted([len(c) for c in comps], reverse=True)
-            self.log(f"Componentes detectadas: {comp_count} (tamaños top: {sizes[:5]})")
+            comps = Componentes.desde_grafo(self.lista_ady)
+            sizes = comps.tamanos()
+            self.log(f"Componentes detectadas: {comps.num_componentes} (tamaños top: {sizes[:5]})")
+            if not getattr(self.lista_ady, 'simetrico', True):
+                # con calles de un sentido, además las fuertemente conexas
+                _, _, fuertes = componentes_fuertes(self.lista_ady)
+                self.log(f"Componentes fuertemente conexas: {len(fuertes)} (mayor: {max(fuertes, default=0)})")
         except Exception as e:
             self.log(f"No se pudo calcular componentes antes de extraer: {e}")
-            comps = []
-            comp_count = None
 
         # Obtener componente gigante
-        gigante = obtener_componente_gigante(self.lista_ady)
+        gigante = obtener_componente_gigante(self.lista_ady, comps)
         if not gigante:
             messagebox.showerror("Error", "No se encontró componente gigante.")
             return
 
-        # Extraer subgrafo
+        # Extraer subgrafo (vista sobre el grafo actual)
         sub = extraer_subgrafo(self.lista_ady, gigante)
 
         # Reemplazar grafo activo
         self.lista_ady = sub
-        if self.nodos_info:
-            self.nodos_info = {n: self.nodos_info[n] for n in gigante if n in self.nodos_info}
+        self.grafo_cambiado()
 
         self.log(f"Se aplicó la componente gigante: {len(gigante)} nodos (grafo activo reemplazado).")
 
@@ -290,15 +467,93 @@ class App:
         if self._lista_ady_backup is None:
             messagebox.showwarning("Restaurar", "Aún no has usado la componente gigante.")
             return
+        if not self.libre("Restaurar"):
+            return
 
-        self.lista_ady = dict(self._lista_ady_backup)
-        if self._nodos_info_backup:
-            self.nodos_info = dict(self._nodos_info_backup)
+        # las vistas nunca modifican el original (ni con tráfico en vivo): se reutiliza tal cual
+        self.lista_ady = self._lista_ady_backup
+        self.grafo_cambiado()
 
         self.log("Grafo original restaurado.")
         messagebox.showinfo("Restaurado", "Se restauró el grafo original completo.")
 
 
+    def preproceso_actual(self, tipo, peso='distancia'):
+        """
+        Jerarquía de contracción (tipo 'ch') o índice ALT (tipo 'alt') del grafo
+        activo: se arma una vez por grafo y peso. Se llama en el hilo de Tk y
+        retorna (hecho, construye): hecho es el ya armado (None si no hay) y
+        construye() lo arma sobre el grafo de ahora sin tocar self, para
+        correr en un trabajo; lo armado se guarda con guarda_preparado.
+        """
+        previo = self._preprocesos.get((tipo, peso))
+        grafo = self.lista_ady
+        clase, para = (JerarquiaContraccion, jerarquia_para) if tipo == 'ch' else (IndiceALT, alt_para)
+        original = self._lista_ady_backup is None or grafo is self._lista_ady_backup
+        ruta = None
+        if self._ruta_aristas and hasattr(grafo, 'offsets') and original and not self._pesos_en_vivo:
+            ruta = self._ruta_aristas   # grafo tal como se cargó del CSV: el preproceso se guarda junto a él
+
+        def construye():
+            hecho = para(grafo, ruta, peso) if ruta else clase.construir(lista_ady_to_list_weighted(grafo, peso), peso)
+            self.log(f'Preproceso {hecho.stats.get("algoritmo")} listo ({peso}) en {hecho.stats.get("tiempo_algo_s")} s.')
+            return hecho
+
+        return (previo[1] if previo is not None and previo[0] is grafo else None), construye
+
+    def guarda_preparado(self, clave, grafo, version, hecho):
+        """
+        En el hilo de Tk: guarda lo que armó un trabajo (clave (tipo, peso) de
+        preproceso_actual o 'perfiles') si el grafo activo sigue siendo el mismo.
+        """
+        if self.lista_ady is not grafo or self.version_grafo != version:
+            return                      # el grafo cambió mientras corría: ya no vale
+        if clave == 'perfiles':
+            self._perfiles = hecho
+        else:
+            self._preprocesos[clave] = (grafo, hecho)
+
+    def indice_espacial(self):
+        """Índice espacial de nodos/aristas del grafo activo: se arma (o se carga junto al CSV) al primer uso."""
+        if self._espacial is None:
+            original = self._lista_ady_backup is None or self.lista_ady is self._lista_ady_backup
+            if self._ruta_aristas and hasattr(self.lista_ady, 'offsets') and original:
+                self._espacial = espacial_para(self.nodos_info, self.lista_ady, self._ruta_aristas)
+            else:
+                self._espacial = IndiceEspacial.construir(self.nodos_info, self.lista_ady)
+            self.log(f'Índice espacial listo: {self._espacial.stats.get("V")} nodos, celdas de {self._espacial.stats.get("celda_m")} m.')
+        return self._espacial
+
+    def perfiles_actual(self):
+        """
+        Perfiles de velocidad por hora del grafo activo: clase de vía de OSM si
+        se descargó, 'local' si vino de CSV. Como preproceso_actual: retorna
+        (perfiles o None, construye) y se guardan con guarda_preparado.
+        """
+        grafo, osm = self.lista_ady, self.grafo_osm
+
+        def construye():
+            return PerfilesGrafo.desde_osm(grafo, osm) if osm is not None else PerfilesGrafo.uniforme(grafo)
+
+        return self._perfiles, construye
+
+    def resuelve_nodo(self, texto):
+        """
+        Texto de un campo de nodo -> id del nodo. Acepta el id OSM o 'lat, lon'
+        (en ese caso se usa el nodo más cercano del grafo activo).
+        """
+        partes = texto.split(',')
+        if len(partes) == 2 and self.nodos_info:
+            try:
+                lat, lon = float(partes[0]), float(partes[1])
+            except ValueError:
+                lat = None
+            if lat is not None:
+                nodo, d = self.indice_espacial().cercano(lat, lon)
+                self.log(f'({lat}, {lon}) -> nodo {nodo} a {round(d, 1)} m')
+                return nodo
+        return int(texto) if texto.isdigit() else texto
+
     # ---------------- paneles de algoritmos (similares a lo que ya trabajaste) ----------------
     def clear_dynamic(self):
         for w in self.dynamic.winfo_children():
@@ -308,54 +563,179 @@ class App:
         self.clear_dynamic()
         ttk.Label(self.dynamic, text='Dijkstra (distancia)', font=('Helvetica',12,'bold')).pack(anchor='w')
         frm = ttk.Frame(self.dynamic, padding=6); frm.pack(anchor='w')
-        ttk.Label(frm, text='Nodo origen:').grid(row=0,column=0, sticky='w')
+        ttk.Label(frm, text='Nodo origen (id o lat,lon):').grid(row=0,column=0, sticky='w')
         e_or = ttk.Entry(frm, width=30); e_or.grid(row=0,column=1,padx=8,pady=4)
         ttk.Label(frm, text='Destino (opcional):').grid(row=1,column=0, sticky='w')
         e_dest = ttk.Entry(frm, width=30); e_dest.grid(row=1,column=1,padx=8,pady=4)
+        ttk.Label(frm, text='Modo (con destino):').grid(row=2,column=0, sticky='w')
+        modo = ttk.Combobox(frm, width=27, state='readonly', values=['Dijkstra', 'Bidireccional', 'A*', 'Contraction Hierarchies', 'ALT', 'Dependiente de la hora'])
+        modo.set('Dijkstra'); modo.grid(row=2,column=1,padx=8,pady=4)
+        ttk.Label(frm, text='Hora de salida (HH:MM, dependiente de la hora):').grid(row=3,column=0, sticky='w')
+        e_hora = ttk.Entry(frm, width=30); e_hora.insert(0, '08:00'); e_hora.grid(row=3,column=1,padx=8,pady=4)
         def run():
             if self.lista_ady is None:
                 messagebox.showwarning('No hay grafo','Carga el grafo primero (OSM o CSV).'); return
-            origen_raw = e_or.get().strip() or next(iter(self.lista_ady))
+            origen_raw = e_or.get().strip()
             destino_raw = e_dest.get().strip()
-            try:
-                origen = int(origen_raw) if str(origen_raw).isdigit() else origen_raw
-                destino = int(destino_raw) if destino_raw!='' and str(destino_raw).isdigit() else (destino_raw or None)
-            except:
-                origen, destino = origen_raw, (destino_raw or None)
+            origen = self.resuelve_nodo(origen_raw) if origen_raw else next(iter(self.lista_ady))
+            destino = self.resuelve_nodo(destino_raw) if destino_raw else None
+            salida = e_hora.get().strip() or '08:00'
+            if modo.get() == 'Dependiente de la hora':
+                try:
+                    minutos_de_hora(salida)
+                except ValueError:
+                    messagebox.showerror('Hora', 'Hora de salida inválida (usa HH:MM).'); return
             self.log(f'Ejecutando Dijkstra desde {origen} destino {destino}...')
-            t0 = time.time()
-            lag_list = lista_ady_to_list_weighted(self.lista_ady, 'distancia')
-            dist, cams, stats_algo = Dijkstra(lag_list, origen, destino)
-            t1 = time.time()
-            stats_algo["tiempo_ejecucion_gui"] = round(t1 - t0, 6)
-            # si queremos tiempo_estimado en minutos (usando 30 km/h)
-            if "distancia_total" in stats_algo and stats_algo["distancia_total"] != float('inf'):
-                velocidad_kmh = 30.0
-                minutos = (stats_algo["distancia_total"]/1000.0) / velocidad_kmh * 60.0
-                stats_algo["tiempo_estimado_min"] = round(minutos, 2)
-            # mostrar resumen en text_out
-            resumen = formatea_resumen(stats_algo)
-            self.text_out.delete(1.0, tk.END)
-            self.text_out.insert(tk.END, resumen + "\n")
-            # guardar CSV de resultados parcial (opcional)
-            fname = f'dijkstra_desde_{origen}.csv'
-            import csv as _csv
-            with open(fname,'w',newline='',encoding='utf-8') as f:
-                w = _csv.writer(f); w.writerow(['dest','dist','camino'])
-                for k in dist:
-                    w.writerow([k, dist[k] if dist[k]<float('inf') else 'inf', '->'.join(map(str,cams[k]))])
-            self.log(f'Dijkstra finalizado. Resultados guardados en {fname}')
-            # generar imagen de ruta si se pidió destino y hay ruta
-            if destino is not None and stats_algo.get("ruta"):
-                img = mostrar_ruta(stats_algo.get("ruta"))
-                if img:
-                    self.last_image = img
-                    self.log(f'Imagen ruta: {img}')
-            messagebox.showinfo('Dijkstra','Proceso finalizado.')
-
+            # lo que usa el trabajo se toma ahora: la GUI sigue viva mientras corre
+            m, grafo, version, nodos_info = modo.get(), self.lista_ady, self.version_grafo, self.nodos_info
+            lag_list = lambda: lista_ady_to_list_weighted(grafo, 'distancia')
+            # CH / ALT / perfiles: el ya armado, o cómo armarlo sobre 'grafo' dentro del trabajo
+            clave = previo = construye = None
+            if m in ('Contraction Hierarchies', 'ALT') and destino is not None:
+                clave = ('ch' if m == 'Contraction Hierarchies' else 'alt', 'distancia')
+                previo, construye = self.preproceso_actual(*clave)
+            elif m == 'Dependiente de la hora':
+                clave = 'perfiles'
+                previo, construye = self.perfiles_actual()
+
+            def trabajo(progreso):
+                t0 = time.time()
+                arbol = None
+                hecho = previo if previo is not None or construye is None else construye()
+                if m == 'Bidireccional' and destino is not None:
+                    # punto a punto: no hay árbol completo que exportar
+                    _, _, stats_algo = DijkstraBidireccional(lag_list(), origen, destino)
+                elif m == 'A*' and destino is not None and nodos_info:
+                    _, _, stats_algo = AEstrella(lag_list(), origen, destino, nodos_info)
+                elif m in ('Contraction Hierarchies', 'ALT') and destino is not None:
+                    _, _, stats_algo = hecho.consulta(origen, destino)
+                elif m == 'Dependiente de la hora':
+                    arbol, stats_algo = dijkstra_dependiente(hecho, origen, salida, destino)
+                else:
+                    # árbol completo desde la caché: la conversión y el Dijkstra solo corren si no está
+                    arbol, stats_algo = self.cache_arboles.consulta(lag_list, origen, destino, 'distancia', version, progreso)
+                t1 = time.time()
+                stats_algo["tiempo_ejecucion_gui"] = round(t1 - t0, 6)
+                # si queremos tiempo_estimado en minutos (usando 30 km/h)
+                if "distancia_total" in stats_algo and stats_algo["distancia_total"] != float('inf') and "hora_llegada" not in stats_algo:
+                    velocidad_kmh = 30.0
+                    minutos = (stats_algo["distancia_total"]/1000.0) / velocidad_kmh * 60.0
+                    stats_algo["tiempo_estimado_min"] = round(minutos, 2)
+                # guardar CSV de resultados parcial (opcional): árbol de predecesores,
+                # el camino a cada destino se obtiene siguiendo la columna 'predecesor'
+                fname = None
+                if arbol is not None:
+                    fname = f'dijkstra_desde_{origen}.csv'
+                    arbol.exporta_csv(fname)
+                return stats_algo, fname, hecho
+
+            def listo(resultado):
+                stats_algo, fname, hecho = resultado
+                if hecho is not None and hecho is not previo:
+                    self.guarda_preparado(clave, grafo, version, hecho)
+                # mostrar resumen en text_out
+                resumen = formatea_resumen(stats_algo)
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, resumen + "\n")
+                if fname:
+                    self.log(f'Dijkstra finalizado. Resultados guardados en {fname}')
+                if "cache" in stats_algo:
+                    c = self.cache_arboles.estadisticas()
+                    self.log(f'Caché de árboles: {c["arboles"]} árboles, {c["bytes_usados"] / 2**20:.1f} MB; '
+                             f'aciertos {c["aciertos"]}, fallos {c["fallos"]}, desalojos {c["desalojos"]}')
+                else:
+                    self.log(f'{stats_algo["algoritmo"]} finalizado. Nodos explorados: {stats_algo["nodos_explorados"]}')
+                # generar imagen de ruta si se pidió destino y hay ruta
+                if destino is not None and stats_algo.get("ruta"):
+                    img = mostrar_ruta(stats_algo.get("ruta"))
+                    if img:
+                        self.last_image = img
+                        self.log(f'Imagen ruta: {img}')
+                messagebox.showinfo('Dijkstra','Proceso finalizado.')
+
+            self.lanza_trabajo('Dijkstra', trabajo, listo)
+
+
+
+        ttk.Button(frm, text='Ejecutar Dijkstra', command=run).grid(row=4,column=0,columnspan=2,pady=8)
+
+    def panel_isocronas(self):
+        self.clear_dynamic()
+        ttk.Label(self.dynamic, text='Isócronas / área de servicio', font=('Helvetica',12,'bold')).pack(anchor='w')
+        frm = ttk.Frame(self.dynamic, padding=6); frm.pack(anchor='w')
+        ttk.Label(frm, text='Orígenes (id o lat,lon; varios con ;):').grid(row=0,column=0, sticky='w')
+        e_or = ttk.Entry(frm, width=30); e_or.grid(row=0,column=1,padx=8,pady=4)
+        ttk.Label(frm, text='Peso:').grid(row=1,column=0, sticky='w')
+        peso = ttk.Combobox(frm, width=27, state='readonly', values=['tiempo', 'distancia'])
+        peso.set('tiempo'); peso.grid(row=1,column=1,padx=8,pady=4)
+        ttk.Label(frm, text='Cortes (min o m, con comas):').grid(row=2,column=0, sticky='w')
+        e_c = ttk.Entry(frm, width=30); e_c.insert(0, '5,10,15'); e_c.grid(row=2,column=1,padx=8,pady=4)
+        def run():
+            if self.lista_ady is None:
+                messagebox.showwarning('No hay grafo','Carga el grafo primero (OSM o CSV).'); return
+            textos = [t.strip() for t in e_or.get().split(';') if t.strip()]
+            origenes = [self.resuelve_nodo(t) for t in textos] or [next(iter(self.lista_ady))]
+            faltan = [o for o in origenes if o not in self.lista_ady]
+            if faltan:
+                messagebox.showerror('Orígenes', f'No están en el grafo activo: {", ".join(map(str, faltan))}'); return
+            try:
+                cortes = [float(c) for c in e_c.get().split(',') if c.strip()]
+            except ValueError:
+                messagebox.showwarning('Cortes', 'Los cortes deben ser números separados por comas.'); return
+            if not cortes:
+                messagebox.showwarning('Cortes', 'Indica al menos un corte.'); return
+            self.log(f'Calculando isócronas desde {origenes} con cortes {cortes} ({peso.get()})...')
+            grafo, p = self.lista_ady, peso.get()
+
+            def trabajo(progreso):
+                t0 = time.time()
+                area, stats = isocronas(grafo, origenes, cortes, p)
+                stats["tiempo_ejecucion_gui"] = round(time.time() - t0, 6)
+                fname = f'isocronas_desde_{origenes[0]}.csv'
+                area.exporta_csv(fname)
+                return stats, fname
+
+            def listo(resultado):
+                stats, fname = resultado
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
+                self.log(f'Isócronas finalizadas. Nodos alcanzados guardados en {fname}')
+                messagebox.showinfo('Isócronas','Proceso finalizado.')
+
+            # en el hilo de trabajos: cualquier falla llega al aviso de error de lanza_trabajo
+            self.lanza_trabajo('Isócronas', trabajo, listo)
+
+        ttk.Button(frm, text='Calcular isócronas', command=run).grid(row=3,column=0,columnspan=2,pady=8)
+
+    def panel_trafico(self):
+        self.clear_dynamic(); ttk.Label(self.dynamic, text='Tráfico en vivo (cambios de peso)', font=('Helvetica',12,'bold')).pack(anchor='w')
+        frm = ttk.Frame(self.dynamic, padding=6); frm.pack(anchor='w')
+        ttk.Label(frm, text='CSV: origen,destino y tiempo_minutos | distancia_metros | velocidad_kmh').grid(row=0,column=0,columnspan=2,sticky='w')
+        solo_ida = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frm, text='Solo sentido origen → destino', variable=solo_ida).grid(row=1,column=0,columnspan=2,sticky='w')
+        def run():
+            if self.lista_ady is None or not hasattr(self.lista_ady, 'offsets'):
+                messagebox.showwarning('No hay grafo','Carga el grafo primero (CSV/OSM)'); return
+            if not self.libre('Tráfico en vivo'):
+                return
+            ruta = filedialog.askopenfilename(title='Seleccione CSV de cambios', filetypes=[('CSV','*.csv'),('All','*.*')])
+            if not ruta:
+                return
+            try:
+                cambios, peso = lee_cambios(ruta)
+            except (OSError, ValueError, KeyError) as e:
+                messagebox.showerror('Tráfico', str(e)); return
+            self.log(f'Aplicando {len(cambios)} cambios de {peso}...'); t0 = time.time()
+            trabajo, version = self.aplica_trafico(cambios, peso, solo_ida.get()), self.version_grafo
 
+            def listo(stats):
+                stats["tiempo_ejecucion_gui"] = round(time.time() - t0,6)
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
+                self.log(f'Tráfico aplicado: {stats["arcos_cambiados"]} arcos, {len(stats["reparaciones"])} árboles reparados (versión {version}).')
 
-        ttk.Button(frm, text='Ejecutar Dijkstra', command=run).grid(row=2,column=0,columnspan=2,pady=8)
+            self.lanza_trabajo('Tráfico en vivo', trabajo, listo)
+        ttk.Button(frm, text='Cargar y aplicar cambios', command=run).grid(row=2,column=0,columnspan=2,pady=8)
 
     def panel_floyd(self):
         self.clear_dynamic()
@@ -365,31 +745,50 @@ class App:
         e_w = ttk.Entry(frm, width=6); e_w.insert(0,'d'); e_w.grid(row=0,column=1,padx=6)
         ttk.Label(frm, text='Origen (opcional):').grid(row=1,column=0,sticky='w'); e_o = ttk.Entry(frm, width=20); e_o.grid(row=1,column=1,padx=6)
         ttk.Label(frm, text='Destino (opcional):').grid(row=2,column=0,sticky='w'); e_d = ttk.Entry(frm, width=20); e_d.grid(row=2,column=1,padx=6)
+        ttk.Label(frm, text='Método:').grid(row=3,column=0,sticky='w')
+        metodo = ttk.Combobox(frm, width=28, state='readonly', values=['Floyd-Warshall', 'Dijkstra por nodo (procesos)'])
+        metodo.set('Floyd-Warshall'); metodo.grid(row=3,column=1,padx=6,pady=4)
         def run():
             if self.lista_ady is None:
                 messagebox.showwarning('No hay grafo','Carga el grafo primero (CSV/OSM)'); return
             n = len(self.lista_ady)
             if n > 500:
-                if not messagebox.askyesno('Advertencia', f'Grafo con {n} nodos. Floyd puede tardar mucho. Continuar?'): return
+                mb = 8 * n * n / 2**20
+                if not messagebox.askyesno('Advertencia', f'Grafo con {n} nodos ({mb:.0f} MB de matrices). {metodo.get()} puede tardar mucho. Continuar?'): return
             wt = e_w.get().strip().lower(); wt = 'distancia' if wt!='t' else 'tiempo'
-            self.log('Ejecutando Floyd-Warshall...')
-            t0 = time.time()
-            dist, next_hop, nodes, stats = floyd_warshall(self.lista_ady, weight_type=wt)
-            t1 = time.time()
-            stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
-            # guardar matriz a CSV (opcional)
-            fname = f'floyd_{wt}.csv'
-            import csv as _csv
-            with open(fname,'w',newline='',encoding='utf-8') as f:
-                w = _csv.writer(f); w.writerow(['origen/dest']+nodes)
-                for u in nodes:
-                    w.writerow([u] + [dist[u][v] if dist[u][v]<float('inf') else 'inf' for v in nodes])
-            self.text_out.delete(1.0, tk.END)
-            self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
-            self.log(f'Floyd finalizado y guardado en {fname}')
-            messagebox.showinfo('Floyd','Floyd finalizado.')
-
-        ttk.Button(frm, text='Ejecutar Floyd-Warshall', command=run).grid(row=3,column=0,columnspan=2,pady=8)
+            m, grafo = metodo.get(), self.lista_ady
+            self.log(f'Ejecutando {m}...')
+
+            def trabajo(progreso):
+                t0 = time.time()
+                if m == 'Floyd-Warshall':
+                    dist, next_hop, nodes, stats = floyd_warshall(grafo, weight_type=wt, progreso=progreso)
+                else:
+                    # misma salida que floyd_warshall: (dist, next_hop, nodes, stats)
+                    dist, next_hop, nodes, stats = apsp_dijkstra(grafo, weight_type=wt, progreso=progreso)
+                t1 = time.time()
+                stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
+                # guardar matriz a CSV (opcional)
+                fname = f'floyd_{wt}.csv'
+                import csv as _csv
+                with open(fname,'w',newline='',encoding='utf-8') as f:
+                    w = _csv.writer(f); w.writerow(['origen/dest']+nodes)
+                    # fila por fila sobre la matriz float32 (7 cifras significativas)
+                    for i, u in enumerate(nodes):
+                        progreso(i, len(nodes))
+                        w.writerow([u] + [f'{x:.7g}' if x<float('inf') else 'inf' for x in dist.fila(i).tolist()])
+                return stats, fname
+
+            def listo(resultado):
+                stats, fname = resultado
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
+                self.log(f'Floyd finalizado y guardado en {fname}')
+                messagebox.showinfo('Floyd','Floyd finalizado.')
+
+            self.lanza_trabajo(m, trabajo, listo)
+
+        ttk.Button(frm, text='Ejecutar', command=run).grid(row=4,column=0,columnspan=2,pady=8)
 
     def panel_prim(self):
         self.clear_dynamic(); ttk.Label(self.dynamic, text='Prim (MST)', font=('Helvetica',12,'bold')).pack(anchor='w')
@@ -399,39 +798,40 @@ class App:
             if self.lista_ady is None:
                 messagebox.showwarning('No hay grafo','Carga el grafo primero (CSV/OSM)'); return
             wt = e_w.get().strip().lower(); wt = 'distancia' if wt!='t' else 'tiempo'
-            self.log('Ejecutando Prim...'); t0 = time.time()
-            lag_dd = lista_ady_to_dict_dict(self.lista_ady, weight_type=wt)
-            prim = MSTPrim(lag_dd)
-            mst, costo, stats = prim.Prim() if False else prim.Prim()  # llamada original devuelve (mst,costo,stats)
-            # Nota: en nuestra clase Prim implementada retorna (mst,costo,stats)
-            # pero en caso tu versión tenga métodos separados usa: mst = prim.getMST(); costo = prim.getCostoTotal(); stats = {...}
-            # ajustar según la implementación exacta
-            # Para compatibilidad, intentamos:
-            try:
-                # si Prim devolvió (mst,costo,stats)
-                mst_list, costo_total, stats = mst, costo, stats
-            except Exception:
-                # fallback: obtener desde el objeto
-                mst_list = prim.getMST()
-                costo_total = prim.getCostoTotal()
-                stats = {"algoritmo":"Prim", "V": len(lag_dd), "aristas_en_mst": len(mst_list), "costo_total": costo_total, "complejidad_teorica":"O(E log V)"}
-            t1 = time.time()
-            stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
-            # guardar CSV
-            fname = f'mst_prim_{wt}.csv'
-            import csv as _csv
-            with open(fname,'w',newline='',encoding='utf-8') as f:
-                w = _csv.writer(f); w.writerow(['u','v','peso'])
-                for u,v,p in mst_list: w.writerow([u,v,p])
-            # intentar dibujar
-            try:
-                img = prim.dibujaMST(f'mst_prim_{wt}'); self.last_image = img; self.log(f'Imagen generada: {img}')
-            except Exception as e:
-                self.log(f'No se pudo generar imagen MST Prim: {e}')
-            self.text_out.delete(1.0, tk.END)
-            self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
-            self.log('Prim finalizado.')
-            messagebox.showinfo('Prim','Prim finalizado.')
+            self.log('Ejecutando Prim...')
+            grafo = self.lista_ady
+
+            def trabajo(progreso):
+                t0 = time.time()
+                lag_dd = lista_ady_to_dict_dict(grafo, weight_type=wt)
+                prim = MSTPrim(lag_dd)
+                mst_list, costo_total, stats = prim.Prim(progreso)
+                t1 = time.time()
+                stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
+                # guardar CSV
+                fname = f'mst_prim_{wt}.csv'
+                import csv as _csv
+                with open(fname,'w',newline='',encoding='utf-8') as f:
+                    w = _csv.writer(f); w.writerow(['u','v','peso'])
+                    for u,v,p in mst_list: w.writerow([u,v,p])
+                # intentar dibujar
+                img = None
+                try:
+                    img = prim.dibujaMST(f'mst_prim_{wt}'); self.log(f'Imagen generada: {img}')
+                except Exception as e:
+                    self.log(f'No se pudo generar imagen MST Prim: {e}')
+                return stats, img
+
+            def listo(resultado):
+                stats, img = resultado
+                if img:
+                    self.last_image = img
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
+                self.log('Prim finalizado.')
+                messagebox.showinfo('Prim','Prim finalizado.')
+
+            self.lanza_trabajo('Prim', trabajo, listo)
 
 
         ttk.Button(frm, text='Ejecutar Prim', command=run).grid(row=1,column=0,columnspan=2,pady=8)
@@ -444,55 +844,119 @@ class App:
             if self.lista_ady is None:
                 messagebox.showwarning('No hay grafo','Carga el grafo primero (CSV/OSM)'); return
             wt = e_w.get().strip().lower(); wt = 'distancia' if wt!='t' else 'tiempo'
-            self.log('Ejecutando Kruskal...'); t0 = time.time()
-            lag_dd = lista_ady_to_dict_dict(self.lista_ady, weight_type=wt)
-            kr = MSTKruskal(lag_dd)
-            mst_list, costo_total, stats = kr.Kruskal() if False else kr.Kruskal()
-            # Compatibilidad: si Kruskal retorna triple ajusta; si no, usar getters
-            try:
-                pass
-            except:
-                mst_list = kr.getMST(); costo_total = kr.getCostoTotal(); stats = {"algoritmo":"Kruskal","V":len(lag_dd),"aristas_en_mst":len(mst_list),"costo_total":costo_total,"complejidad_teorica":"O(E log E)"}
-            t1 = time.time()
-            stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
-            # guardar CSV
-            fname = f'mst_kruskal_{wt}.csv'
-            import csv as _csv
-            with open(fname,'w',newline='',encoding='utf-8') as f:
-                w = _csv.writer(f); w.writerow(['u','v','peso'])
-                for u,v,p in mst_list: w.writerow([u,v,p])
-            try:
-                img = kr.dibujaMST(f'mst_kruskal_{wt}'); self.last_image = img; self.log(f'Imagen generada: {img}')
-            except Exception as e:
-                self.log(f'No se pudo generar imagen MST Kruskal: {e}')
-            self.text_out.delete(1.0, tk.END)
-            self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
-            self.log('Kruskal finalizado.')
-            messagebox.showinfo('Kruskal','Kruskal finalizado.')
+            self.log('Ejecutando Kruskal...')
+            grafo = self.lista_ady
+
+            def trabajo(progreso):
+                t0 = time.time()
+                lag_dd = lista_ady_to_dict_dict(grafo, weight_type=wt)
+                kr = MSTKruskal(lag_dd)
+                mst_list, costo_total, stats = kr.Kruskal(progreso)
+                t1 = time.time()
+                stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
+                # guardar CSV
+                fname = f'mst_kruskal_{wt}.csv'
+                import csv as _csv
+                with open(fname,'w',newline='',encoding='utf-8') as f:
+                    w = _csv.writer(f); w.writerow(['u','v','peso'])
+                    for u,v,p in mst_list: w.writerow([u,v,p])
+                img = None
+                try:
+                    img = kr.dibujaMST(f'mst_kruskal_{wt}'); self.log(f'Imagen generada: {img}')
+                except Exception as e:
+                    self.log(f'No se pudo generar imagen MST Kruskal: {e}')
+                return stats, img
+
+            def listo(resultado):
+                stats, img = resultado
+                if img:
+                    self.last_image = img
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
+                self.log('Kruskal finalizado.')
+                messagebox.showinfo('Kruskal','Kruskal finalizado.')
+
+            self.lanza_trabajo('Kruskal', trabajo, listo)
 
         ttk.Button(frm, text='Ejecutar Kruskal', command=run).grid(row=1,column=0,columnspan=2,pady=8)
 
+    def panel_boruvka(self):
+        self.clear_dynamic(); ttk.Label(self.dynamic, text='Borůvka (MST)', font=('Helvetica',12,'bold')).pack(anchor='w')
+        frm = ttk.Frame(self.dynamic, padding=6); frm.pack(anchor='w')
+        ttk.Label(frm, text='Peso (d=distancia,t=tiempo) [d]:').grid(row=0,column=0,sticky='w'); e_w = ttk.Entry(frm, width=6); e_w.insert(0,'d'); e_w.grid(row=0,column=1,padx=6)
+        ttk.Label(frm, text='Procesos (sin numpy) [1]:').grid(row=1,column=0,sticky='w'); e_p = ttk.Entry(frm, width=6); e_p.insert(0,'1'); e_p.grid(row=1,column=1,padx=6)
+        def run():
+            if self.lista_ady is None:
+                messagebox.showwarning('No hay grafo','Carga el grafo primero (CSV/OSM)'); return
+            wt = e_w.get().strip().lower(); wt = 'distancia' if wt!='t' else 'tiempo'
+            try:
+                procesos = max(1, int(e_p.get().strip() or 1))
+            except ValueError:
+                messagebox.showerror('Procesos','Ingresa un número entero de procesos.'); return
+            if not self.libre('Borůvka'):
+                return
+            self.log('Ejecutando Borůvka...')
+            grafo = self.lista_ady
+
+            def trabajo(progreso):
+                t0 = time.time()
+                lag_dd = lista_ady_to_dict_dict(grafo, weight_type=wt)
+                bo = MSTBoruvka(lag_dd, procesos=procesos)
+                mst_list, costo_total, stats = bo.Boruvka(progreso)
+                stats["tiempo_ejecucion_gui"] = round(time.time() - t0,6)
+                fname = f'mst_boruvka_{wt}.csv'
+                import csv as _csv
+                with open(fname,'w',newline='',encoding='utf-8') as f:
+                    w = _csv.writer(f); w.writerow(['u','v','peso'])
+                    for u,v,p in mst_list: w.writerow([u,v,p])
+                img = None
+                try:
+                    img = bo.dibujaMST(f'mst_boruvka_{wt}'); self.log(f'Imagen generada: {img}')
+                except Exception as e:
+                    self.log(f'No se pudo generar imagen MST Borůvka: {e}')
+                return stats, img
+
+            def listo(resultado):
+                stats, img = resultado
+                if img:
+                    self.last_image = img
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, formatea_resumen(stats) + "\n")
+                self.log('Borůvka finalizado.')
+                messagebox.showinfo('Borůvka','Borůvka finalizado.')
+
+            self.lanza_trabajo('Borůvka', trabajo, listo)
+
+        ttk.Button(frm, text='Ejecutar Borůvka', command=run).grid(row=2,column=0,columnspan=2,pady=8)
+
     def panel_dfs(self):
         self.clear_dynamic(); ttk.Label(self.dynamic, text='DFS', font=('Helvetica',12,'bold')).pack(anchor='w')
         frm = ttk.Frame(self.dynamic, padding=6); frm.pack(anchor='w')
-        ttk.Label(frm, text='Nodo inicio (ENTER=aleatorio):').grid(row=0,column=0,sticky='w'); e_o = ttk.Entry(frm, width=20); e_o.grid(row=0,column=1,padx=6)
+        ttk.Label(frm, text='Nodo inicio (id o lat,lon; ENTER=aleatorio):').grid(row=0,column=0,sticky='w'); e_o = ttk.Entry(frm, width=20); e_o.grid(row=0,column=1,padx=6)
         def run():
             if self.lista_ady is None:
                 messagebox.showwarning('No hay grafo','Carga el grafo primero (CSV/OSM)'); return
-            inicio_raw = e_o.get().strip() or next(iter(self.lista_ady))
-            try: inicio = int(inicio_raw) if str(inicio_raw).isdigit() else inicio_raw
-            except: inicio = inicio_raw
+            inicio_raw = e_o.get().strip()
+            inicio = self.resuelve_nodo(inicio_raw) if inicio_raw else next(iter(self.lista_ady))
             self.log(f'Ejecutando DFS desde {inicio}...')
-            t0 = time.time()
-            orden, stats = DFS(self.lista_ady, inicio)
-            t1 = time.time()
-            stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
-            # mostrar resumen
-            resumen = formatea_resumen(stats)
-            self.text_out.delete(1.0, tk.END)
-            self.text_out.insert(tk.END, resumen + "\n")
-            self.log(f'DFS completado. Nodos visitados: {stats.get("total_nodos_visitados")}')
-            messagebox.showinfo('DFS','DFS completado.')
+            grafo = self.lista_ady
+
+            def trabajo(progreso):
+                t0 = time.time()
+                orden, stats = DFS(grafo, inicio, progreso)
+                t1 = time.time()
+                stats["tiempo_ejecucion_gui"] = round(t1 - t0,6)
+                return stats
+
+            def listo(stats):
+                # mostrar resumen
+                resumen = formatea_resumen(stats)
+                self.text_out.delete(1.0, tk.END)
+                self.text_out.insert(tk.END, resumen + "\n")
+                self.log(f'DFS completado. Nodos visitados: {stats.get("total_nodos_visitados")}')
+                messagebox.showinfo('DFS','DFS completado.')
+
+            self.lanza_trabajo('DFS', trabajo, listo)
         ttk.Button(frm, text='Ejecutar DFS', command=run).grid(row=1,column=0,columnspan=2,pady=8)
 
     
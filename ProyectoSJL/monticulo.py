@@ -0,0 +1,90 @@
+"""
+grafos/monticulo.py
+Montículo binario indexado (mínimo) sobre índices de nodo 0..n-1. Provee:
+- MonticuloIndexado(n): actualiza(i, clave) inserta o disminuye la clave de i
+  (decrease-key), extrae() -> (i, clave) con la menor clave
+A diferencia de heapq con entradas perezosas, cada nodo está a lo sumo una vez:
+el montículo nunca pasa de n entradas y no quedan entradas viejas que sacar y
+descartar. pos[i] es la posición de i en el montículo (-1 = no está).
+"""
+
+INF = float('inf')
+
+
+class MonticuloIndexado:
+
+    def __init__(self, n):
+        # listas y no array(): se leen en cada paso de _sube/_baja y así no se
+        # crea un int/float nuevo por lectura (casi el doble de rápido)
+        self.heap = []                          # índices de nodo, ordenados como montículo por clave
+        self.pos = [-1] * n
+        self.clave = [INF] * n
+        self.max_tamano = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, i):
+        return self.pos[i] >= 0
+
+    def actualiza(self, i, clave):
+        """Inserta i o baja su clave. True si cambió algo (False si la clave nueva no es menor)."""
+        p = self.pos[i]
+        if p < 0:
+            p = len(self.heap)
+            self.heap.append(i)
+            self.pos[i] = p
+            if p + 1 > self.max_tamano:
+                self.max_tamano = p + 1
+        elif clave >= self.clave[i]:
+            return False
+        self.clave[i] = clave
+        self._sube(p)
+        return True
+
+    def extrae(self):
+        """Saca el índice de menor clave. Retorna (i, clave)."""
+        heap, pos = self.heap, self.pos
+        i = heap[0]
+        ultimo = heap.pop()
+        pos[i] = -1
+        if heap:
+            heap[0] = ultimo
+            pos[ultimo] = 0
+            self._baja(0)
+        return i, self.clave[i]
+
+    def _sube(self, p):
+        heap, pos, clave = self.heap, self.pos, self.clave
+        i = heap[p]
+        c = clave[i]
+        while p > 0:
+            q = (p - 1) >> 1
+            j = heap[q]
+            if clave[j] <= c:
+                break
+            heap[p] = j
+            pos[j] = p
+            p = q
+        heap[p] = i
+        pos[i] = p
+
+    def _baja(self, p):
+        heap, pos, clave = self.heap, self.pos, self.clave
+        n = len(heap)
+        i = heap[p]
+        c = clave[i]
+        while True:
+            h = 2 * p + 1
+            if h >= n:
+                break
+            if h + 1 < n and clave[heap[h + 1]] < clave[heap[h]]:
+                h += 1
+            j = heap[h]
+            if clave[j] >= c:
+                break
+            heap[p] = j
+            pos[j] = p
+            p = h
+        heap[p] = i
+        pos[i] = p
@@ -0,0 +1,242 @@
+"""
+grafos/mst_boruvka.py
+Borůvka instrumentado para redes grandes (Lima metropolitana completa).
+Entrada: grafo dict-of-dicts {u: {v: peso}} o GrafoCSR (vista ponderada),
+la misma que reciben MSTPrim y MSTKruskal.
+Salida: mst_list (tripletas), costoTotal, stats (con detalle por ronda)
+Cada ronda:
+1. arista más barata que sale de cada componente (una pasada por las aristas
+   vivas: vectorizada con numpy, o repartida en bloques entre procesos)
+2. contracción: cada componente apunta a la del otro extremo de su arista;
+   en cada par que se eligió mutuamente queda como raíz la de menor índice y
+   el resto sube por saltos de puntero (padre = padre[padre]) hasta la raíz
+3. se descartan las aristas que quedaron dentro de una componente
+Las componentes al menos se reducen a la mitad por ronda: O(log V) rondas de
+O(E). El desempate es el mismo orden total de Kruskal (peso, id u, id v), así
+que el árbol (o bosque, si el grafo no es conexo) tiene las mismas aristas
+que el de MSTKruskal.
+"""
+
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from grafos.mst_kruskal import MSTKruskal
+except ImportError:
+    from mst_kruskal import MSTKruskal
+
+# numpy es opcional; sin él cada ronda recorre las aristas en Python (en procesos si procesos > 1)
+try:
+    import numpy as np
+except Exception:
+    np = None
+
+ARISTAS_POR_TAREA = 250000
+
+# aristas de cada proceso trabajador (lo arma _inicia_trabajador)
+_TRABAJO = {}
+
+
+class MSTBoruvka:
+    def __init__(self, grafo_dict_dict, procesos=1):
+        """procesos: trabajadores para el camino sin numpy (None = os.cpu_count())."""
+        self.grafo = grafo_dict_dict
+        self.procesos = procesos
+        self.mst = []
+        self.costoTotal = 0
+
+    def Boruvka(self, progreso=None):
+        """progreso: (opcional) progreso(aristas en el MST, V - 1), una vez por ronda."""
+        t0 = time.time()
+        pesos, iu, iv, ids = MSTKruskal(self.grafo).aristas_ordenadas()
+        V = len(ids)
+        E_aprox = len(pesos)
+        if np is not None and isinstance(pesos, np.ndarray):
+            rondas, componentes = self._rondas_numpy(V, pesos, iu, iv, ids, progreso)
+            modo, procesos = "numpy", 1
+        else:
+            procesos = self.procesos or os.cpu_count() or 1
+            if procesos > 1 and E_aprox > ARISTAS_POR_TAREA:
+                rondas, componentes = self._rondas_procesos(V, pesos, iu, iv, ids, procesos, progreso)
+                modo = f"{procesos} procesos"
+            else:
+                procesos = 1
+                rondas, componentes = self._rondas(V, pesos, iu, iv, ids,
+                                                   lambda comp, vivas: _minimos_bloque(comp, vivas, iu, iv), progreso)
+                modo = "Python"
+        t1 = time.time()
+        stats = {
+            "algoritmo": f"Borůvka ({modo})",
+            "V": V,
+            "E_aprox": E_aprox,
+            "aristas_en_mst": len(self.mst),
+            "costo_total": self.costoTotal,
+            "componentes_finales": componentes,
+            "procesos": procesos,
+            "rondas": len(rondas),
+            "detalle_rondas": rondas,
+            "tiempo_algo_s": round(t1 - t0, 6),
+            "complejidad_teorica": "O(E log V), O(log V) rondas de O(E)"
+        }
+        return self.mst, self.costoTotal, stats
+
+    # ---------------- rondas vectorizadas ----------------
+    def _rondas_numpy(self, V, pesos, iu, iv, ids, progreso=None):
+        aristas_u, aristas_v = iu, iv
+        comp = np.arange(V, dtype=np.int64)
+        rango = np.arange(len(pesos), dtype=np.int64)    # posición en el orden total
+        rondas = []
+        componentes = V
+        while len(rango):
+            t0 = time.time()
+            cu, cv = comp[iu], comp[iv]
+            vivas = cu != cv
+            iu, iv, rango, cu, cv = iu[vivas], iv[vivas], rango[vivas], cu[vivas], cv[vivas]
+            m = len(rango)
+            if m == 0:
+                break
+            # 1. arista mínima (posición local, que respeta el orden total) por componente
+            mejor = np.full(V, m, dtype=np.int64)
+            local = np.arange(m, dtype=np.int64)
+            np.minimum.at(mejor, cu, local)
+            np.minimum.at(mejor, cv, local)
+            c = np.flatnonzero(mejor < m)
+            e = mejor[c]
+            otra = np.where(cu[e] == c, cv[e], cu[e])
+            # 2. contracción por saltos de puntero
+            padre = np.arange(V, dtype=np.int64)
+            padre[c] = otra
+            mutuo = padre[otra] == c
+            padre[c[mutuo & (c < otra)]] = c[mutuo & (c < otra)]
+            while True:
+                abuelo = padre[padre]
+                if np.array_equal(abuelo, padre):
+                    break
+                padre = abuelo
+            comp = padre[comp]
+            # aristas elegidas (la de un par mutuo aparece dos veces)
+            nuevas = rango[np.unique(e)]
+            costo = 0
+            for u, v, peso in zip(aristas_u[nuevas].tolist(), aristas_v[nuevas].tolist(), pesos[nuevas].tolist()):
+                self.mst.append((ids[u], ids[v], peso))
+                costo += peso
+            self.costoTotal += costo
+            rondas.append(self._ronda(len(rondas) + 1, componentes, m, len(nuevas), costo, t0))
+            componentes -= len(nuevas)
+            if progreso is not None:
+                progreso(len(self.mst), V - 1)
+        return rondas, componentes
+
+    # ---------------- rondas en Python / en procesos ----------------
+    def _rondas(self, V, pesos, iu, iv, ids, minimos, progreso=None):
+        """minimos(comp, vivas) -> {componente: posición de su arista mínima}."""
+        comp = array('i', range(V))
+        vivas = range(len(pesos))
+        rondas = []
+        componentes = V
+        while True:
+            t0 = time.time()
+            vivas = [k for k in vivas if comp[iu[k]] != comp[iv[k]]]
+            if not vivas:
+                break
+            mejor = minimos(comp, vivas)
+            # contracción: cada componente apunta a la del otro extremo
+            padre = {}
+            for c, k in mejor.items():
+                a, b = comp[iu[k]], comp[iv[k]]
+                padre[c] = b if a == c else a
+            for c, o in padre.items():
+                if c < o and padre.get(o) == c:
+                    padre[c] = c
+            raiz = {}
+            for c in padre:
+                camino = []
+                while c not in raiz and padre[c] != c:
+                    camino.append(c)
+                    c = padre[c]
+                r = raiz.get(c, c)
+                for x in camino:
+                    raiz[x] = r
+                raiz[c] = r
+            for i in range(V):
+                r = raiz.get(comp[i])
+                if r is not None:
+                    comp[i] = r
+            nuevas = sorted(set(mejor.values()))
+            costo = 0
+            for k in nuevas:
+                self.mst.append((ids[iu[k]], ids[iv[k]], pesos[k]))
+                costo += pesos[k]
+            self.costoTotal += costo
+            rondas.append(self._ronda(len(rondas) + 1, componentes, len(vivas), len(nuevas), costo, t0))
+            componentes -= len(nuevas)
+            if progreso is not None:
+                progreso(len(self.mst), V - 1)
+        return rondas, componentes
+
+    def _rondas_procesos(self, V, pesos, iu, iv, ids, procesos, progreso=None):
+        iu, iv = array('i', iu), array('i', iv)
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_inicia_trabajador, initargs=(iu, iv)) as ex:
+            def minimos(comp, vivas):
+                # bloques contiguos de aristas vivas; cada trabajador devuelve sus mínimos locales
+                bloques = [array('i', vivas[a:a + ARISTAS_POR_TAREA]) for a in range(0, len(vivas), ARISTAS_POR_TAREA)]
+                mejor = {}
+                for parcial in ex.map(_minimos_trabajador, [(comp, b) for b in bloques]):
+                    for c, k in parcial.items():
+                        if k < mejor.get(c, k + 1):
+                            mejor[c] = k
+                return mejor
+            return self._rondas(V, pesos, iu, iv, ids, minimos, progreso)
+
+    @staticmethod
+    def _ronda(n, componentes, aristas_vivas, agregadas, costo, t0):
+        return {
+            "ronda": n,
+            "componentes": componentes,
+            "aristas_vivas": aristas_vivas,
+            "aristas_agregadas": agregadas,
+            "costo": costo,
+            "tiempo_s": round(time.time() - t0, 6),
+        }
+
+    def getMST(self):
+        return self.mst
+
+    def getCostoTotal(self):
+        return self.costoTotal
+
+    def dibujaMST(self, filename='mst_boruvka'):
+        try:
+            from graphviz import Graph
+        except Exception:
+            raise RuntimeError("graphviz no disponible")
+        g = Graph('mst_boruvka', format='png')
+        g.graph_attr['rankdir'] = 'LR'
+        for u, v, p in self.mst:
+            g.edge(str(u), str(v), label=str(p))
+        g.render(filename, format='png', cleanup=True)
+        return f'{filename}.png'
+
+
+def _minimos_bloque(comp, vivas, iu, iv):
+    """{componente: primera arista viva que la toca}; vivas va en el orden total, así la primera es la mínima."""
+    mejor = {}
+    for k in vivas:
+        a, b = comp[iu[k]], comp[iv[k]]
+        if a not in mejor:
+            mejor[a] = k
+        if b not in mejor:
+            mejor[b] = k
+    return mejor
+
+
+def _inicia_trabajador(iu, iv):
+    _TRABAJO['iu'] = iu
+    _TRABAJO['iv'] = iv
+
+
+def _minimos_trabajador(tarea):
+    comp, vivas = tarea
+    return _minimos_bloque(comp, vivas, _TRABAJO['iu'], _TRABAJO['iv'])
@@ -0,0 +1,326 @@
+"""
+grafos/mst_dinamico.py
+MST (o bosque generador mínimo) mantenido ante cambios de aristas, sin volver
+a correr Kruskal sobre todo el grafo. Provee:
+- MSTDinamico(grafo_dict_dict, mst=None): parte de un mst ya calculado
+  (Kruskal / Prim / Borůvka; si no se da, se calcula con MSTKruskal)
+- agrega_arista / quita_arista / cambia_peso / aplica(cambios): cada una
+  retorna el stats de esa actualización (nodos visitados, aristas revisadas, tiempo)
+- estadisticas(): resumen de las actualizaciones contra el trabajo de un Kruskal completo
+El árbol se guarda enraizado (padre por índice) más los vecinos de árbol:
+- arista nueva o más barata fuera del árbol: se busca el ciclo que cierra
+  (subiendo desde los dos extremos a la vez hasta el ancestro común) y se
+  cambia por la arista más cara del ciclo si esta pesa más. O(largo del ciclo).
+- arista del árbol quitada o más cara: se corta y se recorre solo el lado más
+  chico (BFS alternado desde los dos extremos); entre las aristas de ese lado
+  que cruzan el corte se elige la más barata. O(lado chico + sus grados).
+Sin reemplazo al quitar, el bosque queda con un árbol más.
+"""
+
+import time
+from array import array
+from collections import deque
+
+try:
+    from grafos.mst_kruskal import MSTKruskal
+except ImportError:
+    from mst_kruskal import MSTKruskal
+
+
+class MSTDinamico:
+    def __init__(self, grafo_dict_dict, mst=None):
+        """grafo_dict_dict: {u: {v: peso}} o GrafoCSR ponderado; mst: [(u, v, peso), ...] de ese grafo."""
+        if mst is None:
+            mst = MSTKruskal(grafo_dict_dict).Kruskal()[0]
+        pesos, iu, iv, ids = MSTKruskal(grafo_dict_dict).aristas_ordenadas()
+        if not isinstance(pesos, list):         # arreglos numpy del camino vectorizado
+            pesos, iu, iv = pesos.tolist(), iu.tolist(), iv.tolist()
+        self.ids = list(ids)
+        self.indice = {u: i for i, u in enumerate(self.ids)}
+        V = len(self.ids)
+        self.peso = {}                          # (i, j) con i < j -> peso, todas las aristas del grafo
+        self.ady = [set() for _ in range(V)]    # vecinos en el grafo
+        for p, i, j in zip(pesos, iu, iv):
+            if i != j:
+                self.peso[_clave(i, j)] = p
+                self.ady[i].add(j)
+                self.ady[j].add(i)
+        self.en_arbol = [set() for _ in range(V)]  # vecinos en el árbol
+        self.costoTotal = 0
+        for u, v, p in mst:
+            i, j = self.indice[u], self.indice[v]
+            self.en_arbol[i].add(j)
+            self.en_arbol[j].add(i)
+            self.costoTotal += self.peso[_clave(i, j)]
+        self.padre = array('i', [-1]) * V
+        self._enraiza()
+        self.historial = []
+
+    def _enraiza(self):
+        """padre[] desde la lista de vecinos de árbol (una raíz por árbol del bosque)."""
+        visto = bytearray(len(self.ids))
+        for s in range(len(self.ids)):
+            if visto[s]:
+                continue
+            visto[s] = 1
+            cola = deque([s])
+            while cola:
+                x = cola.popleft()
+                for y in self.en_arbol[x]:
+                    if not visto[y]:
+                        visto[y] = 1
+                        self.padre[y] = x
+                        cola.append(y)
+
+    # ---------------- actualizaciones ----------------
+    def agrega_arista(self, u, v, peso):
+        """Arista nueva (si ya existe, es un cambio de peso)."""
+        t0 = time.time()
+        i, j = self._nodo(u), self._nodo(v)
+        clave = _clave(i, j)
+        if i == j:
+            return self._registra('agrega', u, v, peso, 'lazo ignorado', 0, 0, t0)
+        if clave in self.peso:
+            return self.cambia_peso(u, v, peso)
+        self.peso[clave] = peso
+        self.ady[i].add(j)
+        self.ady[j].add(i)
+        resultado, nodos = self._prueba_ciclo(i, j, peso)
+        return self._registra('agrega', u, v, peso, resultado, nodos, 0, t0)
+
+    def quita_arista(self, u, v):
+        t0 = time.time()
+        i, j = self.indice[u], self.indice[v]
+        clave = _clave(i, j)
+        if clave not in self.peso:
+            raise KeyError((u, v))
+        peso = self.peso.pop(clave)
+        self.ady[i].discard(j)
+        self.ady[j].discard(i)
+        if j not in self.en_arbol[i]:
+            return self._registra('quita', u, v, peso, 'fuera del árbol', 0, 0, t0)
+        self.costoTotal -= peso
+        resultado, nodos, revisadas = self._reemplaza_corte(i, j)
+        return self._registra('quita', u, v, peso, resultado, nodos, revisadas, t0)
+
+    def cambia_peso(self, u, v, peso):
+        t0 = time.time()
+        i, j = self.indice[u], self.indice[v]
+        clave = _clave(i, j)
+        anterior = self.peso[clave]
+        self.peso[clave] = peso
+        if j in self.en_arbol[i]:
+            self.costoTotal += peso - anterior
+            if peso <= anterior:
+                return self._registra('cambia', u, v, peso, 'árbol, más barata', 0, 0, t0)
+            # más cara: puede haber otra arista que cruce el mismo corte más barata
+            resultado, nodos, revisadas = self._reemplaza_corte(i, j)
+            return self._registra('cambia', u, v, peso, resultado, nodos, revisadas, t0)
+        if peso >= anterior:
+            return self._registra('cambia', u, v, peso, 'fuera del árbol', 0, 0, t0)
+        resultado, nodos = self._prueba_ciclo(i, j, peso)
+        return self._registra('cambia', u, v, peso, resultado, nodos, 0, t0)
+
+    def aplica(self, cambios):
+        """cambios: [(u, v, peso)], peso None = quitar la arista. Retorna la lista de stats."""
+        salida = []
+        for u, v, peso in cambios:
+            if peso is None:
+                salida.append(self.quita_arista(u, v))
+            elif u in self.indice and v in self.indice and _clave(self.indice[u], self.indice[v]) in self.peso:
+                salida.append(self.cambia_peso(u, v, peso))
+            else:
+                salida.append(self.agrega_arista(u, v, peso))
+        return salida
+
+    # ---------------- ciclo (arista que entra) ----------------
+    def _prueba_ciclo(self, i, j, peso):
+        """i - j (peso) no está en el árbol: si cierra un ciclo, cambia por la más cara del ciclo si pesa más."""
+        camino = self._camino(i, j)
+        if camino is None:
+            # árboles distintos: la arista los une
+            self._evierte(i)
+            self._enlaza(i, j)
+            self.costoTotal += peso
+            return 'une dos árboles', 1
+        a, b, maximo = -1, -1, peso
+        for x, y in zip(camino, camino[1:]):
+            p = self.peso[_clave(x, y)]
+            if p > maximo:
+                a, b, maximo = x, y, p
+        if a < 0:
+            return 'sin cambio', len(camino)
+        # sale a - b: el camino queda partido en i ... a | b ... j y el lado que
+        # cuelga (el del hijo) se reengancha por la arista nueva
+        if self.padre[b] == a:
+            self._corta(b)
+            self._evierte(j, hasta=b)
+            self._enlaza(j, i)
+        else:
+            self._corta(a)
+            self._evierte(i, hasta=a)
+            self._enlaza(i, j)
+        self.costoTotal += peso - maximo
+        return 'reemplazo', len(camino)
+
+    def _camino(self, i, j):
+        """Nodos del camino de árbol i ... j (None si están en árboles distintos)."""
+        padre = self.padre
+        lado_i, lado_j = [i], [j]
+        en_i, en_j = {i}, {j}
+        x, y = i, j
+        while True:
+            if x in en_j:
+                comun = x
+                break
+            if y in en_i:
+                comun = y
+                break
+            if padre[x] < 0 and padre[y] < 0:
+                return None
+            if padre[x] >= 0:
+                x = padre[x]
+                lado_i.append(x)
+                en_i.add(x)
+                if x in en_j:
+                    comun = x
+                    break
+            if padre[y] >= 0:
+                y = padre[y]
+                lado_j.append(y)
+                en_j.add(y)
+        lado_i = lado_i[:lado_i.index(comun) + 1]
+        lado_j = lado_j[:lado_j.index(comun)]
+        return lado_i + lado_j[::-1]
+
+    # ---------------- corte (arista que sale) ----------------
+    def _reemplaza_corte(self, i, j):
+        """
+        Saca i - j del árbol y busca la arista más barata que cruza el corte
+        (la misma i - j si sigue en el grafo y nada le gana).
+        Retorna (resultado, nodos_visitados, aristas_revisadas).
+        """
+        lado, nodos = self._lado_chico(i, j)
+        # ante empate se queda la arista actual
+        mejor = self.peso.get(_clave(i, j))
+        mx, my = (i, j) if mejor is not None else (-1, -1)
+        revisadas = 0
+        for x in lado:
+            for y in self.ady[x]:
+                revisadas += 1
+                if y in lado:
+                    continue
+                p = self.peso[_clave(x, y)]
+                if mejor is None or p < mejor:
+                    mejor, mx, my = p, x, y
+        if mejor is not None and (mx, my) == (i, j):
+            return 'sin cambio', nodos, revisadas
+        if _clave(i, j) in self.peso:
+            self.costoTotal -= self.peso[_clave(i, j)]     # sigue en el grafo pero sale del árbol
+        hijo = j if self.padre[j] == i else i
+        self._corta(hijo)
+        if mejor is None:
+            return 'bosque dividido', nodos, revisadas
+        self._evierte(mx)
+        self._enlaza(mx, my)
+        self.costoTotal += mejor
+        return 'reemplazo', nodos, revisadas
+
+    def _lado_chico(self, i, j):
+        """Nodos del lado más chico al cortar i - j: BFS alternado desde i y desde j, sin pasar por i - j."""
+        arbol = self.en_arbol
+        visto = ({i}, {j})
+        colas = (deque([i]), deque([j]))
+        prohibido = (j, i)
+        t = 0
+        while True:
+            cola = colas[t]
+            if not cola:
+                return visto[t], len(visto[0]) + len(visto[1])
+            x = cola.popleft()
+            for y in arbol[x]:
+                if y not in visto[t] and not (x == (i, j)[t] and y == prohibido[t]):
+                    visto[t].add(y)
+                    cola.append(y)
+            t = 1 - t
+
+    # ---------------- estructura del árbol ----------------
+    def _corta(self, hijo):
+        p = self.padre[hijo]
+        self.en_arbol[hijo].discard(p)
+        self.en_arbol[p].discard(hijo)
+        self.padre[hijo] = -1
+
+    def _enlaza(self, x, y):
+        """x es raíz de su árbol: queda colgando de y."""
+        self.padre[x] = y
+        self.en_arbol[x].add(y)
+        self.en_arbol[y].add(x)
+
+    def _evierte(self, x, hasta=-1):
+        """Hace a x raíz de su árbol invirtiendo los padres de x hacia arriba (hasta la raíz 'hasta' si se conoce)."""
+        padre = self.padre
+        anterior, actual = -1, x
+        while actual >= 0:
+            siguiente = padre[actual]
+            padre[actual] = anterior
+            if actual == hasta:
+                break
+            anterior, actual = actual, siguiente
+
+    def _nodo(self, u):
+        i = self.indice.get(u)
+        if i is None:
+            i = self.indice[u] = len(self.ids)
+            self.ids.append(u)
+            self.ady.append(set())
+            self.en_arbol.append(set())
+            self.padre.append(-1)
+        return i
+
+    # ---------------- resultados ----------------
+    def _registra(self, operacion, u, v, peso, resultado, nodos, revisadas, t0):
+        stats = {
+            "operacion": operacion,
+            "u": u,
+            "v": v,
+            "peso": peso,
+            "resultado": resultado,
+            "nodos_visitados": nodos,
+            "aristas_revisadas": revisadas,
+            "costo_total": self.costoTotal,
+            "tiempo_s": round(time.time() - t0, 6),
+        }
+        self.historial.append(stats)
+        return stats
+
+    def estadisticas(self):
+        """Resumen de las actualizaciones; 'E' es lo que recorre un Kruskal completo (más el ordenamiento)."""
+        n = len(self.historial)
+        trabajo = [h["nodos_visitados"] + h["aristas_revisadas"] for h in self.historial]
+        E = len(self.peso)
+        return {
+            "algoritmo": "MST dinámico (ciclo / corte)",
+            "V": len(self.ids),
+            "E_aprox": E,
+            "aristas_en_mst": sum(len(a) for a in self.en_arbol) // 2,
+            "costo_total": self.costoTotal,
+            "actualizaciones": n,
+            "reemplazos": sum(1 for h in self.historial if h["resultado"] in ('reemplazo', 'une dos árboles')),
+            "trabajo_medio": round(sum(trabajo) / n, 2) if n else 0.0,
+            "trabajo_maximo": max(trabajo, default=0),
+            "fraccion_de_kruskal": round(sum(trabajo) / n / E, 6) if n and E else 0.0,
+            "tiempo_medio_s": round(sum(h["tiempo_s"] for h in self.historial) / n, 6) if n else 0.0,
+            "complejidad_teorica": "O(ciclo) al entrar una arista, O(lado chico del corte + grados) al salir",
+        }
+
+    def getMST(self):
+        ids, peso, padre = self.ids, self.peso, self.padre
+        return [(ids[padre[x]], ids[x], peso[_clave(padre[x], x)]) for x in range(len(ids)) if padre[x] >= 0]
+
+    def getCostoTotal(self):
+        return self.costoTotal
+
+
+def _clave(i, j):
+    return (i, j) if i < j else (j, i)
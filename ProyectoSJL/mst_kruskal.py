@@ -1,9 +1,24 @@
 """
 grafos/mst_kruskal.py
 Kruskal instrumentado con Union-Find. Devuelve MST y estadísticas
+Motor sobre arreglos planos: las aristas (sin repetir cada par) quedan en
+arreglos de pesos / índices y se ordenan por (peso, u, v), el mismo orden que
+ordenar las tuplas de antes; el Union-Find es padre/rango en array('i') /
+bytearray con find iterativo (compresión por mitades) y se corta apenas hay
+V-1 aristas aceptadas. Con numpy y un GrafoCSR, la deduplicación y el
+ordenamiento (lexsort estable) son vectorizados. mst, costoTotal y stats
+salen idénticos a la versión anterior.
 """
 
 import time
+from array import array
+from itertools import compress
+
+# numpy es opcional; sin él se deduplica y ordena en Python puro
+try:
+    import numpy as np
+except Exception:
+    np = None
 
 class ConjuntoDisjunto:
     def __init__(self, vertices):
@@ -11,9 +26,12 @@ class ConjuntoDisjunto:
         self.altura = {v: 0 for v in vertices}
 
     def find(self, e):
-        if self.padre[e] != e:
-            self.padre[e] = self.find(self.padre[e])
-        return self.padre[e]
+        # iterativo (sin límite de recursión en cadenas largas), compresión por mitades
+        padre = self.padre
+        while padre[e] != e:
+            padre[e] = padre[padre[e]]
+            e = padre[e]
+        return e
 
     def union(self, nodo1, nodo2):
         rnodo1 = self.find(nodo1)
@@ -35,30 +53,18 @@ class MSTKruskal:
         self.mst = []
         self.costoTotal = 0
 
-    def Kruskal(self):
+    def Kruskal(self, progreso=None):
+        """progreso: (opcional) progreso(aristas aceptadas, V - 1), cada 1024 aceptadas."""
         t0 = time.time()
-        aristas = []
-        seen = set()
-        for u, vecinos in self.grafo.items():
-            for v, peso in vecinos.items():
-                par = tuple(sorted((u, v)))
-                if par in seen:
-                    continue
-                seen.add(par)
-                aristas.append((peso, u, v))
-        aristas.sort()
-        uf = ConjuntoDisjunto(self.grafo.keys())
-        ciclos_omitidos = 0
-        for peso, u, v in aristas:
-            if uf.find(u) != uf.find(v):
-                uf.union(u, v)
-                self.mst.append((u, v, peso))
-                self.costoTotal += peso
-            else:
-                ciclos_omitidos += 1
-        t1 = time.time()
+        pesos, iu, iv, ids = self.aristas_ordenadas()
+        if np is not None and isinstance(pesos, np.ndarray):
+            pesos, iu, iv = pesos.tolist(), iu.tolist(), iv.tolist()
         V = len(self.grafo)
-        E_aprox = len(aristas)
+        E_aprox = len(pesos)
+        self._une_en_orden(V, pesos, iu, iv, ids, progreso)
+        # todas las aristas no aceptadas cierran un ciclo (también las no revisadas tras el corte)
+        ciclos_omitidos = E_aprox - len(self.mst)
+        t1 = time.time()
         stats = {
             "algoritmo": "Kruskal",
             "V": V,
@@ -71,6 +77,127 @@ class MSTKruskal:
         }
         return self.mst, self.costoTotal, stats
 
+    def aristas_ordenadas(self):
+        """
+        (pesos, iu, iv, ids): cada par {u, v} una vez, ordenado por (peso, id u,
+        id v); iu/iv son índices en ids. Arreglos numpy si se usó el camino
+        vectorizado, listas si no. También lo usa mst_boruvka como orden total.
+        Con máscara de nodos los índices se renumeran sobre los nodos presentes.
+        """
+        if hasattr(self.grafo, 'offsets'):
+            if np is not None and self.grafo.nodos.numerica:
+                pesos, iu, iv, ids = self._aristas_numpy()
+            else:
+                pesos, iu, iv, _ = self._ordena(self._aristas_csr(), self.grafo.indice)
+                ids = self.grafo.ids
+            if self.grafo.mascara_nodos is not None:
+                return _renumera(pesos, iu, iv, ids, self.grafo.mascara_nodos)
+            return pesos, iu, iv, ids
+        indice = {u: i for i, u in enumerate(self.grafo.keys())}
+        return self._ordena(self._aristas_dict(), indice)
+
+    def _une_en_orden(self, V, pesos, iu, iv, ids, progreso=None):
+        """Recorre las aristas ya ordenadas con Union-Find plano; para en V-1 aceptadas."""
+        padre = array('i', range(V))
+        rango = bytearray(V)
+        objetivo = V - 1
+        mst = self.mst
+        costo = self.costoTotal
+        for peso, u, v in zip(pesos, iu, iv):
+            a, b = u, v
+            while padre[a] != a:
+                padre[a] = padre[padre[a]]
+                a = padre[a]
+            while padre[b] != b:
+                padre[b] = padre[padre[b]]
+                b = padre[b]
+            if a == b:
+                continue
+            if rango[a] < rango[b]:
+                a, b = b, a
+            padre[b] = a
+            if rango[a] == rango[b]:
+                rango[a] += 1
+            mst.append((ids[u], ids[v], peso))
+            costo += peso
+            if len(mst) == objetivo:
+                break
+            if progreso is not None and not len(mst) & 1023:
+                progreso(len(mst), objetivo)
+        self.costoTotal = costo
+
+    @staticmethod
+    def _ordena(aristas, indice):
+        """[(peso, u, v)] -> (pesos, iu, iv, ids) ordenados como aristas.sort()."""
+        aristas.sort()
+        return ([p for p, _, _ in aristas], [indice[u] for _, u, _ in aristas],
+                [indice[v] for _, _, v in aristas], list(indice))
+
+    def _aristas_numpy(self):
+        """
+        Igual que _aristas_csr + sort, vectorizado: último peso de cada arco
+        repetido dentro de una fila, cada par {u, v} una vez desde la primera
+        fila que lo tiene, y orden por (peso, id u, id v).
+        """
+        g = self.grafo
+        V, E = g.num_nodos, g.num_arcos
+        off = np.frombuffer(g.offsets, dtype=np.int64)
+        dst = np.frombuffer(g.destinos, dtype=np.int32).astype(np.int64)
+        w = np.frombuffer(g.pesos(), dtype=np.float64)
+        ids = np.frombuffer(g.ids, dtype=np.int64)
+        fila = np.repeat(np.arange(V, dtype=np.int64), np.diff(off))
+        # último arco de cada (fila, destino)
+        if g.vivos is None:
+            _, desde_fin = np.unique((fila * V + dst)[::-1], return_index=True)
+            k = E - 1 - desde_fin
+        else:
+            vivos = np.flatnonzero(np.frombuffer(g.vivos, dtype=np.uint8))
+            _, desde_fin = np.unique((fila[vivos] * V + dst[vivos])[::-1], return_index=True)
+            k = vivos[len(vivos) - 1 - desde_fin]
+        # cada par no dirigido una vez: el de menor fila
+        par = np.minimum(fila[k], dst[k]) * V + np.maximum(fila[k], dst[k])
+        k = k[np.lexsort((fila[k], par))]
+        par = np.minimum(fila[k], dst[k]) * V + np.maximum(fila[k], dst[k])
+        primero = np.ones(len(k), dtype=bool)
+        primero[1:] = par[1:] != par[:-1]
+        k = k[primero]
+        iu, iv = fila[k], dst[k]
+        orden = np.lexsort((ids[iv], ids[iu], w[k]))
+        return w[k][orden], iu[orden], iv[orden], g.ids
+
+    def _aristas_dict(self):
+        aristas = []
+        seen = set()
+        for u, vecinos in self.grafo.items():
+            for v, peso in vecinos.items():
+                par = tuple(sorted((u, v)))
+                if par in seen:
+                    continue
+                seen.add(par)
+                aristas.append((peso, u, v))
+        return aristas
+
+    def _aristas_csr(self):
+        # mismo criterio que la versión dict: último peso por (u,v) y cada par una vez
+        g = self.grafo
+        nodos, off, dst, vivos = g.ids, g.offsets, g.destinos, g.vivos
+        w = g.pesos()
+        V = g.num_nodos
+        aristas = []
+        seen = set()
+        for i in g.presentes():
+            vecinos = {}
+            ini, fin = off[i], off[i + 1]
+            for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+                vecinos[dst[k]] = w[k]
+            for j, peso in vecinos.items():
+                par = i * V + j if i <= j else j * V + i
+                if par in seen:
+                    continue
+                seen.add(par)
+                aristas.append((peso, nodos[i], nodos[j]))
+        return aristas
+
     def getMST(self):
         return self.mst
 
@@ -88,3 +215,17 @@ class MSTKruskal:
             g.edge(str(u), str(v), label=str(p))
         g.render(filename, format='png', cleanup=True)
         return f'{filename}.png'
+
+
+def _renumera(pesos, iu, iv, ids, mascara):
+    """Índices de la base -> posición entre los nodos presentes (ids solo con ellos)."""
+    presentes = list(compress(range(len(mascara)), mascara))
+    nuevo = array('i', [-1]) * len(mascara)
+    for n, i in enumerate(presentes):
+        nuevo[i] = n
+    if np is not None and isinstance(iu, np.ndarray):
+        nuevo = np.frombuffer(nuevo, dtype=np.int32).astype(np.int64)
+        iu, iv = nuevo[iu], nuevo[iv]
+    else:
+        iu, iv = [nuevo[i] for i in iu], [nuevo[i] for i in iv]
+    return pesos, iu, iv, [ids[i] for i in presentes]
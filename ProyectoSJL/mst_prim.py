@@ -1,59 +1,142 @@
 """
 grafos/mst_prim.py
 Prim instrumentado: mantiene contador de aristas consideradas y tiempo.
-Entrada: grafo dict-of-dicts {u: {v: peso}}
+Entrada: grafo dict-of-dicts {u: {v: peso}} o GrafoCSR (vista ponderada)
 Salida: mst_list (tripletas), costoTotal, stats
+La cola es un montículo indexado con decrease-key (grafos/monticulo.py): cada
+nodo fuera del árbol está a lo sumo una vez, con la arista más barata que lo
+une al árbol, así el montículo nunca pasa de V entradas. Si el grafo no es
+conexo, Prim vuelve a arrancar desde el siguiente nodo sin visitar y devuelve
+el bosque generador mínimo completo (un árbol por componente); stats trae
+nodos y costo de cada árbol.
 """
 
-import heapq
 import time
+from array import array
+from itertools import compress
 try:
     from graphviz import Graph
 except Exception:
     Graph = None
 
+try:
+    from grafos.monticulo import MonticuloIndexado
+except ImportError:
+    from monticulo import MonticuloIndexado
+
 class MSTPrim:
     def __init__(self, grafo_dict_dict):
         self.grafo = grafo_dict_dict
         self.mst = []
         self.costoTotal = 0
 
-    def Prim(self):
+    def Prim(self, progreso=None):
+        """progreso: (opcional) progreso(nodos en el bosque, V), cada 1024 nodos."""
         t0 = time.time()
         if not self.grafo:
             stats = {"algoritmo": "Prim", "V":0, "E_aprox":0, "aristas_consideradas":0, "tiempo_algo_s":0, "complejidad_teorica":"O(E log V)"}
             return self.mst, self.costoTotal, stats
 
-        nodoInicial = next(iter(self.grafo))
-        visitados = set([nodoInicial])
-        aristas = [(peso, nodoInicial, vecino) for vecino, peso in self.grafo[nodoInicial].items()]
-        heapq.heapify(aristas)
-        aristas_consideradas = 0
-        while aristas:
-            peso, u, v = heapq.heappop(aristas)
-            aristas_consideradas += 1
-            if v not in visitados:
-                visitados.add(v)
-                self.mst.append((u, v, peso))
-                self.costoTotal += peso
-                for vv, pp in self.grafo[v].items():
-                    if vv not in visitados:
-                        heapq.heappush(aristas, (pp, v, vv))
+        if hasattr(self.grafo, 'offsets'):
+            g = self.grafo
+            ids, off, dst, w = g.ids, g.offsets, g.destinos, g.pesos()
+            mascara, vivos = g.mascara_nodos, g.vivos
+        else:
+            ids, off, dst, w = self._arreglos_dict()
+            mascara = vivos = None
+        instr = self._bosque(ids, off, dst, w, progreso, mascara, vivos)
         t1 = time.time()
         V = len(self.grafo)
-        E_aprox = sum(len(self.grafo[u]) for u in self.grafo) // 2
+        if hasattr(self.grafo, 'offsets'):
+            E_aprox = self.grafo.arcos_presentes // 2
+        else:
+            E_aprox = sum(len(self.grafo[u]) for u in self.grafo) // 2
         stats = {
             "algoritmo": "Prim",
             "V": V,
             "E_aprox": E_aprox,
-            "aristas_consideradas": aristas_consideradas,
+            "aristas_consideradas": instr["aristas_consideradas"],
             "aristas_en_mst": len(self.mst),
             "costo_total": self.costoTotal,
+            "arboles": len(instr["raices"]),
+            "raices": instr["raices"],
+            "nodos_por_arbol": instr["nodos_por_arbol"],
+            "costo_por_arbol": instr["costo_por_arbol"],
+            "actualizaciones_clave": instr["actualizaciones_clave"],
+            "max_monticulo": instr["max_monticulo"],
             "tiempo_algo_s": round(t1 - t0, 6),
-            "complejidad_teorica": "O(E log V)"
+            "complejidad_teorica": "O(E log V), montículo indexado (<= V entradas)"
         }
         return self.mst, self.costoTotal, stats
 
+    def _arreglos_dict(self):
+        """{u: {v: peso}} -> (ids, offsets, destinos, pesos) por índice, en el orden de iteración."""
+        ids = list(self.grafo)
+        indice = {u: i for i, u in enumerate(ids)}
+        off, dst, w = array('q', [0]), array('i'), array('d')
+        i = 0
+        while i < len(ids):                 # ids crece si aparece un vecino que no es clave
+            for v, p in self.grafo.get(ids[i], {}).items():
+                j = indice.get(v)
+                if j is None:
+                    j = indice[v] = len(ids)
+                    ids.append(v)
+                dst.append(j)
+                w.append(p)
+            off.append(len(dst))
+            i += 1
+        return ids, off, dst, w
+
+    def _bosque(self, ids, off, dst, w, progreso=None, mascara=None, vivos=None):
+        """mascara / vivos: máscaras de nodos y arcos del GrafoCSR (None = todos)."""
+        V = len(off) - 1
+        presentes = V if mascara is None else mascara.count(1)
+        en_arbol = bytearray(V)
+        padre = array('i', [-1]) * V
+        cola = MonticuloIndexado(V)
+        clave = cola.clave
+        mst = self.mst
+        raices, nodos_por_arbol, costo_por_arbol = [], [], []
+        aristas_consideradas = 0
+        actualizaciones = 0
+        en_bosque = 0
+        for s in (range(V) if mascara is None else compress(range(V), mascara)):
+            if en_arbol[s]:
+                continue
+            # nuevo árbol del bosque desde s
+            raices.append(ids[s])
+            nodos = 0
+            costo = 0
+            cola.actualiza(s, 0.0)
+            while cola:
+                u, peso = cola.extrae()
+                en_arbol[u] = 1
+                nodos += 1
+                en_bosque += 1
+                if progreso is not None and not en_bosque & 1023:
+                    progreso(en_bosque, presentes)
+                if padre[u] >= 0:
+                    mst.append((ids[padre[u]], ids[u], peso))
+                    costo += peso
+                    self.costoTotal += peso
+                ini, fin = off[u], off[u + 1]
+                for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+                    v = dst[k]
+                    aristas_consideradas += 1
+                    if not en_arbol[v] and w[k] < clave[v] and cola.actualiza(v, w[k]):
+                        padre[v] = u
+                        actualizaciones += 1
+            nodos_por_arbol.append(nodos)
+            costo_por_arbol.append(costo)
+        return {
+            "raices": raices,
+            "nodos_por_arbol": nodos_por_arbol,
+            "costo_por_arbol": costo_por_arbol,
+            "aristas_consideradas": aristas_consideradas,
+            "actualizaciones_clave": actualizaciones,
+            "max_monticulo": cola.max_tamano,
+        }
+
     def getMST(self):
         return self.mst
 
@@ -0,0 +1,219 @@
+"""
+grafos/muchos_a_muchos.py
+Tablas origen × destino (p. ej. 200 depósitos × 5000 puntos de entrega) sin
+armar el árbol completo por origen ni la matriz de Floyd. Provee:
+- muchos_a_muchos(lista_ady, origenes, destinos, peso='tiempo', procesos=1) -> (MatrizOD, stats)
+- MatrizOD: distancia y tiempo (float32, |O|×|D|) con valor(), fila(), exporta_csv()
+- busqueda_multidestino(g, s, objetivos, peso) -> arreglos de una búsqueda (también la usa batch)
+Por cada origen distinto se corre un Dijkstra con terminación multi-destino:
+se detiene apenas quedan fijados todos los destinos. Se minimiza 'peso' y el
+otro valor (distancia o tiempo) se acumula sobre el mismo camino, así la tabla
+trae ambos para la ruta elegida. Con procesos > 1 los orígenes se reparten en
+un ProcessPoolExecutor (el grafo viaja como su archivo mapeado, ver apsp).
+"""
+
+import csv
+import heapq
+import os
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+
+try:
+    from grafos.apsp import grafo_para_procesos, borra_temporal
+    from grafos.csr import ConstructorCSR
+    from grafos.tabla_ids import TablaIds
+except ImportError:
+    from apsp import grafo_para_procesos, borra_temporal
+    from csr import ConstructorCSR
+    from tabla_ids import TablaIds
+
+INF = float('inf')
+ORIGENES_POR_TAREA = 8
+
+# estado de cada proceso trabajador (lo arma _inicia_trabajador)
+_TRABAJO = {}
+
+
+class MatrizOD:
+    """
+    Tabla |O|×|D| en dos arreglos float32 planos (fila = origen).
+    distancia[i*|D| + j], tiempo[i*|D| + j]; inf si el destino no es alcanzable.
+    """
+
+    def __init__(self, origenes, destinos, distancia, tiempo):
+        self.origenes = origenes
+        self.destinos = destinos
+        self.distancia = distancia
+        self.tiempo = tiempo
+        self._fila = {o: i for i, o in enumerate(origenes)}
+        self._col = {d: j for j, d in enumerate(destinos)}
+
+    def valor(self, origen, destino, campo='tiempo'):
+        k = self._fila[origen] * len(self.destinos) + self._col[destino]
+        return (self.tiempo if campo == 'tiempo' else self.distancia)[k]
+
+    def fila(self, origen, campo='tiempo'):
+        """Fila del origen como memoryview (sin copiar)."""
+        n = len(self.destinos)
+        i = self._fila[origen]
+        return memoryview(self.tiempo if campo == 'tiempo' else self.distancia)[i * n:(i + 1) * n]
+
+    @property
+    def forma(self):
+        return len(self.origenes), len(self.destinos)
+
+    @property
+    def nbytes(self):
+        return self.distancia.itemsize * len(self.distancia) + self.tiempo.itemsize * len(self.tiempo)
+
+    def exporta_csv(self, ruta):
+        """CSV largo: origen,destino,distancia,tiempo (una fila por par)."""
+        n = len(self.destinos)
+        with open(ruta, 'w', newline='', encoding='utf-8') as f:
+            w = csv.writer(f)
+            w.writerow(['origen', 'destino', 'distancia', 'tiempo'])
+            for i, o in enumerate(self.origenes):
+                dist = self.distancia[i * n:(i + 1) * n].tolist()
+                tiem = self.tiempo[i * n:(i + 1) * n].tolist()
+                for d, x, t in zip(self.destinos, dist, tiem):
+                    w.writerow([o, d, f'{x:.7g}' if x < INF else 'inf', f'{t:.7g}' if t < INF else 'inf'])
+
+
+def muchos_a_muchos(lista_ady, origenes, destinos, peso='tiempo', procesos=1, dir_disco=None):
+    """
+    lista_ady: GrafoCSR o {u: [(v, dist, tiempo), ...]}
+    origenes, destinos: ids de nodos (se permiten repetidos; se calcula una vez cada uno)
+    peso: valor a minimizar, 'tiempo' o 'distancia'
+    procesos: trabajadores (1 = en este proceso; None = os.cpu_count())
+    Retorna: (MatrizOD, stats)
+    """
+    t0 = time.time()
+    g = lista_ady if hasattr(lista_ady, 'offsets') else _csr_desde_triples(lista_ady)
+    origenes, destinos = list(origenes), list(destinos)
+    fuentes = list(dict.fromkeys(g.indice_de(o) for o in origenes))
+    objetivos = array('i', [g.indice_de(d) for d in destinos])
+    n = len(destinos)
+
+    procesos = procesos or os.cpu_count() or 1
+    filas = {}
+    explorados = 0
+    if procesos > 1 and len(fuentes) > 1:
+        compartido, temporal = grafo_para_procesos(g, dir_disco)
+        try:
+            tareas = [fuentes[a:a + ORIGENES_POR_TAREA] for a in range(0, len(fuentes), ORIGENES_POR_TAREA)]
+            with ProcessPoolExecutor(max_workers=procesos, initializer=_inicia_trabajador,
+                                     initargs=(compartido, peso, objetivos)) as ex:
+                for resultado in ex.map(_filas, tareas):
+                    for s, fd, ft, e in resultado:
+                        filas[s] = (fd, ft)
+                        explorados += e
+        finally:
+            if temporal:
+                borra_temporal(temporal)
+    else:
+        _inicia_trabajador(g, peso, objetivos)
+        for s, fd, ft, e in _filas(fuentes):
+            filas[s] = (fd, ft)
+            explorados += e
+        _TRABAJO.clear()
+
+    # armar la tabla en el orden pedido (orígenes repetidos copian la misma fila)
+    distancia, tiempo = array('f'), array('f')
+    for o in origenes:
+        fd, ft = filas[g.indice[o]]
+        distancia.extend(fd)
+        tiempo.extend(ft)
+    matriz = MatrizOD(origenes, destinos, distancia, tiempo)
+    t1 = time.time()
+    V = len(g)
+    stats = {
+        "algoritmo": "Muchos a muchos (Dijkstra multi-destino)",
+        "V": V,
+        "origenes": len(origenes),
+        "destinos": n,
+        "busquedas": len(fuentes),
+        "nodos_explorados": explorados,
+        "fraccion_explorada": round(explorados / (V * len(fuentes)), 4) if V and fuentes else 0.0,
+        "procesos": procesos if len(fuentes) > 1 else 1,
+        "bytes_matriz": matriz.nbytes,
+        "tiempo_algo_s": round(t1 - t0, 6),
+        "complejidad_teorica": "O(|O|·(V + E) log V), cada búsqueda para al fijar todos los destinos"
+    }
+    return matriz, stats
+
+
+def _csr_desde_triples(lista_ady):
+    """{u: [(v, dist, tiempo), ...]} -> GrafoCSR con ambos pesos."""
+    cons = ConstructorCSR(TablaIds(lista_ady))
+    for u, vecinos in lista_ady.items():
+        for v, d, t in vecinos:
+            cons.arco(u, v, d, t)
+    return cons.construir()
+
+
+def _inicia_trabajador(g, peso, objetivos):
+    _TRABAJO.update(g=g, peso=peso, objetivos=objetivos)
+
+
+def _filas(fuentes):
+    """[(fuente, fila_distancia, fila_tiempo, nodos_explorados), ...] para cada fuente (índice interno)."""
+    g, peso, objetivos = _TRABAJO['g'], _TRABAJO['peso'], _TRABAJO['objetivos']
+    return [(s, *_dijkstra_multidestino(g, s, objetivos, peso)) for s in fuentes]
+
+
+def busqueda_multidestino(g, s, objetivos, peso):
+    """
+    Dijkstra desde s (índice interno) que termina cuando todos los objetivos
+    quedan fijados; minimiza 'peso' y acumula el otro valor sobre el mismo camino.
+    Retorna (dist, otro, padre, fijados, nodos_explorados) indexados como el grafo.
+    """
+    V = g.num_nodos
+    off, dst, vivos = g.offsets, g.destinos, g.vivos
+    w = g.pesos(peso)
+    w2 = g.pesos('distancia' if peso == 'tiempo' else 'tiempo')
+    dist = array('d', [INF]) * V
+    otro = array('d', [INF]) * V
+    padre = array('i', [-1]) * V
+    fijados = bytearray(V)
+    es_objetivo = bytearray(V)
+    for t in objetivos:
+        es_objetivo[t] = 1
+    pendientes = sum(es_objetivo)
+    dist[s] = 0.0
+    otro[s] = 0.0
+    frontera = [(0.0, s)]
+    explorados = 0
+    while frontera and pendientes:
+        d_u, u = heapq.heappop(frontera)
+        if fijados[u]:
+            continue
+        fijados[u] = 1
+        explorados += 1
+        if es_objetivo[u]:
+            pendientes -= 1
+        o_u = otro[u]
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if fijados[v]:
+                continue
+            nuevo = d_u + w[k]
+            if nuevo < dist[v]:
+                dist[v] = nuevo
+                otro[v] = o_u + w2[k]
+                padre[v] = u
+                heapq.heappush(frontera, (nuevo, v))
+    return dist, otro, padre, fijados, explorados
+
+
+def _dijkstra_multidestino(g, s, objetivos, peso):
+    """(fila_distancia, fila_tiempo, nodos_explorados), filas float32 en el orden de objetivos."""
+    dist, otro, _, fijados, explorados = busqueda_multidestino(g, s, objetivos, peso)
+    # solo valen los objetivos fijados (los demás quedaron inalcanzables)
+    fila_min = array('f', [dist[t] if fijados[t] else INF for t in objetivos])
+    fila_otro = array('f', [otro[t] if fijados[t] else INF for t in objetivos])
+    if peso == 'tiempo':
+        return fila_otro, fila_min, explorados
+    return fila_min, fila_otro, explorados
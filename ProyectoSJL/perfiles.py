@@ -0,0 +1,269 @@
+"""
+grafos/perfiles.py
+Tiempos de viaje que dependen de la hora. Provee:
+- TablaPerfiles(nombres, velocidades): velocidad (km/h) de cada clase de vía en
+  96 franjas de 15 min; TablaPerfiles.lima() trae una tabla por defecto con
+  horas punta de mañana y tarde
+- PerfilesGrafo(grafo, tabla, clases): una clase (1 byte) por arco del GrafoCSR;
+  .uniforme(...) / .desde_osm(grafo, G) (clase según la etiqueta 'highway')
+- perfiles.tiempo_arco(k, minuto), perfiles.instantanea(minuto) -> GrafoCSR con
+  los tiempos de esa hora (comparte todo lo demás)
+- dijkstra_dependiente(perfiles, inicio, salida, destino=None) -> (ArbolDijkstra, stats)
+- llegada_mas_temprana(perfiles, origen, destino, salida) -> (llegada, ruta, stats)
+- minutos_de_hora('07:30') -> 450.0 / hora_de_minutos(450.0) -> '07:30'
+Los arcos no guardan su propio perfil: guardan el número de clase y todos los
+de la misma clase leen la misma fila de la tabla (ritmo en min/m por franja).
+El tiempo de un arco de largo d que se empieza a recorrer en el minuto t es
+d · ritmo(t), con ritmo interpolado linealmente entre el inicio de su franja y
+el de la siguiente. Para que se cumpla FIFO (salir más tarde nunca hace llegar
+antes) la baja de ritmo entre franjas se limita a 15 / largo máximo de la clase;
+con largos urbanos ese límite no se alcanza. En Dijkstra todos los arcos de un
+nodo salen a la misma hora, así que la interpolación se hace una vez por nodo
+fijado (una por clase) y cada relajación es una multiplicación.
+"""
+
+import heapq
+import time
+from array import array
+from itertools import compress
+
+try:
+    from grafos.csr import GrafoCSR
+    from grafos.dijkstra import ArbolDijkstra, _resumen_destino
+    from grafos.loader import VELOCIDAD_KMH
+except ImportError:
+    from csr import GrafoCSR
+    from dijkstra import ArbolDijkstra, _resumen_destino
+    from loader import VELOCIDAD_KMH
+
+INF = float('inf')
+FRANJAS = 96
+MINUTOS_FRANJA = 1440.0 / FRANJAS
+
+# clase de vía de cada valor de 'highway' en OSM (lo que no está cae en 'local')
+CLASES_OSM = {
+    'motorway': 'expresa', 'motorway_link': 'expresa', 'trunk': 'expresa', 'trunk_link': 'expresa',
+    'primary': 'arterial', 'primary_link': 'arterial', 'secondary': 'arterial', 'secondary_link': 'arterial',
+    'tertiary': 'colectora', 'tertiary_link': 'colectora',
+}
+
+# factor de congestión por hora (1 = vía libre) para TablaPerfiles.lima()
+_CONGESTION_LIMA = [1.0, 1.0, 1.0, 1.0, 1.0, 0.9, 0.7, 0.5, 0.5, 0.65, 0.8, 0.8,
+                    0.75, 0.75, 0.8, 0.8, 0.7, 0.55, 0.45, 0.5, 0.65, 0.8, 0.9, 1.0]
+
+
+def minutos_de_hora(texto):
+    """'HH:MM' (o un número de minutos) -> minutos desde la medianoche."""
+    if isinstance(texto, (int, float)):
+        return float(texto)
+    h, _, m = str(texto).strip().partition(':')
+    return int(h) * 60.0 + float(m or 0)
+
+
+def hora_de_minutos(minutos):
+    """Minutos desde la medianoche -> 'HH:MM' (se pasa de 24 h si el viaje cruza la medianoche)."""
+    m = int(round(minutos))
+    return f'{m // 60:02d}:{m % 60:02d}'
+
+
+class TablaPerfiles:
+    """
+    nombres: clase de vía de cada fila
+    velocidades: array('d') km/h, fila c en [c*96, (c+1)*96)
+    """
+
+    def __init__(self, nombres, velocidades):
+        self.nombres = list(nombres)
+        self.velocidades = array('d')
+        for perfil in velocidades:
+            if len(perfil) != FRANJAS:
+                raise ValueError(f'cada perfil necesita {FRANJAS} franjas de velocidad')
+            self.velocidades.extend(perfil)
+
+    @classmethod
+    def lima(cls):
+        """Expresa / arterial / colectora / local; las vías grandes sienten más la hora punta."""
+        clases = [('expresa', 60.0, 1.0), ('arterial', 40.0, 0.9),
+                  ('colectora', 35.0, 0.7), ('local', VELOCIDAD_KMH, 0.5)]
+        velocidades = []
+        for _, libre, sensibilidad in clases:
+            velocidades.append([libre * (1.0 - sensibilidad * (1.0 - _CONGESTION_LIMA[int(f * MINUTOS_FRANJA) // 60]))
+                                for f in range(FRANJAS)])
+        return cls([c[0] for c in clases], velocidades)
+
+    def clase(self, nombre):
+        return self.nombres.index(nombre)
+
+    def velocidad(self, clase, minuto):
+        """km/h de la franja que contiene 'minuto'."""
+        return self.velocidades[clase * FRANJAS + int((minuto % 1440.0) // MINUTOS_FRANJA)]
+
+    def ritmos(self, largo_maximo):
+        """
+        min/m por franja, FRANJAS+1 valores por clase (el último repite el
+        primero para interpolar sin módulo), con la baja entre franjas limitada
+        para FIFO según largo_maximo[c] (metros del arco más largo de la clase).
+        """
+        ritmo = array('d')
+        for c in range(len(self.nombres)):
+            fila = [60.0 / (1000.0 * v) for v in self.velocidades[c * FRANJAS:(c + 1) * FRANJAS]]
+            tope = MINUTOS_FRANJA / largo_maximo[c] if largo_maximo[c] > 0 else INF
+            cambio = True
+            while cambio:                   # solo sube valores: termina en pocas vueltas
+                cambio = False
+                for f in range(FRANJAS):
+                    g = (f + 1) % FRANJAS
+                    if fila[f] - fila[g] > tope:
+                        fila[g] = fila[f] - tope
+                        cambio = True
+            ritmo.extend(fila)
+            ritmo.append(fila[0])
+        return ritmo
+
+
+class PerfilesGrafo:
+    """
+    tabla: TablaPerfiles compartida
+    clases: array('B') clase de cada arco, en el orden de grafo.destinos
+    ritmo: tabla en min/m ya ajustada para FIFO en este grafo
+    """
+
+    def __init__(self, grafo, tabla, clases):
+        if len(clases) != grafo.num_arcos:
+            raise ValueError('se necesita una clase por arco del grafo')
+        self.grafo = grafo
+        self.tabla = tabla
+        self.clases = clases
+        largo = [0.0] * len(tabla.nombres)
+        for d, c in zip(grafo.distancias, clases):
+            if d > largo[c]:
+                largo[c] = d
+        self.ritmo = tabla.ritmos(largo)
+
+    @classmethod
+    def uniforme(cls, grafo, tabla=None, nombre='local'):
+        """Todos los arcos con la misma clase (CSV sin tipo de vía)."""
+        tabla = tabla or TablaPerfiles.lima()
+        return cls(grafo, tabla, array('B', [tabla.clase(nombre)]) * grafo.num_arcos)
+
+    @classmethod
+    def desde_osm(cls, grafo, G, tabla=None):
+        """Clase de cada arco de 'grafo' según la etiqueta 'highway' de la arista u-v en el grafo de osmnx G."""
+        tabla = tabla or TablaPerfiles.lima()
+        local = tabla.clase('local')
+        de_nombre = {n: tabla.clase(c) for n, c in CLASES_OSM.items() if c in tabla.nombres}
+        ids, off, dst = grafo.ids, grafo.offsets, grafo.destinos
+        clases = array('B', [local]) * grafo.num_arcos
+        for i in range(grafo.num_nodos):
+            u = ids[i]
+            for k in range(off[i], off[i + 1]):
+                datos = G.get_edge_data(u, ids[dst[k]]) or G.get_edge_data(ids[dst[k]], u)
+                if not datos:
+                    continue
+                via = next(iter(datos.values())).get('highway')
+                if isinstance(via, list):           # osmnx junta etiquetas al simplificar
+                    via = via[0]
+                clases[k] = de_nombre.get(via, local)
+        return cls(grafo, tabla, clases)
+
+    def ritmos_en(self, minuto):
+        """min/m de cada clase a esa hora (interpolado entre franjas)."""
+        t = (minuto % 1440.0) / MINUTOS_FRANJA
+        f = int(t)
+        a = t - f
+        r = self.ritmo
+        salto = FRANJAS + 1
+        return [r[b] + (r[b + 1] - r[b]) * a for b in range(f, len(r), salto)]
+
+    def tiempo_arco(self, k, minuto):
+        """Minutos para recorrer el arco k si se entra en él en 'minuto'."""
+        return self.grafo.distancias[k] * self.ritmos_en(minuto)[self.clases[k]]
+
+    def instantanea(self, minuto):
+        """GrafoCSR con los tiempos de esa hora (mismos nodos, offsets, destinos y distancias)."""
+        g = self.grafo
+        ritmos = self.ritmos_en(minuto)
+        tiempos = array('d', [d * ritmos[c] for d, c in zip(g.distancias, self.clases)])
+        inst = GrafoCSR(g.nodos, g.offsets, g.destinos, g.distancias, tiempos)
+        inst.simetrico = g.simetrico
+        inst.mascara_nodos, inst.vivos = g.mascara_nodos, g.vivos
+        return inst
+
+
+def dijkstra_dependiente(perfiles, inicio, salida, destino=None):
+    """
+    perfiles: PerfilesGrafo del grafo a recorrer
+    salida: minutos desde la medianoche o 'HH:MM'
+    Retorna (ArbolDijkstra, stats); arbol.dist son minutos de viaje desde la salida.
+    """
+    t0 = time.time()
+    g = perfiles.grafo
+    salida = minutos_de_hora(salida)
+    V = g.num_nodos
+    off, dst, vivos, largo, clases = g.offsets, g.destinos, g.vivos, g.distancias, perfiles.clases
+    ritmos_en = perfiles.ritmos_en
+    llegada = array('d', [INF]) * V
+    padre = array('i', [-1]) * V
+    arco = array('i', [-1]) * V
+    fijados = bytearray(V)
+    s = g.indice_de(inicio)
+    t = g.indice_de(destino) if destino is not None and destino in g else -1
+    llegada[s] = salida
+    frontera = [(salida, s)]
+    nodos_explorados = 0
+    aristas_relajadas = 0
+
+    while frontera:
+        h_u, u = heapq.heappop(frontera)
+        if fijados[u]:
+            continue
+        fijados[u] = 1
+        nodos_explorados += 1
+        if u == t:
+            break
+        ritmo = ritmos_en(h_u)          # una interpolación por nodo, no por arco
+        ini, fin = off[u], off[u + 1]
+        for k in (range(ini, fin) if vivos is None else compress(range(ini, fin), vivos[ini:fin])):
+            v = dst[k]
+            if fijados[v]:
+                continue
+            nuevo = h_u + largo[k] * ritmo[clases[k]]
+            aristas_relajadas += 1
+            if nuevo < llegada[v]:
+                llegada[v] = nuevo
+                padre[v] = u
+                arco[v] = k
+                heapq.heappush(frontera, (nuevo, v))
+
+    dist = array('d', [h - salida for h in llegada])
+    arbol = ArbolDijkstra(g.nodos, dist, padre, fijados, s, g.mascara_nodos)
+    t1 = time.time()
+    stats = {
+        "algoritmo": "Dijkstra dependiente del tiempo",
+        "V": len(g),
+        "E_aproximado": g.arcos_presentes // 2 if V > 0 else 0,
+        "hora_salida": hora_de_minutos(salida),
+        "nodos_explorados": nodos_explorados,
+        "aristas_relajadas": aristas_relajadas,
+        "tiempo_algo_s": round(t1 - t0, 6),
+        "complejidad_teorica": "O((V + E) log V), FIFO"
+    }
+    _resumen_destino(stats, arbol, inicio, destino)
+    if destino is not None and stats["distancia_total"] < INF:
+        # distancia_total de _resumen_destino son minutos: se pasa a metros por los arcos usados
+        minutos = stats["distancia_total"]
+        metros = 0.0
+        i = t
+        while arco[i] >= 0:
+            metros += largo[arco[i]]
+            i = padre[i]
+        stats.update(distancia_total=metros, tiempo_estimado_min=round(minutos, 2),
+                     hora_llegada=hora_de_minutos(salida + minutos))
+    return arbol, stats
+
+
+def llegada_mas_temprana(perfiles, origen, destino, salida):
+    """Retorna (llegada en minutos desde la medianoche, ruta, stats); llegada = inf si no hay camino."""
+    arbol, stats = dijkstra_dependiente(perfiles, origen, salida, destino)
+    viaje = arbol.distancia(destino)
+    return minutos_de_hora(salida) + viaje, stats["ruta"], stats
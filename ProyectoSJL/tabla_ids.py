@@ -0,0 +1,134 @@
+"""
+grafos/tabla_ids.py
+Interning de ids de nodo: ids externos de OSM (enteros de 64 bits o textos)
+<-> índices densos 0..V-1 que usan los arreglos de los algoritmos. Provee:
+- TablaIds: interna(id) -> índice, tabla[i] -> id, indice[id] -> i
+- TablaIds.guarda(ruta) / TablaIds.carga(ruta): tabla persistida en CSV (indice,nodo_id)
+- ruta_tabla_ids(aristas_csv) -> ruta de la tabla que acompaña al grafo
+"""
+
+import csv, os
+from array import array
+from itertools import count, filterfalse
+
+INT64_MIN, INT64_MAX = -2**63, 2**63 - 1
+
+
+def ruta_tabla_ids(aristas_csv):
+    """grafo_sjl_osm.csv -> grafo_sjl_osm_ids.csv (misma carpeta)."""
+    base, _ = os.path.splitext(aristas_csv)
+    return base + '_ids.csv'
+
+
+class TablaIds:
+    """
+    Mientras todos los ids sean enteros se guardan en un array('q') (8 bytes por
+    nodo); si aparece un id de texto se pasa a una lista de Python.
+    """
+
+    def __init__(self, ids=()):
+        self.ids = array('q')
+        self._indice = {}
+        for n in ids:
+            self.interna(n)
+
+    @classmethod
+    def desde_secuencia(cls, ids):
+        """
+        Envuelve una secuencia ya numerada (p.ej. memoryview sobre la caché
+        binaria) sin copiarla; el diccionario inverso se arma al primer uso.
+        """
+        tabla = cls()
+        tabla.ids = ids
+        tabla._indice = None
+        return tabla
+
+    @property
+    def indice(self):
+        """Diccionario id externo -> índice."""
+        if self._indice is None:
+            self._indice = {n: i for i, n in enumerate(self.ids)}
+        return self._indice
+
+    def interna(self, nodo):
+        """Índice denso de 'nodo'; si es nuevo se le asigna el siguiente."""
+        i = self.indice.get(nodo)
+        if i is None:
+            i = len(self.ids)
+            es_int64 = type(nodo) is int and INT64_MIN <= nodo <= INT64_MAX
+            if not isinstance(self.ids, (array, list)):
+                # vista de solo lectura (caché mapeada): se copia al agregar
+                self.ids = array('q', self.ids) if es_int64 and self.numerica else list(self.ids)
+            if isinstance(self.ids, array) and not es_int64:
+                self.ids = list(self.ids)
+            self.ids.append(nodo)
+            self._indice[nodo] = i
+        return i
+
+    def interna_lote(self, ids):
+        """
+        interna() para una columna completa: los ids nuevos se registran de una
+        vez (en orden de aparición) y el resultado es un array('i') de índices.
+        """
+        ids = ids if isinstance(ids, (list, tuple)) else list(ids)
+        indice = self.indice
+        nuevos = list(dict.fromkeys(filterfalse(indice.__contains__, ids)))
+        if nuevos:
+            if not isinstance(self.ids, (array, list)) or (isinstance(self.ids, array) and
+                    not all(type(n) is int and INT64_MIN <= n <= INT64_MAX for n in nuevos)):
+                for n in nuevos:
+                    self.interna(n)
+            else:
+                base = len(self.ids)
+                self.ids.extend(nuevos)
+                indice.update(zip(nuevos, count(base)))
+        return array('i', map(indice.__getitem__, ids))
+
+    def externos(self, indices):
+        """Lista de ids externos para una secuencia de índices."""
+        ids = self.ids
+        return [ids[i] for i in indices]
+
+    @property
+    def numerica(self):
+        """True si todos los ids son enteros de 64 bits (arreglo tipado)."""
+        return not isinstance(self.ids, list)
+
+    def __getitem__(self, i):
+        return self.ids[i]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, nodo):
+        return nodo in self.indice
+
+    # ---------------- persistencia ----------------
+    def guarda(self, ruta):
+        with open(ruta, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['indice', 'nodo_id'])
+            for i, n in enumerate(self.ids):
+                writer.writerow([i, n])
+
+    @classmethod
+    def carga(cls, ruta):
+        with open(ruta, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            if next(reader, None) != ['indice', 'nodo_id']:
+                raise ValueError(f"Cabecera inesperada en {ruta}")
+            filas = list(filter(None, reader))
+        indices, ids = zip(*filas) if filas else ((), ())
+        if list(map(int, indices)) != list(range(len(indices))):
+            raise ValueError(f"Tabla de ids corrupta en {ruta}: índices fuera de orden")
+        tabla = cls()
+        if all(map(str.isdigit, ids)):
+            tabla.interna_lote(list(map(int, ids)))
+        else:
+            tabla.interna_lote([int(x) if x.isdigit() else x for x in ids])
+        if len(tabla) != len(ids):
+            raise ValueError(f"Tabla de ids corrupta en {ruta}: ids repetidos")
+        return tabla
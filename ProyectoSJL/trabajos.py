@@ -0,0 +1,191 @@
+"""
+grafos/trabajos.py
+Trabajos en segundo plano para la GUI de Tkinter. Provee:
+- PlanificadorTrabajos(root, intervalo_ms=100)
+  .lanza(nombre, funcion, *args, al_terminar=None, al_fallar=None,
+         al_cancelar=None, al_progresar=None, **kwargs) -> Trabajo
+  .cancela(trabajo=None) (None = el que está corriendo y los que esperan)
+  .en_principal(funcion, *args): pide que se llame en el hilo de Tk
+  .ocupado()
+- Progreso: la función del trabajo lo recibe como progreso=...;
+  progreso(hechos, total) informa el avance y lanza Cancelado si se pidió cancelar
+- Cancelado: excepción con la que termina un trabajo cancelado
+Los trabajos corren de a uno en un hilo aparte, en orden de llegada (así no
+compiten por el grafo ni por la caché de árboles). El hilo nunca toca Tk: deja
+mensajes en una cola que el hilo principal vacía cada intervalo_ms con
+root.after, y ahí se llaman los callbacks. Cancelar es cooperativo: los
+algoritmos llaman a progreso() cada tantos pasos y ese llamado lanza Cancelado.
+Al salir la excepción se sueltan las referencias del hilo (matrices, árboles)
+y la memoria vuelve sin esperar al final del algoritmo.
+"""
+
+import gc
+import itertools
+import queue
+import threading
+import time
+
+PROGRESO_CADA_S = 0.1       # como mucho un mensaje de avance por trabajo cada 100 ms
+
+
+class Cancelado(Exception):
+    """El trabajo se canceló (lo lanza progreso() al llamarse)."""
+
+
+class Trabajo:
+    """
+    estado: 'en cola', 'corriendo', 'terminado', 'cancelado' o 'error'
+    hechos / total: último avance informado (total None = desconocido)
+    """
+
+    _ids = itertools.count(1)
+
+    def __init__(self, nombre, funcion, args, kwargs, callbacks):
+        self.id = next(Trabajo._ids)
+        self.nombre = nombre
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.callbacks = callbacks
+        self.estado = 'en cola'
+        self.hechos = 0
+        self.total = None
+        self.inicio = None
+        self.segundos = 0.0
+        self.cancelar = threading.Event()
+
+    def suelta(self):
+        """Sin referencias a la función ni a sus argumentos (pueden ser grafos grandes)."""
+        self.funcion = self.args = self.kwargs = None
+
+
+class Progreso:
+    def __init__(self, trabajo, cola, cada_s=PROGRESO_CADA_S):
+        self.trabajo = trabajo
+        self.cola = cola
+        self.cada_s = cada_s
+        self._ultimo = 0.0
+
+    def __call__(self, hechos, total=None):
+        if self.trabajo.cancelar.is_set():
+            raise Cancelado(self.trabajo.nombre)
+        ahora = time.monotonic()
+        if ahora - self._ultimo >= self.cada_s:
+            self._ultimo = ahora
+            self.cola.put(('progreso', self.trabajo, (hechos, total)))
+
+    @property
+    def cancelado(self):
+        return self.trabajo.cancelar.is_set()
+
+
+class PlanificadorTrabajos:
+
+    def __init__(self, root, intervalo_ms=100):
+        self.root = root
+        self.intervalo_ms = intervalo_ms
+        self._pendientes = queue.Queue()    # trabajos por correr (hilo principal -> hilo de trabajo)
+        self._mensajes = queue.Queue()      # avisos (hilo de trabajo -> hilo principal)
+        self._en_espera = []
+        self.actual = None
+        self._hilo = None
+        self.root.after(self.intervalo_ms, self._sondea)
+
+    def lanza(self, nombre, funcion, *args, al_terminar=None, al_fallar=None,
+              al_cancelar=None, al_progresar=None, **kwargs):
+        """
+        Pone funcion(*args, progreso=..., **kwargs) en la cola de trabajos. Los
+        callbacks corren en el hilo de Tk: al_terminar(resultado),
+        al_fallar(trabajo, mensaje), al_cancelar(trabajo), al_progresar(trabajo).
+        """
+        callbacks = {'terminado': al_terminar, 'error': al_fallar,
+                     'cancelado': al_cancelar, 'progreso': al_progresar}
+        trabajo = Trabajo(nombre, funcion, args, kwargs, callbacks)
+        self._en_espera.append(trabajo)
+        self._pendientes.put(trabajo)
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._corre, name='trabajos', daemon=True)
+            self._hilo.start()
+        return trabajo
+
+    def cancela(self, trabajo=None):
+        """Pide cancelar 'trabajo' (None = todos). Retorna cuántos se marcaron."""
+        marcados = 0
+        for t in ([self.actual] if self.actual else []) + self._en_espera:
+            if (trabajo is None or t is trabajo) and not t.cancelar.is_set():
+                t.cancelar.set()
+                marcados += 1
+        return marcados
+
+    def en_principal(self, funcion, *args):
+        """Llama funcion(*args) en el hilo de Tk en el próximo sondeo (para usar desde el trabajo)."""
+        self._mensajes.put(('llamada', funcion, args))
+
+    def ocupado(self):
+        return self.actual is not None or bool(self._en_espera)
+
+    # ---------------- hilo de trabajo ----------------
+    def _corre(self):
+        while True:
+            trabajo = self._pendientes.get()
+            self._mensajes.put(('inicio', trabajo, None))
+            if trabajo.cancelar.is_set():
+                self._termina(trabajo, 'cancelado', None)
+                continue
+            trabajo.inicio = time.monotonic()
+            cancelado = False
+            try:
+                resultado = trabajo.funcion(*trabajo.args, progreso=Progreso(trabajo, self._mensajes), **trabajo.kwargs)
+            except Cancelado:
+                cancelado = True
+            except Exception as e:
+                # solo el texto: la excepción con su traceback retendría los frames del algoritmo
+                self._termina(trabajo, 'error', f'{type(e).__name__}: {e}')
+            else:
+                self._termina(trabajo, 'terminado', resultado)
+            resultado = None
+            if cancelado:
+                # ya fuera del except: el traceback no retiene los frames del algoritmo
+                gc.collect()                # ciclos que todavía retengan matrices o árboles
+                self._termina(trabajo, 'cancelado', None)
+
+    def _termina(self, trabajo, estado, dato):
+        if trabajo.inicio is not None:
+            trabajo.segundos = time.monotonic() - trabajo.inicio
+        trabajo.suelta()
+        self._mensajes.put((estado, trabajo, dato))
+
+    # ---------------- hilo de Tk ----------------
+    def _sondea(self):
+        try:
+            while True:
+                tipo, trabajo, dato = self._mensajes.get_nowait()
+                self._atiende(tipo, trabajo, dato)
+        except queue.Empty:
+            pass
+        finally:
+            # aunque un callback falle, el sondeo sigue
+            self.root.after(self.intervalo_ms, self._sondea)
+
+    def _atiende(self, tipo, trabajo, dato):
+        if tipo == 'llamada':
+            trabajo(*dato)
+            return
+        if tipo == 'inicio':
+            if trabajo in self._en_espera:
+                self._en_espera.remove(trabajo)
+            self.actual = trabajo
+            trabajo.estado = 'corriendo'
+            callback, argumentos = trabajo.callbacks['progreso'], (trabajo,)
+        elif tipo == 'progreso':
+            trabajo.hechos, trabajo.total = dato
+            callback, argumentos = trabajo.callbacks['progreso'], (trabajo,)
+        else:
+            trabajo.estado = tipo
+            if self.actual is trabajo:
+                self.actual = None
+            callbacks, trabajo.callbacks = trabajo.callbacks, {}
+            callback = callbacks.get(tipo)
+            argumentos = {'terminado': (dato,), 'error': (trabajo, dato), 'cancelado': (trabajo,)}[tipo]
+        if callback is not None:
+            callback(*argumentos)
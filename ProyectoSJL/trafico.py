@@ -0,0 +1,204 @@
+"""
+grafos/trafico.py
+Tráfico en vivo: cambios de peso por lotes sobre el grafo cargado y
+reparación incremental de los árboles de caminos mínimos. Provee:
+- actualiza_pesos(grafo, cambios, peso='tiempo', dirigida=False) -> (arcos, stats)
+  cambios: [(u, v, valor)]; peso 'distancia', 'tiempo' o 'velocidad' (km/h,
+  se pasa a minutos con el largo de cada arco)
+- repara_arbol(arbol, grafo, arcos, peso) -> stats: ArbolDijkstra al día sin
+  rehacer el Dijkstra
+- lee_cambios(ruta) -> (cambios, peso) desde un CSV origen,destino,<peso>
+Los pesos se cambian en sitio. Si el arreglo viene mapeado de la caché (solo
+lectura) se copia ese arreglo una vez y se cambia la copia; los demás siguen
+mapeados. Sobre una VistaGrafo los cambios quedan en la vista (la base no se
+toca). arcos = [(i, j, viejo, nuevo)] en índices de la base (los mismos que
+usa vista.csr(), que la enmascara): lo que necesita repara_arbol. Los arcos y
+nodos fuera de la vista se ignoran.
+Reparación (Ramalingam–Reps): si subió un arco del árbol, el subárbol que
+colgaba de él pierde sus distancias y se vuelve a sembrar desde sus vecinos
+de afuera; si bajó un arco, se relaja. Luego un Dijkstra que solo avanza
+mientras mejora algo: fuera de la zona afectada no se toca nada.
+"""
+
+import csv
+import heapq
+import time
+from array import array
+
+try:
+    from grafos.vistas import VistaGrafo
+except ImportError:
+    from vistas import VistaGrafo
+
+INF = float('inf')
+COLUMNAS = {'tiempo_minutos': 'tiempo', 'distancia_metros': 'distancia', 'velocidad_kmh': 'velocidad'}
+
+
+def lee_cambios(ruta):
+    """CSV con origen,destino y una columna tiempo_minutos, distancia_metros o velocidad_kmh."""
+    with open(ruta, newline='', encoding='utf-8') as f:
+        lector = csv.DictReader(f)
+        columna = next((c for c in COLUMNAS if c in (lector.fieldnames or [])), None)
+        if columna is None:
+            raise ValueError(f'{ruta}: falta una columna {", ".join(COLUMNAS)}')
+        cambios = [(_id(fila['origen']), _id(fila['destino']), float(fila[columna])) for fila in lector]
+    return cambios, COLUMNAS[columna]
+
+
+def _id(texto):
+    texto = texto.strip()
+    return int(texto) if texto.lstrip('-').isdigit() else texto
+
+
+def actualiza_pesos(grafo, cambios, peso='tiempo', dirigida=False):
+    """
+    grafo: GrafoCSR o VistaGrafo
+    cambios: [(u, v, valor)] para u -> v (y v -> u si no es dirigida)
+    Retorna (arcos, stats); arcos: [(i, j, viejo, nuevo)] por arco cambiado
+    (una vez por arco aunque el lote lo cambie varias veces).
+    """
+    t0 = time.time()
+    campo = 'distancia' if peso == 'distancia' else 'tiempo'
+    vista = isinstance(grafo, VistaGrafo)
+    g = grafo.csr() if vista else grafo
+    indice, off, dst, largo, vivos = g.indice, g.offsets, g.destinos, g.distancias, g.vivos
+    viejos = g.pesos(campo)
+    previos = {}                            # arco -> (i, j, viejo)
+    por_arco = []                           # (arco, valor) en orden del lote: gana el último
+    ignorados = 0
+    for u, v, valor in cambios:
+        if u not in g or v not in g:
+            ignorados += 1
+            continue
+        i, j = indice[u], indice[v]
+        arcos = [(k, i, j) for k in _arcos(off, dst, i, j, vivos)]
+        if not dirigida:
+            arcos += [(k, j, i) for k in _arcos(off, dst, j, i, vivos)]
+        if not arcos:
+            ignorados += 1
+            continue
+        for k, a, b in arcos:
+            previos.setdefault(k, (a, b, viejos[k]))
+            por_arco.append((k, largo[k] / 1000.0 / valor * 60.0 if peso == 'velocidad' else valor))
+
+    copiado = False
+    if vista:
+        g = grafo.cambia_pesos(por_arco, campo)
+    else:
+        w, copiado = _escribible(grafo, campo)
+        for k, valor in por_arco:
+            w[k] = valor
+        grafo._transpuesto = None           # tenía los pesos anteriores
+        if dirigida:
+            grafo.simetrico = None          # los dos sentidos pueden diferir ahora
+    nuevos = g.pesos(campo)
+    arcos = [(i, j, viejo, nuevos[k]) for k, (i, j, viejo) in previos.items() if nuevos[k] != viejo]
+    t1 = time.time()
+    stats = {
+        "algoritmo": "Actualización de pesos (tráfico)",
+        "peso": campo,
+        "cambios": len(cambios),
+        "ignorados": ignorados,
+        "arcos_cambiados": len(arcos),
+        "copia_de_pesos": copiado,
+        "tiempo_algo_s": round(t1 - t0, 6),
+    }
+    return arcos, stats
+
+
+def _arcos(off, dst, i, j, vivos=None):
+    return [k for k in range(off[i], off[i + 1]) if dst[k] == j and (vivos is None or vivos[k])]
+
+
+def _escribible(g, campo):
+    """Arreglo de pesos modificable en sitio; el mapeado (solo lectura) se copia una vez."""
+    nombre = 'distancias' if campo == 'distancia' else 'tiempos'
+    w = getattr(g, nombre)
+    if isinstance(w, memoryview):
+        w = array('d', w)
+        setattr(g, nombre, w)
+        return w, True
+    return w, False
+
+
+def repara_arbol(arbol, grafo, arcos, peso):
+    """
+    arbol: ArbolDijkstra completo (sin parada temprana) sobre 'grafo' antes del cambio
+    grafo: GrafoCSR ya actualizado (mismos índices que arbol.nodos)
+    arcos: [(i, j, viejo, nuevo)] de actualiza_pesos
+    Modifica el árbol en sitio. Retorna stats con los nodos que tocó.
+    """
+    t0 = time.time()
+    off, dst, vivos = grafo.offsets, grafo.destinos, grafo.vivos
+    w = grafo.pesos(peso)
+    dist, padre, fijados = arbol.dist, arbol.padre, arbol.fijados
+
+    # 1. arcos del árbol que subieron: sus subárboles quedan sin distancia
+    afectados = set()
+    for i, j, viejo, nuevo in arcos:
+        if nuevo > viejo and padre[j] == i and dist[j] == dist[i] + viejo and j not in afectados:
+            afectados.add(j)
+            pila = [j]
+            while pila:                     # hijos de x: vecinos y con padre[y] == x
+                x = pila.pop()
+                for k in range(off[x], off[x + 1]):
+                    y = dst[k]
+                    if padre[y] == x and y not in afectados and (vivos is None or vivos[k]):
+                        afectados.add(y)
+                        pila.append(y)
+    for x in afectados:
+        dist[x] = INF
+        padre[x] = -1
+        fijados[x] = 0
+
+    # 2. semillas: afectados desde sus vecinos de afuera, y arcos que bajaron
+    frontera = []
+    if afectados:
+        gt = grafo.transpuesto()
+        toff, tdst, tw, tvivos = gt.offsets, gt.destinos, gt.pesos(peso), gt.vivos
+        for x in afectados:
+            for k in range(toff[x], toff[x + 1]):
+                y = tdst[k]
+                if y in afectados or (tvivos is not None and not tvivos[k]):
+                    continue
+                nuevo = dist[y] + tw[k]
+                if nuevo < dist[x]:
+                    dist[x] = nuevo
+                    padre[x] = y
+            if dist[x] < INF:
+                frontera.append((dist[x], x))
+    for i, j, viejo, nuevo in arcos:
+        if nuevo < viejo and dist[i] + nuevo < dist[j]:
+            dist[j] = dist[i] + nuevo
+            padre[j] = i
+            frontera.append((dist[j], j))
+    heapq.heapify(frontera)
+
+    # 3. propagar solo mientras algo mejore
+    tocados = set(afectados)
+    aristas_relajadas = 0
+    while frontera:
+        d_x, x = heapq.heappop(frontera)
+        if d_x > dist[x]:
+            continue
+        fijados[x] = 1
+        tocados.add(x)
+        for k in range(off[x], off[x + 1]):
+            if vivos is not None and not vivos[k]:
+                continue
+            y = dst[k]
+            nuevo = d_x + w[k]
+            aristas_relajadas += 1
+            if nuevo < dist[y]:
+                dist[y] = nuevo
+                padre[y] = x
+                heapq.heappush(frontera, (nuevo, y))
+    t1 = time.time()
+    return {
+        "origen": arbol.nodos[arbol.origen],
+        "subarboles_afectados": len(afectados),
+        "nodos_tocados": len(tocados),
+        "aristas_relajadas": aristas_relajadas,
+        "inalcanzables": sum(1 for x in afectados if dist[x] == INF),
+        "tiempo_s": round(t1 - t0, 6),
+    }
@@ -0,0 +1,253 @@
+"""
+grafos/vistas.py
+Vistas de un GrafoCSR sin copiarlo. Provee:
+- VistaGrafo(base, mascara_nodos=None, mascara_arcos=None): subgrafo como máscaras sobre la base
+- VistaGrafo.por_nodos(grafo, nodos) -> vista inducida por un conjunto de ids
+- vista.quita_nodo / quita_arista / cambia_peso: cambios solo en la vista (copia al escribir)
+- vista.cambia_pesos(arcos, campo): pesos por arco (índices de la base) en lote
+- vista.restringe(nodos) / vista.copia(): vistas derivadas que comparten máscaras hasta que una cambie
+La base nunca se modifica: una vista guarda una máscara de nodos (1 byte por
+nodo), opcionalmente una de arcos (1 byte por arco) y un diccionario de pesos
+cambiados {arco: (dist, tiempo)}. Pasar del grafo completo a la componente
+gigante (u otro filtro) y volver cuesta O(máscara), no una copia del grafo.
+Como diccionario ({u: [(v, d, t), ...]}) la vista se recorre directo sobre la
+base. Los algoritmos con camino rápido CSR reciben los arreglos de la base
+(offsets, destinos, ids: mismos índices) con mascara_nodos y vivos, la máscara
+de arcos presentes (arco visible y sus dos extremos en la vista), y saltean lo
+que no está. Solo los pesos cambiados hacen copiar los arreglos de pesos.
+"""
+
+from array import array
+from collections.abc import Mapping
+from itertools import compress
+import copy, operator
+
+
+class VistaGrafo(Mapping):
+
+    def __init__(self, base, mascara_nodos=None, mascara_arcos=None, cambios=None):
+        if isinstance(base, VistaGrafo):
+            raise TypeError('Usa vista.restringe(...) para derivar una vista de otra vista.')
+        self.base = base                        # GrafoCSR compartido (no se modifica)
+        self.mascara_nodos = mascara_nodos      # bytearray(V) o None (= todos)
+        self.mascara_arcos = mascara_arcos      # bytearray(E) o None (= todos)
+        self.cambios = cambios if cambios is not None else {}   # arco -> (dist, tiempo)
+        self._propias = set()                   # máscaras que esta vista puede modificar en sitio
+        self._csr = None                        # GrafoCSR enmascarado para los caminos rápidos
+        self._vivos = None                      # bytearray(E) de arcos presentes (None = sin calcular)
+        self._pesos = None                      # (distancias, tiempos) propios si hay cambios
+        self._n = None
+
+    @classmethod
+    def por_nodos(cls, grafo, nodos):
+        """Vista inducida por 'nodos' (ids externos) sobre un GrafoCSR o sobre otra vista."""
+        if isinstance(grafo, VistaGrafo):
+            return grafo.restringe(nodos)
+        mascara = bytearray(grafo.num_nodos)
+        indice, actual = grafo.indice, grafo.mascara_nodos
+        for n in nodos:
+            i = indice.get(n)
+            if i is not None and (actual is None or actual[i]):
+                mascara[i] = 1
+        vista = cls(grafo, mascara)
+        vista._propias.add('nodos')
+        return vista
+
+    # ---------------- vistas derivadas (copia al escribir) ----------------
+    def copia(self):
+        """Otra vista con los mismos filtros y cambios; comparten máscaras hasta que alguna escriba."""
+        self._propias.clear()
+        return VistaGrafo(self.base, self.mascara_nodos, self.mascara_arcos, dict(self.cambios))
+
+    __copy__ = copia
+
+    def restringe(self, nodos):
+        """Nueva vista con solo los nodos de esta que estén en 'nodos'."""
+        vista = self.copia()
+        mascara = bytearray(self.base.num_nodos)
+        indice, actual = self.base.indice, self.mascara_nodos
+        for n in nodos:
+            i = indice.get(n)
+            if i is not None and (actual is None or actual[i]):
+                mascara[i] = 1
+        vista.mascara_nodos = mascara
+        vista._propias.add('nodos')
+        return vista
+
+    def _escribible(self, cual):
+        """Máscara propia (se copia la compartida, o se crea llena) antes de modificarla."""
+        nombre = 'mascara_' + cual
+        if cual not in self._propias:
+            actual = getattr(self, nombre)
+            if actual is None:
+                largo = self.base.num_nodos if cual == 'nodos' else self.base.num_arcos
+                actual = b'\x01' * largo
+            setattr(self, nombre, bytearray(actual))
+            self._propias.add(cual)
+        self._invalida()
+        return getattr(self, nombre)
+
+    def _invalida(self, mascaras=True):
+        self._csr = None
+        if mascaras:
+            self._vivos = None
+            self._n = None
+
+    # ---------------- cambios ----------------
+    def _arcos_entre(self, u, v):
+        b = self.base
+        i, j = b.indice[u], b.indice[v]
+        dst = b.destinos
+        return [k for k in range(b.offsets[i], b.offsets[i + 1]) if dst[k] == j]
+
+    def quita_nodo(self, u):
+        self._escribible('nodos')[self.base.indice[u]] = 0
+
+    def quita_arista(self, u, v, dirigida=False):
+        """Oculta los arcos u -> v (y v -> u si no es dirigida)."""
+        mascara = self._escribible('arcos')
+        arcos = self._arcos_entre(u, v) + ([] if dirigida else self._arcos_entre(v, u))
+        for k in arcos:
+            mascara[k] = 0
+        return len(arcos)
+
+    def cambia_peso(self, u, v, distancia=None, tiempo=None, dirigida=False):
+        """Nuevos pesos para u -> v (y v -> u si no es dirigida); None deja el valor actual."""
+        arcos = self._arcos_entre(u, v) + ([] if dirigida else self._arcos_entre(v, u))
+        dis, tie = self.base.distancias, self.base.tiempos
+        for k in arcos:
+            d, t = self.cambios.get(k, (dis[k], tie[k]))
+            self.cambios[k] = (d if distancia is None else distancia, t if tiempo is None else tiempo)
+        if self._pesos is not None:
+            for k in arcos:
+                self._pesos[0][k], self._pesos[1][k] = self.cambios[k]
+        self._invalida(mascaras=False)
+        return len(arcos)
+
+    def cambia_pesos(self, arcos, campo='tiempo'):
+        """
+        arcos: [(k, valor)] con k arco de la base (los índices de csr() son los
+        mismos). Se guardan en la vista y se escriben en los pesos propios;
+        retorna csr() con los pesos nuevos.
+        """
+        dis, tie = self.base.distancias, self.base.tiempos
+        for k, valor in arcos:
+            d, t = self.cambios.get(k, (dis[k], tie[k]))
+            self.cambios[k] = (valor, t) if campo == 'distancia' else (d, valor)
+        if self._pesos is None:
+            self._invalida(mascaras=False)
+            return self.csr()
+        w = self._pesos[0] if campo == 'distancia' else self._pesos[1]
+        for k, valor in arcos:
+            w[k] = valor
+        g = self.csr()
+        g._transpuesto = None
+        g.simetrico = None
+        return g
+
+    # ---------------- GrafoCSR enmascarado (para los caminos rápidos) ----------------
+    def csr(self):
+        """
+        GrafoCSR sobre los arreglos de la base con las máscaras de la vista
+        (mascara_nodos, vivos) y, si hay cambios, pesos propios. Sin filtros
+        ni cambios es la base misma.
+        """
+        if self._csr is None:
+            b = self.base
+            if self.mascara_nodos is None and self.mascara_arcos is None and not self.cambios:
+                self._csr = b
+            else:
+                g = copy.copy(b)
+                g.mascara_nodos = self.mascara_nodos if self.mascara_nodos is not None else b.mascara_nodos
+                g.vivos = self.vivos
+                g._presentes = None
+                g._transpuesto = None
+                if self.cambios:
+                    g.distancias, g.tiempos = self._pesos_propios()
+                g.simetrico = b.simetrico if self.mascara_arcos is None and not self.cambios else None
+                self._csr = g
+        return self._csr
+
+    @property
+    def vivos(self):
+        """bytearray(E): 1 si el arco está en la vista (visible y con sus dos extremos); None = todos."""
+        b = self.base
+        mn, ma = self.mascara_nodos, self.mascara_arcos
+        if mn is None and ma is None:
+            return b.vivos
+        if self._vivos is None:
+            if mn is None:
+                vivos = bytearray(ma)
+            else:
+                vivos = bytearray(map(mn.__getitem__, b.destinos))     # destino presente
+                off = b.offsets
+                for i in compress(range(len(mn)), map(operator.not_, mn)):
+                    vivos[off[i]:off[i + 1]] = bytes(off[i + 1] - off[i])   # origen ausente
+                if ma is not None:
+                    vivos = bytearray(map(operator.and_, vivos, ma))
+            if b.vivos is not None:
+                vivos = bytearray(map(operator.and_, vivos, b.vivos))
+            self._vivos = vivos
+        return self._vivos
+
+    def _pesos_propios(self):
+        if self._pesos is None:
+            b = self.base
+            dis, tie = array('d', b.distancias), array('d', b.tiempos)
+            for k, (d, t) in self.cambios.items():
+                dis[k] = d; tie[k] = t
+            self._pesos = (dis, tie)
+        return self._pesos
+
+    def suelta(self):
+        """Libera lo calculado para los caminos rápidos (la vista sigue funcionando)."""
+        self._csr = self._vivos = None
+
+    @property
+    def ruta_binaria(self):
+        # con base mapeada, la vista viaja a otros procesos como (ruta, máscaras): ver __reduce_ex__
+        return self.base.ruta_binaria
+
+    def __getattr__(self, nombre):
+        # offsets, destinos, pesos(), ponderado(), transpuesto(), nodos, ids, ... de csr()
+        if nombre.startswith('__') or nombre in ('base', 'mascara_nodos', 'mascara_arcos', 'cambios', '_propias', '_csr', '_vivos', '_pesos', '_n'):
+            raise AttributeError(nombre)
+        return getattr(self.csr(), nombre)
+
+    def __reduce_ex__(self, protocolo):
+        return (_vista, (self.base, self.mascara_nodos, self.mascara_arcos, self.cambios))
+
+    # ---------------- interfaz tipo diccionario (sobre la base, sin armar nada) ----------------
+    def __len__(self):
+        if self._n is None:
+            mn = self.mascara_nodos
+            self._n = self.base.num_nodos if mn is None else mn.count(1)
+        return self._n
+
+    def __iter__(self):
+        ids = self.base.ids
+        return iter(ids) if self.mascara_nodos is None else compress(ids, self.mascara_nodos)
+
+    def __contains__(self, u):
+        i = self.base.indice.get(u)
+        return i is not None and (self.mascara_nodos is None or self.mascara_nodos[i] == 1)
+
+    def __getitem__(self, u):
+        if u not in self:
+            raise KeyError(u)
+        b = self.base
+        i = b.indice[u]
+        mn, ma, cambios = self.mascara_nodos, self.mascara_arcos, self.cambios
+        ids, dst, dis, tie = b.ids, b.destinos, b.distancias, b.tiempos
+        vecinos = []
+        for k in range(b.offsets[i], b.offsets[i + 1]):
+            j = dst[k]
+            if (mn is not None and not mn[j]) or (ma is not None and not ma[k]):
+                continue
+            d, t = cambios[k] if k in cambios else (dis[k], tie[k])
+            vecinos.append((ids[j], d, t))
+        return vecinos
+
+
+def _vista(base, mascara_nodos, mascara_arcos, cambios):
+    return VistaGrafo(base, mascara_nodos, mascara_arcos, cambios)